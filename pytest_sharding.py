@@ -0,0 +1,45 @@
+"""
+Плагин pytest для запуска части тестов в отдельном процессе.
+
+Подключается так: pytest -p pytest_sharding --shard-id 0 --num-shards 4.
+Тесты одного класса TestCase попадают в один шард, чтобы
+setUpTestData выполнялся один раз; тесты-функции делятся поштучно.
+"""
+import zlib
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('sharding')
+    group.addoption('--shard-id', type=int, default=0)
+    group.addoption('--num-shards', type=int, default=1)
+
+
+def shard_key(item):
+    return item.parent.nodeid if item.cls is not None else item.nodeid
+
+
+def pytest_collection_modifyitems(config, items):
+    num_shards = config.getoption('num_shards')
+    if num_shards < 2:
+        return
+    groups = {}
+    for item in items:
+        groups.setdefault(shard_key(item), []).append(item)
+    loads = [0] * num_shards
+    assignment = {}
+    for key, group in sorted(
+            groups.items(),
+            key=lambda pair: (-len(pair[1]), zlib.crc32(pair[0].encode()))):
+        shard = loads.index(min(loads))
+        loads[shard] += len(group)
+        assignment[key] = shard
+    shard_id = config.getoption('shard_id')
+    selected, deselected = [], []
+    for item in items:
+        if assignment[shard_key(item)] == shard_id:
+            selected.append(item)
+        else:
+            deselected.append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = selected
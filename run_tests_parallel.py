@@ -0,0 +1,165 @@
+"""
+Параллельный запуск проверок обоих проектов.
+
+flake8, проверка структуры и тесты YaNews и YaNote стартуют
+одновременно, тесты каждого проекта делятся на шарды по процессам.
+У каждого процесса своя тестовая база SQLite в памяти. В конце
+результаты всех процессов сводятся в один отчёт.
+
+    python run_tests_parallel.py --workers 4
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from xml.etree import ElementTree
+
+BASE_DIR = Path(__file__).resolve().parent
+
+PROJECTS = {
+    'YaNews': ('ya_news', 'yanews.settings'),
+    'YaNote': ('ya_note', 'yanote.settings'),
+}
+SLOWEST_COUNT = 10
+
+
+def start_checks(env):
+    return {
+        'flake8': subprocess.Popen(
+            [sys.executable, '-m', 'flake8', '--config=setup.cfg'],
+            cwd=BASE_DIR, env=env,
+        ),
+        'structure': subprocess.Popen(
+            [sys.executable, 'structure_test.py'], cwd=BASE_DIR, env=env,
+        ),
+    }
+
+
+def start_shards(name, directory, settings, workers, report_dir, env):
+    env = dict(env, DJANGO_SETTINGS_MODULE=settings)
+    shards = []
+    for shard_id in range(workers):
+        report = report_dir / f'{directory}-{shard_id}.xml'
+        output = open(report.with_suffix('.log'), 'w+')
+        process = subprocess.Popen(
+            [
+                sys.executable, '-m', 'pytest', '-q', '--tb=line',
+                '-o', 'addopts=-p no:cacheprovider',
+                '-p', 'pytest_sharding',
+                f'--shard-id={shard_id}', f'--num-shards={workers}',
+                f'--junitxml={report}',
+            ],
+            cwd=BASE_DIR / directory, env=env,
+            stdout=output, stderr=subprocess.STDOUT,
+        )
+        shards.append(
+            (name, shard_id, process, report, output, time.perf_counter())
+        )
+    return shards
+
+
+def read_report(path):
+    """Возвращает список (имя теста, время, статус) из JUnit XML."""
+    if not path.exists():
+        return []
+    cases = []
+    for case in ElementTree.parse(path).iter('testcase'):
+        status = 'passed'
+        for tag in ('failure', 'error', 'skipped'):
+            if case.find(tag) is not None:
+                status = tag
+                break
+        cases.append((
+            f'{case.get("classname")}::{case.get("name")}',
+            float(case.get('time') or 0),
+            status,
+        ))
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1,
+        help='Количество процессов на каждый проект.',
+    )
+    parser.add_argument(
+        '--skip-checks', action='store_true',
+        help='Не запускать flake8 и проверку структуры.',
+    )
+    args = parser.parse_args()
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(
+            filter(None, (str(BASE_DIR), os.environ.get('PYTHONPATH')))
+        ),
+    )
+    started = time.perf_counter()
+    checks = {} if args.skip_checks else start_checks(env)
+    with tempfile.TemporaryDirectory() as report_dir:
+        shards = []
+        for name, (directory, settings) in PROJECTS.items():
+            shards += start_shards(
+                name, directory, settings, args.workers,
+                Path(report_dir), env,
+            )
+        failed = False
+        results = []
+        for name, shard_id, process, report, output, started_at in shards:
+            process.wait()
+            elapsed = time.perf_counter() - started_at
+            cases = read_report(report)
+            # 5 означает, что в шард не попало ни одного теста.
+            if process.returncode not in (0, 5):
+                failed = True
+                output.seek(0)
+                print(output.read())
+            output.close()
+            results.append((name, shard_id, elapsed, cases))
+    for check, process in checks.items():
+        if process.wait():
+            failed = True
+            print(f'Проверка {check} не пройдена.')
+    print_report(results, time.perf_counter() - started)
+    return 1 if failed else 0
+
+
+def print_report(results, wall_time):
+    print('\nШарды:')
+    totals = {}
+    all_cases = []
+    for name, shard_id, elapsed, cases in results:
+        statuses = [status for _, _, status in cases]
+        print(
+            f'  {name} #{shard_id}: тестов {len(cases)}, '
+            f'упало {statuses.count("failure") + statuses.count("error")}, '
+            f'{elapsed:.2f} с'
+        )
+        project = totals.setdefault(name, {'cases': 0, 'time': 0.0})
+        project['cases'] += len(cases)
+        project['time'] += sum(duration for _, duration, _ in cases)
+        all_cases += [(name, *case) for case in cases]
+    print('\nПроекты:')
+    for name, project in totals.items():
+        print(
+            f'  {name}: тестов {project["cases"]}, '
+            f'суммарное время тестов {project["time"]:.2f} с'
+        )
+    failures = [case for case in all_cases if case[3] in ('failure', 'error')]
+    if failures:
+        print('\nУпавшие тесты:')
+        for name, test, _, status in failures:
+            print(f'  {name} {test} ({status})')
+    print('\nСамые медленные тесты:')
+    for name, test, duration, _ in sorted(
+            all_cases, key=lambda case: case[2], reverse=True
+    )[:SLOWEST_COUNT]:
+        print(f'  {duration:.3f} с  {name} {test}')
+    print(f'\nОбщее время: {wall_time:.2f} с')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Память и пропускная способность: общий процесс против двух отдельных.
+
+Запуск из директории ya_combined:
+    python benchmarks/compare.py [--requests 300]
+Каждая конфигурация работает в своём подпроцессе на тестовых базах
+в памяти: наполняет их, прогревает страницы и прогоняет запросы
+через django.test.Client по каждой странице. Память — VmRSS
+процесса после прогона.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+CONFIGURATIONS = {
+    'yanews': (ROOT / 'ya_news', 'yanews.settings'),
+    'yanote': (ROOT / 'ya_note', 'yanote.settings'),
+    'yacombined': (ROOT / 'ya_combined', 'yacombined.settings'),
+}
+
+
+def rss_kib():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def seed():
+    """Пользователь, новости с комментариями и заметки."""
+    from django.apps import apps
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+
+    user = get_user_model().objects.create_user('reader', password='reader')
+    paths = []
+    if apps.is_installed('news'):
+        from news.models import Comment, News
+        for index in range(20):
+            news = News.objects.create(title=f'Новость {index}', text='Текст')
+            for number in range(10):
+                Comment.objects.create(
+                    news=news, author=user, text=f'Комментарий {number}',
+                )
+        paths += [
+            reverse('news:home'), reverse('news:detail', args=(news.pk,)),
+        ]
+    if apps.is_installed('notes'):
+        from notes.models import Note
+        Note.objects.bulk_create(
+            Note(title=f'Заметка {index}', text='Текст',
+                 slug=f'note-{index}', author=user)
+            for index in range(20)
+        )
+        paths += [
+            reverse('notes:list'), reverse('notes:detail', args=('note-0',)),
+        ]
+    return user, paths
+
+
+def worker(requests):
+    import django
+    django.setup()
+    from django.db import connections
+    from django.test import Client
+    from django.test.utils import (
+        setup_databases, setup_test_environment,
+    )
+
+    setup_test_environment(debug=False)
+    setup_databases(verbosity=0, interactive=False, aliases=set(connections))
+    user, paths = seed()
+    client = Client()
+    client.force_login(user)
+    for path in paths:
+        assert client.get(path).status_code == 200, path
+    latency = {}
+    for path in paths:
+        started = perf_counter()
+        for _ in range(requests):
+            client.get(path)
+        latency[path] = (perf_counter() - started) / requests
+    json.dump({'rss_kib': rss_kib(), 'latency': latency}, sys.stdout)
+
+
+def run(name, requests):
+    directory, settings = CONFIGURATIONS[name]
+    environment = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE=settings,
+        PYTHONPATH=str(directory),
+    )
+    output = subprocess.run(
+        [sys.executable, __file__, '--worker', '--requests', str(requests)],
+        cwd=directory, env=environment, check=True,
+        capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--worker', action='store_true')
+    options = parser.parse_args()
+    if options.worker:
+        worker(options.requests)
+        return
+    results = {name: run(name, options.requests) for name in CONFIGURATIONS}
+    for name, result in results.items():
+        print(f'{name}: {result["rss_kib"] / 1024:.1f} МиБ')
+        for path, seconds in result['latency'].items():
+            print(f'    {path:<24} {1 / seconds:6.0f} запросов/с')
+    separate = results['yanews']['rss_kib'] + results['yanote']['rss_kib']
+    combined = results['yacombined']['rss_kib']
+    print(
+        f'Два процесса: {separate / 1024:.1f} МиБ, '
+        f'общий: {combined / 1024:.1f} МиБ '
+        f'({100 * (separate - combined) / separate:.0f}% меньше).'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Модуль тестов общего процесса новостей и заметок."""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import reverse
+import pytest
+
+from news.models import Comment, News
+from notes.models import Note
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(scope='module', autouse=True)
+def static_without_manifest():
+    """Фикстура, отдающая статику без collectstatic и манифеста."""
+    with override_settings(STATICFILES_STORAGE=(
+        'django.contrib.staticfiles.storage.StaticFilesStorage'
+    )):
+        yield
+
+
+@pytest.fixture
+def author():
+    """Фикстура пользователя, общего для обоих сайтов."""
+    return get_user_model().objects.create_user('Автор')
+
+
+@pytest.fixture
+def author_client(author, client):
+    """Фикстура клиента, вошедшего под автором."""
+    client.force_login(author)
+    return client
+
+
+def schemas_with(table):
+    """Базы соединения default, в которых есть таблица."""
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA database_list')
+        schemas = [row[1] for row in cursor.fetchall()]
+        return [
+            schema for schema in schemas if cursor.execute(
+                f'SELECT 1 FROM "{schema}".sqlite_master WHERE name = %s',
+                (table,),
+            ).fetchone()
+        ]
+
+
+@pytest.mark.parametrize(
+    'schema, table',
+    (
+        ('main', News._meta.db_table),
+        ('notes', Note._meta.db_table),
+        ('accounts', get_user_model()._meta.db_table),
+        ('accounts', 'django_session'),
+    ),
+)
+def test_tables_live_in_own_files(schema, table):
+    """Таблицы каждого приложения лежат только в своей базе."""
+    assert schemas_with(table) == [schema]
+
+
+def test_one_session_for_both_sites(author, author_client):
+    """Одна сессия и свои шаблоны на новостях и на заметках."""
+    news_page = author_client.get(reverse('news:home')).content.decode()
+    notes_page = author_client.get(reverse('notes:home')).content.decode()
+    assert author.username in news_page
+    assert author.username in notes_page
+    assert f'href="{reverse("news:home")}"' in news_page
+    assert f'href="{reverse("notes:home")}"' in notes_page
+
+
+def test_joins_and_deletes_across_files(author):
+    """JOIN с пользователями и удаление пользователя идут через ATTACH."""
+    news = News.objects.create(title='Заголовок', text='Текст')
+    Comment.objects.create(news=news, author=author, text='Комментарий')
+    Note.objects.create(title='Заметка', text='Текст', author=author)
+    assert Comment.objects.filter(author__username=author.username).exists()
+    author.delete()
+    assert not Comment.objects.exists()
+    assert not Note.objects.exists()
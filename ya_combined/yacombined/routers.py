@@ -0,0 +1,20 @@
+"""
+Раскладка таблиц по файлам баз.
+
+Таблицы news и notes создаются в базах из APP_DATABASES, всё
+остальное (пользователи, сессии, типы содержимого, журнал админки) —
+в общей SHARED_DATABASE. Читает и пишет процесс через одно соединение
+default, к которому остальные файлы подключены через ATTACH,
+см. yacombined/sqlite3/base.py: транзакция, задевшая несколько
+файлов, остаётся одной транзакцией, а два соединения процесса
+не ждут блокировок друг друга.
+"""
+from django.conf import settings
+
+
+class AppRouter:
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == settings.APP_DATABASES.get(
+            app_label, settings.SHARED_DATABASE
+        )
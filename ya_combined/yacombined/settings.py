@@ -0,0 +1,109 @@
+"""
+Настройки общего процесса YaNews и YaNote.
+
+Оба приложения работают в одном интерпретаторе с общими пользователями
+и сессиями. Базы SQLite раздельные:
+accounts — пользователи, сессии и журнал админки;
+default — новости; notes — заметки.
+Код приложений обращается к django.db.connection напрямую,
+поэтому все запросы идут через default, а остальные базы подключены
+к ней через ATTACH, см. yacombined/routers.py.
+"""
+import sys
+from pathlib import Path
+
+NEWS_DIR = Path(__file__).resolve().parent.parent.parent / 'ya_news'
+NOTE_DIR = NEWS_DIR.parent / 'ya_note'
+sys.path[:0] = [str(NEWS_DIR), str(NOTE_DIR)]
+
+from yanews.settings import *  # noqa: E402,F401,F403
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'yacommon.apps.CommonConfig',
+    'news.apps.NewsConfig',
+    'notes.apps.NotesConfig',
+]
+
+MIDDLEWARE = [
+    'yacombined.sites.SiteMiddleware',
+    'yacommon.middleware.TimingMiddleware',
+    'yacommon.middleware.SlowQueryMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'news.middleware.AnonymousCacheMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'news.middleware.ProfilerMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yacombined.urls'
+
+# Шаблоны приложений называются одинаково (base.html, includes/...),
+# каталог выбирается по сайту запроса, см. yacombined/sites.py.
+SITE_TEMPLATES = {
+    'news': NEWS_DIR / 'templates',
+    'notes': NOTE_DIR / 'templates',
+}
+SITE_PREFIXES = {'/notes/': 'notes'}
+DEFAULT_SITE = 'news'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+            'loaders': [
+                ('yacombined.sites.CachedLoader', [
+                    'yacombined.sites.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yacombined.wsgi.application'
+
+# Все запросы идут через default, notes и accounts подключены к ней;
+# отдельные соединения с ними нужны только migrate --database.
+DATABASES = {
+    'default': {
+        'ENGINE': 'yacombined.sqlite3',
+        'NAME': BASE_DIR / 'news.sqlite3',
+        'ATTACH': ['notes', 'accounts'],
+    },
+    'notes': {
+        'ENGINE': 'yacombined.sqlite3',
+        'NAME': BASE_DIR / 'notes.sqlite3',
+    },
+    'accounts': {
+        'ENGINE': 'yacombined.sqlite3',
+        'NAME': BASE_DIR / 'accounts.sqlite3',
+    },
+}
+DATABASE_ROUTERS = ['yacombined.routers.AppRouter']
+# База приложения; остальные приложения Django живут в accounts.
+APP_DATABASES = {'news': 'default', 'notes': 'notes'}
+SHARED_DATABASE = 'accounts'
+
+STATIC_ROOT = BASE_DIR / 'collected_static'
+
+SLOW_QUERY_LOG_FILE = BASE_DIR / 'slow_queries.log'
+DB_BACKUP_DIR = BASE_DIR / 'backups'
@@ -0,0 +1,53 @@
+"""
+Выбор шаблонов по сайту запроса.
+
+У новостей и заметок свои base.html, includes/ и registration/
+с одинаковыми именами. Сайт определяется по префиксу пути
+(SITE_PREFIXES) и хранится в ContextVar: он свой у каждого потока
+WSGI и у каждой задачи ASGI.
+"""
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.template.loaders import cached, filesystem
+
+current_site = ContextVar('current_site', default=None)
+
+
+def site_for_path(path):
+    for prefix, site in settings.SITE_PREFIXES.items():
+        if path.startswith(prefix):
+            return site
+    return settings.DEFAULT_SITE
+
+
+def get_site():
+    return current_site.get() or settings.DEFAULT_SITE
+
+
+class SiteMiddleware:
+    """Запоминает сайт запроса на время его обработки."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_site.set(site_for_path(request.path_info))
+        try:
+            return self.get_response(request)
+        finally:
+            current_site.reset(token)
+
+
+class Loader(filesystem.Loader):
+    """Ищет шаблоны в каталоге текущего сайта."""
+
+    def get_dirs(self):
+        return [settings.SITE_TEMPLATES[get_site()]]
+
+
+class CachedLoader(cached.Loader):
+    """Кеш скомпилированных шаблонов, раздельный по сайтам."""
+
+    def cache_key(self, template_name, skip=None):
+        return f'{get_site()}:{super().cache_key(template_name, skip)}'
@@ -0,0 +1,40 @@
+"""
+SQLite с подключёнными базами соседних приложений.
+
+Соединение подключает через ATTACH DATABASE базы из ATTACH. Имена
+таблиц без схемы SQLite ищет сначала в main, затем в подключённых
+базах, поэтому запросы Django и сырой SQL приложений работают
+без изменений, а JOIN на auth_user остаётся одним запросом.
+
+Внешние ключи между файлами SQLite не проверяет (REFERENCES ищет
+таблицу только в своей базе), поэтому они выключены насовсем:
+ссылки на пользователей держит on_delete в Django.
+"""
+from django.db import connections
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def attached_name(self, alias):
+        other = connections[alias]
+        if self.is_in_memory_db():
+            # Тестовые базы создаются по очереди: имя соседней берётся
+            # заранее, а не из её ещё не подменённых настроек.
+            return other.creation._get_test_db_name()
+        return other.get_connection_params()['database']
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        conn.execute('PRAGMA foreign_keys = OFF')
+        for alias in self.settings_dict.get('ATTACH', ()):
+            conn.execute(
+                f'ATTACH DATABASE ? AS "{alias}"', (self.attached_name(alias),)
+            )
+        return conn
+
+    def enable_constraint_checking(self):
+        pass
+
+    def check_constraints(self, table_names=None):
+        pass
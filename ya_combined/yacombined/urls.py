@@ -0,0 +1,13 @@
+from django.contrib import admin
+from django.urls import include, path
+
+from yacommon.metrics import metrics_view
+from yanews.urls import auth_urls
+
+urlpatterns = [
+    path('', include('news.urls')),
+    path('notes/', include('notes.urls')),
+    path('admin/', admin.site.urls),
+    path('metrics/', metrics_view, name='metrics'),
+    path('auth/', include(auth_urls)),
+]
@@ -0,0 +1,23 @@
+"""
+WSGI config for yacombined project.
+
+It exposes the WSGI callable as a module-level variable named ``application``.
+Static files from STATIC_ROOT are served by yacommon.assets, everything
+else by Django.
+News are mounted at /, notes at /notes/.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yacombined.settings')
+
+django_application = get_wsgi_application()
+
+from yacommon.assets import StaticFilesApplication  # noqa: E402
+
+application = StaticFilesApplication(django_application)
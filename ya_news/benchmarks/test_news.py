@@ -0,0 +1,199 @@
+"""Бенчмарки горячих путей YaNews."""
+import asyncio
+from time import perf_counter
+import tracemalloc
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test.client import Client
+from django.urls import reverse
+import pytest
+
+from news import live
+from news.counters import news_views
+from news.models import Comment, News
+from news.rendering import render_rows
+from news.threads import fill_paths
+
+User = get_user_model()
+
+
+def seed(news_count, comments_count):
+    """Создаёт news_count новостей по comments_count комментариев."""
+    author = User.objects.create(username='Бенчмарк')
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст новости. ' * 50)
+        for index in range(news_count)
+    )
+    all_news = News.objects.order_by('pk')
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for news in all_news
+        for index in range(comments_count)
+    )
+    last_pk = Comment.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first()
+    fill_paths(last_pk - news_count * comments_count + 1, last_pk)
+    render_rows(News)
+    render_rows(Comment)
+    return author, all_news.first()
+
+
+@pytest.fixture
+def dataset(dataset_size, settings):
+    """Фикстура набора данных N новостей × M комментариев."""
+    settings.VIEW_COUNTER_FLUSH_INTERVAL = 0
+    yield seed(*dataset_size)
+    news_views.pending.drain()
+
+
+@pytest.fixture
+def author_client(dataset):
+    client = Client()
+    client.force_login(dataset[0])
+    return client
+
+
+@pytest.mark.django_db
+def test_news_list(bench, client, dataset, dataset_size):
+    url = reverse('news:home')
+    bench.measure(
+        f'news_list[{dataset_size[0]}x{dataset_size[1]}]',
+        lambda index: client.get(url),
+    )
+
+
+@pytest.mark.django_db
+def test_news_detail(bench, client, dataset, dataset_size):
+    url = reverse('news:detail', args=(dataset[1].pk,))
+    bench.measure(
+        f'news_detail[{dataset_size[0]}x{dataset_size[1]}]',
+        lambda index: client.get(url),
+    )
+
+
+@pytest.mark.django_db
+def test_comment_post(bench, author_client, dataset, dataset_size):
+    url = reverse('news:detail', args=(dataset[1].pk,))
+
+    def post(index):
+        response = author_client.post(url, {'text': f'Новый {index}'})
+        assert response.status_code == 302
+
+    bench.measure(f'comment_post[{dataset_size[0]}x{dataset_size[1]}]', post)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_live_news_pages(bench, live_get, dataset, dataset_size):
+    home_url = reverse('news:home')
+    detail_url = reverse('news:detail', args=(dataset[1].pk,))
+    suffix = f'[{dataset_size[0]}x{dataset_size[1]}]'
+    bench.measure(
+        f'live_news_list{suffix}',
+        lambda index: live_get(home_url),
+        count_queries=False,
+    )
+    bench.measure(
+        f'live_news_detail{suffix}',
+        lambda index: live_get(detail_url),
+        count_queries=False,
+    )
+
+
+@pytest.mark.django_db
+def test_api_rows_per_second(bench, client, dataset, dataset_size):
+    """Комментариев в секунду: JSON API против страницы новости."""
+    news = dataset[1]
+    suffix = f'[{dataset_size[0]}x{dataset_size[1]}]'
+    api_url = reverse('news:api_comments', args=(news.pk,))
+    detail_url = reverse('news:detail', args=(news.pk,))
+    api_rows = min(dataset_size[1], settings.API_COMMENTS_PER_PAGE)
+    page_rows = min(dataset_size[1], settings.COMMENT_THREADS_PER_PAGE)
+
+    def get_api(index):
+        list(client.get(api_url).streaming_content)
+
+    api = bench.measure(f'api_comments{suffix}', get_api)
+    page = bench.measure(
+        f'detail_comments{suffix}', lambda index: client.get(detail_url)
+    )
+    api_speed = api_rows / api['p50_ms'] * 1000
+    page_speed = page_rows / page['p50_ms'] * 1000
+    print(
+        f'\nкомментариев в секунду{suffix}: API {api_speed:.0f}, '
+        f'шаблон {page_speed:.0f}'
+    )
+    assert api_speed > page_speed
+
+
+@pytest.mark.django_db
+def test_live_idle_connections(settings):
+    """
+    10 тысяч открытых потоков комментариев одной новости.
+
+    Память на поток считается по первой тысяче соединений:
+    tracemalloc замедляет каждое выделение памяти в несколько раз.
+    """
+    connections = 10000
+    traced = 1000
+    news = News.objects.create(title='Новость', text='Текст')
+    settings.LIVE_BROKER = 'news.live.LocalBroker'
+    live.reset_broker()
+
+    async def scenario():
+        disconnected = asyncio.get_running_loop().create_future()
+        started = 0
+        delivered = 0
+        events = {'started': asyncio.Event(), 'delivered': asyncio.Event()}
+
+        async def receive():
+            await disconnected
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            nonlocal started, delivered
+            if message['type'] == 'http.response.start':
+                started += 1
+                if started in (traced, connections):
+                    events['started'].set()
+            else:
+                delivered += 1
+                if delivered == connections:
+                    events['delivered'].set()
+
+        def connect(count):
+            events['started'].clear()
+            return [
+                asyncio.ensure_future(
+                    live.events(scope, receive, send, news.pk)
+                )
+                for _ in range(count)
+            ]
+
+        scope = {'type': 'http', 'path': live.live_path(news.pk)}
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        tasks = connect(traced)
+        await events['started'].wait()
+        memory = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        tasks += connect(connections - traced)
+        await events['started'].wait()
+        start = perf_counter()
+        live.get_broker().publish(live.channel(news.pk), b'data: {}\n\n')
+        await events['delivered'].wait()
+        fanout = perf_counter() - start
+        disconnected.set_result(None)
+        await asyncio.gather(*tasks)
+        return memory / traced, fanout
+
+    per_connection, fanout = async_to_sync(scenario)()
+    live.reset_broker()
+    print(
+        f'\nlive_idle: {connections} потоков, '
+        f'{per_connection / 1024:.1f} КиБ на поток, '
+        f'раздача события {fanout * 1000:.0f} мс'
+    )
+    assert per_connection < 16 * 1024
@@ -1,15 +1,197 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.forms.models import BaseInlineFormSet
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
 
-from .models import Comment, News
+from .archive import comments_counts
+from .models import ArchivedComment, Comment, News, RequestProfile
+from .purge import hide
 
+# Столько последних комментариев показывается на странице новости,
+# остальные — в постраничном списке комментариев.
+INLINE_COMMENTS = 20
 
-class CommentInline(admin.StackedInline):
+
+class NewsChangeList(ChangeList):
+    """
+    Список новостей с числом комментариев.
+
+    Комментарии считаются отдельным запросом только для строк страницы:
+    аннотация попала бы и в COUNT(*) пагинатора, и в границы
+    date_hierarchy и считалась бы по всем новостям.
+    """
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.result_list = list(self.result_list)
+        counts = comments_counts([news.pk for news in self.result_list])
+        for news in self.result_list:
+            news.comments_count = counts[news.pk]
+
+
+class LatestCommentsFormSet(BaseInlineFormSet):
+    """Только последние INLINE_COMMENTS комментариев новости."""
+
+    def get_queryset(self):
+        if not hasattr(self, '_latest'):
+            self._latest = super().get_queryset()[:INLINE_COMMENTS]
+        return self._latest
+
+
+class CommentInline(admin.TabularInline):
+    """Последние комментарии только для чтения, со ссылкой на каждый."""
     model = Comment
+    formset = LatestCommentsFormSet
+    fields = readonly_fields = ('author', 'text', 'created')
+    ordering = ('-pk',)
     extra = 0
+    can_delete = False
+    show_change_link = True
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('author')
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(News)
 class NewsAdmin(admin.ModelAdmin):
+    """
+    Новости.
+
+    Удаление только скрывает новость: комментарии и саму новость
+    удаляет порциями команда purge_hidden_news.
+    """
     inlines = [
         CommentInline,
     ]
+    list_display = ('title', 'date', 'comments', 'is_hidden')
+    list_filter = ('is_hidden',)
+    date_hierarchy = 'date'
+    readonly_fields = ('all_comments',)
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return NewsChangeList
+
+    @admin.display(description='Комментарии')
+    def comments(self, obj):
+        return obj.comments_count
+
+    @admin.display(description='Все комментарии')
+    def all_comments(self, obj):
+        if obj.pk is None:
+            return '-'
+        url = reverse('admin:news_comment_changelist')
+        return format_html(
+            '<a href="{}?news__id__exact={}">Все комментарии ({})</a>',
+            url, obj.pk, comments_counts([obj.pk])[obj.pk],
+        )
+
+    def get_deleted_objects(self, objs, request):
+        """Сводка для подтверждения без загрузки всех комментариев."""
+        objs = list(objs)
+        model_count = {News._meta.verbose_name_plural: len(objs)}
+        for model in (Comment, ArchivedComment):
+            count = model.objects.filter(news__in=objs).count()
+            if count:
+                model_count[model._meta.verbose_name_plural] = count
+        return [str(obj) for obj in objs], model_count, set(), []
+
+    def delete_model(self, request, obj):
+        hide(News.objects.filter(pk=obj.pk))
+        self.message_deferred(request)
+
+    def delete_queryset(self, request, queryset):
+        hide(queryset)
+        self.message_deferred(request)
+
+    def message_deferred(self, request):
+        self.message_user(
+            request,
+            'Новости скрыты, комментарии и сами новости будут удалены '
+            'командой purge_hidden_news.',
+            messages.INFO,
+        )
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    """
+    Комментарии.
+
+    Новость и родитель выбираются по id, автор — поиском,
+    чтобы форма не загружала все новости и всех пользователей.
+    У сохранённого комментария их не поменять: от них зависит путь
+    в ветке.
+    """
+    list_display = ('__str__', 'news', 'author', 'created')
+    list_select_related = ('news', 'author')
+    raw_id_fields = ('news', 'parent')
+    autocomplete_fields = ('author',)
+    fields = ('news', 'parent', 'author', 'text', 'created')
+    readonly_fields = ('created',)
+    ordering = ('-pk',)
+    show_full_result_count = False
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is None:
+            return self.readonly_fields
+        return self.readonly_fields + ('news', 'parent')
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """Просмотр профилей запросов, снятых ProfilerMiddleware."""
+    list_display = (
+        'created', 'method', 'path', 'view_name',
+        'status_code', 'duration', 'mode', 'user',
+    )
+    list_filter = ('mode', 'view_name')
+    list_select_related = ('user',)
+    fields = (
+        'created', 'user', 'method', 'path', 'view_name',
+        'status_code', 'duration', 'mode', 'report_text', 'collapsed_link',
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Отчёт')
+    def report_text(self, obj):
+        return format_html('<pre>{}</pre>', obj.report)
+
+    @admin.display(description='Стеки для flamegraph')
+    def collapsed_link(self, obj):
+        url = reverse('admin:news_requestprofile_collapsed', args=(obj.pk,))
+        return format_html('<a href="{}">Скачать collapsed stacks</a>', url)
+
+    def get_urls(self):
+        return [
+            path(
+                '<int:pk>/collapsed/',
+                self.admin_site.admin_view(self.collapsed_view),
+                name='news_requestprofile_collapsed',
+            ),
+        ] + super().get_urls()
+
+    def collapsed_view(self, request, pk):
+        """Отдаёт стеки в формате, который понимает flamegraph.pl."""
+        if not self.has_view_permission(request):
+            return HttpResponse(status=403)
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        response = HttpResponse(
+            profile.collapsed, content_type='text/plain; charset=utf-8'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="profile-{pk}.collapsed"'
+        )
+        return response
@@ -0,0 +1,122 @@
+"""
+JSON API только для чтения: новости и страницы комментариев.
+
+Строки читаются через values_list() без создания объектов моделей,
+даты заранее превращаются в строки, кодирует компактный JSONEncoder
+без проверки циклов. Страница комментариев читается из базы
+во view и отдаётся потоком по API_STREAM_CHUNK строк: JSON большой
+страницы не собирается в одну строку. Запросов к базе в генераторе
+нет, потому что под ASGI Django перебирает его в цикле событий.
+"""
+import json
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+
+from .archive import comments_counts
+from .counters import news_views
+from .models import ArchivedComment, Comment, News
+from .views import get_page_number
+
+CONTENT_TYPE = 'application/json'
+ENCODER = json.JSONEncoder(
+    ensure_ascii=False, check_circular=False, separators=(',', ':'),
+)
+NEWS_ORDERING = (*News._meta.ordering, '-pk')
+COMMENT_ORDERING = (*Comment._meta.ordering, 'pk')
+
+
+def json_response(data):
+    return HttpResponse(ENCODER.encode(data), content_type=CONTENT_TYPE)
+
+
+def visible_news():
+    return News.objects.filter(is_hidden=False)
+
+
+def news_list(request):
+    """Страница новостей в порядке главной страницы."""
+    page = get_page_number(request)
+    per_page = settings.API_NEWS_PER_PAGE
+    rows = list(
+        visible_news().order_by(*NEWS_ORDERING)
+        .values_list('id', 'title', 'date', 'excerpt', 'views')
+        [(page - 1) * per_page:page * per_page + 1]
+    )
+    counts = comments_counts([row[0] for row in rows[:per_page]])
+    return json_response({
+        'results': [
+            {
+                'id': pk,
+                'title': title,
+                'date': date.isoformat(),
+                'excerpt': excerpt,
+                'views': views,
+                'comments': counts[pk],
+            }
+            for pk, title, date, excerpt, views in rows[:per_page]
+        ],
+        'next': page + 1 if len(rows) > per_page else None,
+    })
+
+
+def news_detail(request, pk):
+    """Новость целиком; запрос засчитывается как просмотр."""
+    row = visible_news().filter(pk=pk).values_list(
+        'title', 'text', 'date', 'views', 'is_archived'
+    ).first()
+    if row is None:
+        raise Http404('Новость не найдена.')
+    title, text, date, views, is_archived = row
+    news_views.hit(pk)
+    return json_response({
+        'id': pk,
+        'title': title,
+        'text': text,
+        'date': date.isoformat(),
+        'views': views + news_views.pending.get(pk),
+        'comments': comments_counts([pk])[pk],
+        'is_archived': is_archived,
+    })
+
+
+def comment_rows(rows, per_page, next_page):
+    """Части JSON страницы комментариев из уже прочитанных строк."""
+    yield '{"results":['
+    chunk_size = settings.API_STREAM_CHUNK
+    for start in range(0, min(len(rows), per_page), chunk_size):
+        yield (',' if start else '') + ','.join(
+            ENCODER.encode({
+                'id': pk,
+                'parent': parent,
+                'author': author,
+                'text': text,
+                'created': created.isoformat(),
+                'depth': depth,
+            })
+            for pk, parent, author, text, created, depth
+            in rows[start:min(start + chunk_size, per_page)]
+        )
+    has_next = len(rows) > per_page
+    yield '],"next":' + ENCODER.encode(next_page if has_next else None) + '}'
+
+
+def news_comments(request, pk):
+    """Страница комментариев новости в порядке их создания."""
+    is_archived = visible_news().filter(pk=pk).values_list(
+        'is_archived', flat=True
+    ).first()
+    if is_archived is None:
+        raise Http404('Новость не найдена.')
+    model = ArchivedComment if is_archived else Comment
+    page = get_page_number(request)
+    per_page = settings.API_COMMENTS_PER_PAGE
+    rows = list(model.objects.filter(news_id=pk).order_by(
+        *COMMENT_ORDERING
+    ).values_list(
+        'id', 'parent_id', 'author__username', 'text', 'created', 'depth'
+    )[(page - 1) * per_page:page * per_page + 1])
+    return StreamingHttpResponse(
+        comment_rows(rows, per_page, page + 1),
+        content_type=CONTENT_TYPE,
+    )
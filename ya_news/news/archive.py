@@ -0,0 +1,95 @@
+"""
+Перенос комментариев старых новостей в архивную таблицу.
+
+Почти все запросы читают комментарии свежих новостей, поэтому
+рабочая таблица Comment и её индексы должны оставаться небольшими.
+Комментарии новостей старше порога переносятся в ArchivedComment
+вместе с id и путями; новость помечается is_archived, и страница
+новости читает ветки из архива теми же запросами. Из топа обсуждаемых
+такие новости убираются.
+"""
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from . import leaderboard
+from .models import ArchivedComment, Comment, News
+
+COLUMNS = ', '.join(
+    connection.ops.quote_name(field.column)
+    for field in Comment._meta.concrete_fields
+)
+HOT = Comment._meta.db_table
+COLD = ArchivedComment._meta.db_table
+
+
+def comments_counts(news_ids):
+    """Число рабочих и архивных комментариев новостей одним запросом."""
+    counts = Counter()
+    first, second = (
+        model.objects.filter(news__in=news_ids).order_by()
+        .values_list('news').annotate(Count('pk'))
+        for model in (Comment, ArchivedComment)
+    )
+    for news_id, count in first.union(second, all=True):
+        counts[news_id] += count
+    return counts
+
+
+def batches(news_counts, batch_size):
+    """
+    Группирует новости так, чтобы в пачке было до batch_size комментариев.
+
+    Новость не делится между пачками: пока она переносится, страница
+    читает её целиком из одной из таблиц. Новость, у которой
+    комментариев больше batch_size, переносится отдельной пачкой.
+    """
+    batch, size = [], 0
+    for news_id, count in news_counts:
+        if batch and size + count > batch_size:
+            yield batch, size
+            batch, size = [], 0
+        batch.append(news_id)
+        size += count
+    if batch:
+        yield batch, size
+
+
+def move(news_ids):
+    """Переносит комментарии новостей одной транзакцией."""
+    placeholders = ', '.join(['%s'] * len(news_ids))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {COLD} ({COLUMNS}) SELECT {COLUMNS} FROM {HOT} '
+            f'WHERE news_id IN ({placeholders})',
+            news_ids,
+        )
+        cursor.execute(
+            f'DELETE FROM {HOT} WHERE news_id IN ({placeholders})', news_ids,
+        )
+        News.objects.filter(pk__in=news_ids).update(is_archived=True)
+        leaderboard.news_archived(news_ids)
+
+
+def archive_before(day, batch_size=5000, progress=None):
+    """
+    Архивирует комментарии новостей, вышедших раньше day.
+
+    progress(новостей, комментариев) вызывается после каждой пачки
+    с накопленными итогами. Возвращает те же итоги.
+    """
+    news_counts = list(
+        News.objects.filter(date__lt=day, is_archived=False)
+        .annotate(comments=Count('comment'))
+        .order_by('pk')
+        .values_list('pk', 'comments')
+    )
+    archived_news = archived_comments = 0
+    for news_ids, size in batches(news_counts, batch_size):
+        move(news_ids)
+        archived_news += len(news_ids)
+        archived_comments += size
+        if progress is not None:
+            progress(archived_news, archived_comments)
+    return archived_news, archived_comments
@@ -0,0 +1,9 @@
+"""Счётчик просмотров, см. yacommon/counters.py."""
+import atexit
+
+from yacommon.counters import ViewCounter
+
+from .models import News
+
+news_views = ViewCounter(News)
+atexit.register(news_views.stop)
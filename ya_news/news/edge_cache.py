@@ -0,0 +1,213 @@
+"""
+Кэшируемые страницы для анонимных посетителей.
+
+Главная и страница новости для анонима одинаковы у всех, но через
+сессии, CSRF и сообщения получают Vary: Cookie и прокси их не хранит.
+В режиме ANONYMOUS_CACHE запрос GET без cookie сессии к этим
+страницам обходит эти слои: представление вызывается напрямую
+с AnonymousUser, ответ получает Cache-Control с s-maxage
+и stale-while-revalidate, а тело сжимается один раз и хранится в памяти
+процесса готовым вместе с несжатым вариантом.
+
+Прокси должен пропускать мимо кэша запросы с cookie сессии:
+такие ответы помечаются private. Изменения новостей и комментариев
+после фиксации сбрасывают страницы здесь и на прокси через
+ANONYMOUS_CACHE_PURGER. Пока страница в кэше, её просмотры
+не доходят до счётчиков.
+"""
+import gzip
+import logging
+from collections import OrderedDict
+from http.client import HTTPConnection, HTTPException
+from threading import Lock
+from time import monotonic
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve, reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_VIEWS = frozenset(('news:home', 'news:detail'))
+COMPRESS_LEVEL = 6
+
+_lock = Lock()
+_purger = None
+
+
+def cache_control():
+    return (
+        f'public, max-age=0, s-maxage={settings.ANONYMOUS_CACHE_MAX_AGE}, '
+        f'stale-while-revalidate={settings.ANONYMOUS_CACHE_STALE}'
+    )
+
+
+def accepts_gzip(request):
+    return 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+
+class Page:
+    """Готовый ответ в двух вариантах: как есть и сжатый gzip."""
+
+    __slots__ = ('expires', 'content_type', 'body', 'compressed')
+
+    def __init__(self, response, max_age):
+        self.expires = monotonic() + max_age
+        self.content_type = response['Content-Type']
+        self.body = response.content
+        self.compressed = gzip.compress(
+            self.body, compresslevel=COMPRESS_LEVEL, mtime=0,
+        )
+
+    def response(self, compressed):
+        response = HttpResponse(
+            self.compressed if compressed else self.body,
+            content_type=self.content_type,
+        )
+        if compressed:
+            response['Content-Encoding'] = 'gzip'
+        response['Content-Length'] = str(len(response.content))
+        response['Cache-Control'] = cache_control()
+        response['X-Frame-Options'] = 'DENY'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class PageCache:
+    """Страницы по полному пути запроса, вытесняются по давности."""
+
+    def __init__(self, size):
+        self.size = size
+        self._lock = Lock()
+        self._pages = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                return None
+            if page.expires <= monotonic():
+                del self._pages[key]
+                return None
+            self._pages.move_to_end(key)
+            return page
+
+    def put(self, key, page):
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.size:
+                self._pages.popitem(last=False)
+
+    def purge(self, paths):
+        """Сбрасывает все варианты страниц с путями paths."""
+        paths = set(paths)
+        with self._lock:
+            for key in [
+                key for key in self._pages if key.split('?')[0] in paths
+            ]:
+                del self._pages[key]
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+
+pages = PageCache(settings.ANONYMOUS_CACHE_SIZE)
+
+
+def cacheable_match(request):
+    """Маршрут кэшируемой страницы или None."""
+    if request.method != 'GET':
+        return None
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return None
+    return match if match.view_name in CACHEABLE_VIEWS else None
+
+
+def serve(request, match):
+    """Страница для анонима из памяти или от представления."""
+    key = request.get_full_path()
+    page = pages.get(key)
+    if page is None:
+        request.resolver_match = match
+        request.user = AnonymousUser()
+        response = match.func(request, *match.args, **match.kwargs)
+        if callable(getattr(response, 'render', None)):
+            response = response.render()
+        if response.status_code != 200 or response.streaming:
+            return response
+        page = Page(response, settings.ANONYMOUS_CACHE_MAX_AGE)
+        pages.put(key, page)
+    return page.response(accepts_gzip(request))
+
+
+class Purger:
+    """
+    Интерфейс сброса страниц на прокси.
+
+    purge получает пути страниц без параметров и должен сбросить
+    все их варианты, в том числе с ?page и ?sort.
+    """
+
+    def purge(self, paths):
+        raise NotImplementedError
+
+
+class NullPurger(Purger):
+    """Прокси нет, сбрасывается только кэш процесса."""
+
+    def purge(self, paths):
+        pass
+
+
+class HttpPurger(Purger):
+    """Запросы PURGE на ANONYMOUS_CACHE_PROXY, по одному на путь."""
+
+    timeout = 1
+
+    def purge(self, paths):
+        url = urlsplit(settings.ANONYMOUS_CACHE_PROXY)
+        connection = HTTPConnection(url.netloc, timeout=self.timeout)
+        try:
+            for path in paths:
+                connection.request('PURGE', path)
+                connection.getresponse().read()
+        except (OSError, HTTPException):
+            # Страница останется на прокси не дольше s-maxage.
+            logger.exception('Не удалось сбросить страницы на прокси')
+        finally:
+            connection.close()
+
+
+def get_purger():
+    """Сброс из настройки ANONYMOUS_CACHE_PURGER, один на процесс."""
+    global _purger
+    with _lock:
+        if _purger is None:
+            _purger = import_string(settings.ANONYMOUS_CACHE_PURGER)()
+        return _purger
+
+
+def reset_purger():
+    global _purger
+    with _lock:
+        _purger = None
+
+
+def news_changed(news_ids):
+    """Сбрасывает главную и страницы новостей; вызывается после фиксации."""
+    if not settings.ANONYMOUS_CACHE:
+        return
+    paths = [reverse('news:home')] + [
+        reverse('news:detail', args=(news_id,))
+        for news_id in sorted(set(news_ids))
+    ]
+    pages.purge(paths)
+    get_purger().purge(paths)
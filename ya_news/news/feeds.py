@@ -0,0 +1,242 @@
+"""
+Ленты Atom и RSS: свежие новости и комментарии к новости.
+
+Читатели лент опрашивают их раз в минуту, поэтому элементы ленты
+хранятся в памяти процесса и сбрасываются сигналами изменений.
+Новые комментарии не сбрасывают ленту, а помечают её: при следующем
+запросе дочитываются только строки с id больше последнего известного.
+ETag и Last-Modified считаются по хранимым элементам, поэтому
+повторный запрос с If-None-Match или If-Modified-Since получает 304
+без обращения к базе. В памяти держится не больше FEED_CACHE_SIZE
+лент, давно не читанные вытесняются; лента живёт FEED_CACHE_MAX_AGE
+секунд, так что изменения из других процессов видны с этой задержкой.
+"""
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, time
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils import feedgenerator, timezone
+from django.views.decorators.http import condition, require_GET
+
+from .models import Comment, News
+from .threads import comment_model
+
+GENERATORS = {
+    'atom': feedgenerator.Atom1Feed,
+    'rss': feedgenerator.Rss201rev2Feed,
+}
+LATEST = 'latest'
+
+
+class CachedFeed:
+    """Элементы ленты от новых к старым и готовые тела по форматам."""
+
+    __slots__ = (
+        'title', 'link', 'items', 'last_pk', 'stale', 'etag',
+        'last_modified', 'bodies', 'expires',
+    )
+
+    def __init__(self, title, link, items, last_pk):
+        self.title = title
+        self.link = link
+        self.stale = False
+        # Срок задаёт FeedCache, когда кладёт ленту.
+        self.expires = 0.0
+        self.set_items(items, last_pk)
+
+    def set_items(self, items, last_pk):
+        self.items = items
+        self.last_pk = last_pk
+        self.bodies = {}
+        self.etag = hashlib.blake2b(
+            repr(items).encode(), digest_size=12
+        ).hexdigest()
+        self.last_modified = max(
+            (item['pubdate'] for item in items), default=None
+        )
+
+    def body(self, feed_format, base_url):
+        key = (feed_format, base_url)
+        body = self.bodies.get(key)
+        if body is None:
+            feed = GENERATORS[feed_format](
+                title=self.title,
+                link=base_url + self.link,
+                description=self.title,
+                language=settings.LANGUAGE_CODE,
+            )
+            for item in self.items:
+                feed.add_item(**{
+                    **item,
+                    'link': base_url + item['link'],
+                    'unique_id': base_url + item['link'],
+                })
+            body = self.bodies[key] = feed.writeString('utf-8').encode()
+        return body
+
+
+class FeedCache:
+    """
+    Ленты по ключу: LATEST или id новости для ленты комментариев.
+
+    Не больше size лент, каждая живёт max_age секунд.
+    """
+
+    def __init__(self, size, max_age):
+        self.size = size
+        self.max_age = max_age
+        self._lock = Lock()
+        self._refresh_lock = Lock()
+        self._feeds = OrderedDict()
+        # Лента, собранная до изменения, не должна попасть в кэш после него.
+        self._generation = 0
+
+    def get(self, key):
+        with self._lock:
+            feed = self._feeds.get(key)
+            if feed is not None:
+                if feed.expires <= monotonic():
+                    del self._feeds[key]
+                    feed = None
+                else:
+                    self._feeds.move_to_end(key)
+            generation = self._generation
+        if feed is None:
+            feed = build(key)
+            feed.expires = monotonic() + self.max_age
+            with self._lock:
+                if self._generation == generation:
+                    self._feeds[key] = feed
+                    self._feeds.move_to_end(key)
+                    while len(self._feeds) > self.size:
+                        self._feeds.popitem(last=False)
+        elif feed.stale:
+            with self._refresh_lock:
+                if feed.stale:
+                    feed.stale = False
+                    refresh(key, feed)
+        return feed
+
+    def mark_stale(self, key):
+        with self._lock:
+            self._generation += 1
+            feed = self._feeds.get(key)
+            if feed is not None:
+                feed.stale = True
+
+    def drop(self, *keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._feeds.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._feeds.clear()
+
+
+feeds = FeedCache(settings.FEED_CACHE_SIZE, settings.FEED_CACHE_MAX_AGE)
+
+
+def news_item(news):
+    return {
+        'title': news.title,
+        'link': reverse('news:detail', args=(news.pk,)),
+        'description': news.excerpt,
+        'pubdate': timezone.make_aware(datetime.combine(news.date, time())),
+    }
+
+
+def comment_item(comment):
+    return {
+        'title': f'{comment.author.username}: {comment.text[:50]}',
+        'link': reverse('news:thread', args=(comment.pk,)),
+        'description': comment.text_html,
+        'pubdate': comment.created,
+        'author_name': comment.author.username,
+    }
+
+
+def news_comments(model, news_id, after_pk=0):
+    return (
+        model.objects
+        .filter(news_id=news_id, pk__gt=after_pk)
+        .select_related('author')
+        .order_by('-pk')[:settings.FEED_ITEMS]
+    )
+
+
+def build(key):
+    """Лента целиком; для скрытой или несуществующей новости — Http404."""
+    if key == LATEST:
+        news_list = (
+            News.objects.filter(is_hidden=False)
+            .only('title', 'date', 'excerpt')
+            .order_by('-date', '-pk')[:settings.FEED_ITEMS]
+        )
+        return CachedFeed(
+            'Свежие новости', reverse('news:home'),
+            [news_item(news) for news in news_list], None,
+        )
+    news = News.objects.filter(is_hidden=False, pk=key).only(
+        'title', 'is_archived'
+    ).first()
+    if news is None:
+        raise Http404('Новость не найдена.')
+    comments = list(news_comments(comment_model(news), key))
+    return CachedFeed(
+        f'Комментарии: {news.title}', reverse('news:detail', args=(key,)),
+        [comment_item(comment) for comment in comments],
+        comments[0].pk if comments else 0,
+    )
+
+
+def refresh(key, feed):
+    """Дочитывает в ленту комментариев новые строки."""
+    comments = list(news_comments(Comment, key, feed.last_pk))
+    if comments:
+        feed.set_items(
+            ([comment_item(comment) for comment in comments]
+             + feed.items)[:settings.FEED_ITEMS],
+            comments[0].pk,
+        )
+
+
+def comments_created(comments):
+    """Вызывается после фиксации новых комментариев."""
+    for news_id in {comment.news_id for comment in comments}:
+        feeds.mark_stale(news_id)
+
+
+def news_changed(news_ids):
+    """Вызывается после фиксации правки, скрытия или удаления."""
+    feeds.drop(LATEST, *news_ids)
+
+
+def feed_key(pk=None):
+    return LATEST if pk is None else pk
+
+
+def etag(request, feed_format, pk=None):
+    if feed_format not in GENERATORS:
+        raise Http404('Неизвестный формат ленты.')
+    return f'{feeds.get(feed_key(pk)).etag}-{feed_format}'
+
+
+def last_modified(request, feed_format, pk=None):
+    return feeds.get(feed_key(pk)).last_modified
+
+
+@require_GET
+@condition(etag_func=etag, last_modified_func=last_modified)
+def feed_view(request, feed_format, pk=None):
+    feed = feeds.get(feed_key(pk))
+    return HttpResponse(
+        feed.body(feed_format, request.build_absolute_uri('/')[:-1]),
+        content_type=GENERATORS[feed_format].content_type,
+    )
@@ -1,4 +1,4 @@
-from django.forms import ModelForm
+from django.forms import HiddenInput, ModelForm
 from django.core.exceptions import ValidationError
 
 from .models import Comment
@@ -25,3 +25,15 @@ class CommentForm(ModelForm):
             if word in lowered_text:
                 raise ValidationError(WARNING)
         return text
+
+
+class NewCommentForm(CommentForm):
+    """Новый комментарий к новости, в том числе ответ на другой."""
+
+    class Meta(CommentForm.Meta):
+        fields = ('text', 'parent')
+        widgets = {'parent': HiddenInput}
+
+    def __init__(self, *args, news=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['parent'].queryset = Comment.objects.filter(news=news)
@@ -0,0 +1,64 @@
+"""
+Все комментарии пользователя, от новых к старым.
+
+Страницы идут по ключу (created, id) последнего показанного
+комментария, а не по смещению: каждая страница — поиск по индексу
+(author, created, id) в рабочей и архивной таблицах и слияние двух
+коротких списков, сколько бы комментариев ни было у автора.
+"""
+from datetime import datetime
+from heapq import merge
+
+from django.db.models import Q
+
+from .models import ArchivedComment, Comment
+
+SEPARATOR = '_'
+
+
+def cursor(comment):
+    """Ключ страницы после comment для параметра ?after."""
+    return f'{comment.created.isoformat()}{SEPARATOR}{comment.pk}'
+
+
+def parse_cursor(value):
+    """(created, id) из ?after или None для первой страницы."""
+    created, _, pk = (value or '').rpartition(SEPARATOR)
+    if not pk.isdigit():
+        return None
+    try:
+        return datetime.fromisoformat(created), int(pk)
+    except ValueError:
+        return None
+
+
+def author_comments(model, author, after, limit):
+    queryset = model.objects.filter(author=author)
+    if after is not None:
+        created, pk = after
+        # Условие created <= ? отдельно от OR: по нему SQLite ищет
+        # диапазон в индексе, а не перебирает новые строки автора.
+        queryset = queryset.filter(created__lte=created).filter(
+            Q(created__lt=created) | Q(pk__lt=pk)
+        )
+    return (
+        queryset.filter(news__is_hidden=False)
+        .select_related('news')
+        .only('created', 'text', 'text_html', 'news__title')
+        .order_by('-created', '-pk')[:limit]
+    )
+
+
+def history_page(author, after, per_page):
+    """Страница комментариев автора и ключ следующей или None."""
+    comments = list(merge(
+        *(
+            author_comments(model, author, after, per_page + 1)
+            for model in (Comment, ArchivedComment)
+        ),
+        key=lambda comment: (comment.created, comment.pk),
+        reverse=True,
+    ))[:per_page + 1]
+    if len(comments) > per_page:
+        return comments[:per_page], cursor(comments[per_page - 1])
+    return comments, None
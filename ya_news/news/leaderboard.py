@@ -0,0 +1,159 @@
+"""
+Самые обсуждаемые новости за последние MOST_DISCUSSED_DAYS дней.
+
+Комментарии считаются по дням в CommentBucket, сумма по окну лежит
+в DiscussionScore и меняется при каждом добавлении и удалении
+комментария. Когда окно сдвигается на новый день, из сумм вычитаются
+только выпавшие дни, а их корзины удаляются. Топ читается по индексу
+DiscussionScore.comments, поэтому стоит O(K), а не агрегацию по Comment.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.timezone import localdate
+
+from .models import Comment, CommentBucket, DiscussionScore
+
+BUCKETS = CommentBucket._meta.db_table
+SCORES = DiscussionScore._meta.db_table
+
+ADD_TO_BUCKET = (
+    f'INSERT INTO {BUCKETS} (news_id, day, comments) VALUES (%s, %s, %s) '
+    f'ON CONFLICT (news_id, day) '
+    f'DO UPDATE SET comments = comments + excluded.comments'
+)
+ADD_TO_SCORE = (
+    f'INSERT INTO {SCORES} (news_id, comments) VALUES (%s, %s) '
+    f'ON CONFLICT (news_id) '
+    f'DO UPDATE SET comments = comments + excluded.comments'
+)
+REMOVE_FROM_BUCKET = (
+    f'UPDATE {BUCKETS} SET comments = comments - %s '
+    f'WHERE news_id = %s AND day = %s'
+)
+REMOVE_FROM_SCORE = (
+    f'UPDATE {SCORES} SET comments = comments - %s WHERE news_id = %s'
+)
+SUBTRACT_EXPIRED = (
+    f'UPDATE {SCORES} SET comments = comments - ('
+    f'SELECT SUM(comments) FROM {BUCKETS} '
+    f'WHERE {BUCKETS}.news_id = {SCORES}.news_id AND day < %s'
+    f') WHERE news_id IN (SELECT news_id FROM {BUCKETS} WHERE day < %s)'
+)
+DELETE_EXPIRED = f'DELETE FROM {BUCKETS} WHERE day < %s'
+DELETE_EMPTY = f'DELETE FROM {SCORES} WHERE comments <= 0'
+
+_window_start = None
+
+
+def window_start():
+    """Первый день окна."""
+    return localdate() - timedelta(days=settings.MOST_DISCUSSED_DAYS - 1)
+
+
+def _bucket_counts(comments, start):
+    counts = Counter(
+        (comment.news_id, localdate(comment.created))
+        for comment in comments
+    )
+    buckets = [
+        (news_id, day.isoformat(), count)
+        for (news_id, day), count in counts.items()
+        if day >= start
+    ]
+    scores = Counter()
+    for news_id, _, count in buckets:
+        scores[news_id] += count
+    return buckets, scores
+
+
+def comments_added(comments):
+    """Учитывает сохранённые комментарии."""
+    buckets, scores = _bucket_counts(comments, window_start())
+    if not buckets:
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(ADD_TO_BUCKET, buckets)
+        cursor.executemany(ADD_TO_SCORE, list(scores.items()))
+
+
+def comments_removed(comments):
+    """Вычитает удалённые комментарии."""
+    buckets, scores = _bucket_counts(comments, window_start())
+    if not buckets:
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            REMOVE_FROM_BUCKET,
+            [(count, news_id, day) for news_id, day, count in buckets],
+        )
+        cursor.executemany(
+            REMOVE_FROM_SCORE,
+            [(count, news_id) for news_id, count in scores.items()],
+        )
+
+
+def news_archived(news_ids):
+    """
+    Убирает из окна новости, чьи комментарии ушли в архив.
+
+    Вызывается в транзакции переноса: rebuild считает только рабочую
+    таблицу и таких новостей тоже не увидит.
+    """
+    CommentBucket.objects.filter(news__in=news_ids).delete()
+    DiscussionScore.objects.filter(news__in=news_ids).delete()
+
+
+def slide():
+    """
+    Сдвигает окно на текущий день.
+
+    Процесс делает это раз в сутки. Вычитание и удаление корзин идут
+    в одной транзакции, поэтому одновременный сдвиг из другого процесса
+    уже не найдёт выпавших корзин и ничего не вычтет повторно.
+    """
+    global _window_start
+    start = window_start()
+    if start == _window_start:
+        return
+    start_string = start.isoformat()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(SUBTRACT_EXPIRED, [start_string, start_string])
+        cursor.execute(DELETE_EXPIRED, [start_string])
+        cursor.execute(DELETE_EMPTY)
+    _window_start = start
+
+
+def top(count):
+    """Самые обсуждаемые новости окна, не больше count."""
+    slide()
+    return list(
+        DiscussionScore.objects.filter(
+            comments__gt=0, news__is_hidden=False
+        ).select_related('news').only('comments', 'news__title')[:count]
+    )
+
+
+def rebuild():
+    """Пересчитывает корзины и суммы окна по таблице комментариев."""
+    global _window_start
+    start = window_start()
+    with transaction.atomic():
+        CommentBucket.objects.all().delete()
+        DiscussionScore.objects.all().delete()
+        comments = Comment.objects.filter(
+            created__date__gte=start
+        ).only('news_id', 'created').iterator()
+        buckets, scores = _bucket_counts(comments, start)
+        CommentBucket.objects.bulk_create(
+            CommentBucket(news_id=news_id, day=day, comments=count)
+            for news_id, day, count in buckets
+        )
+        DiscussionScore.objects.bulk_create(
+            DiscussionScore(news_id=news_id, comments=count)
+            for news_id, count in scores.items()
+        )
+    _window_start = start
+    return len(buckets)
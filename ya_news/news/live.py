@@ -0,0 +1,329 @@
+"""
+Новые комментарии к новости в реальном времени через Server-Sent Events.
+
+Поток /news/<pk>/live/ обслуживается ASGI-приложением events в обход
+Django: открытое соединение — это корутина с небольшой очередью
+и таймером пингов, а не поток. Комментарии публикуются после фиксации
+транзакции, брокер раздаёт уже закодированное событие подписчикам
+канала новости, по одному вызову call_soon_threadsafe на цикл событий.
+
+Очередь подписчика ограничена LIVE_QUEUE_SIZE: если клиент не успевает
+читать, очередь очищается и клиент получает событие reload.
+После переподключения браузер присылает Last-Event-ID, и пропущенные
+комментарии дочитываются из базы.
+"""
+import asyncio
+import json
+import re
+from collections import defaultdict, deque
+from threading import Lock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .models import Comment, News
+
+PATH = re.compile(r'^/news/(?P<pk>\d+)/live/$')
+HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+]
+PING = b': ping\n\n'
+RELOAD = b'event: reload\ndata: {}\n\n'
+ENCODER = json.JSONEncoder(
+    ensure_ascii=False, check_circular=False, separators=(',', ':'),
+)
+
+_lock = Lock()
+_broker = None
+
+
+def live_path(news_id):
+    return f'/news/{news_id}/live/'
+
+
+def channel(news_id):
+    return f'news:{news_id}'
+
+
+def comment_event(pk, parent_id, author, text_html, created, depth):
+    """Событие SSE с комментарием, id события — id комментария."""
+    data = ENCODER.encode({
+        'id': pk,
+        'parent': parent_id,
+        'author': author,
+        'text_html': text_html,
+        'created': created.isoformat(),
+        'depth': depth,
+    })
+    return f'id: {pk}\nevent: comment\ndata: {data}\n\n'.encode()
+
+
+def event_id(event):
+    """Номер комментария из первой строки события."""
+    return int(event[len(b'id: '):event.index(b'\n')])
+
+
+class Subscription:
+    """
+    События одного соединения, накопленные в его цикле событий.
+
+    Всё, что пришло, пока соединение отправляло прошлую порцию,
+    уходит следующей одной порцией. Пинги идут по своему таймеру,
+    поэтому доставка события создаёт только одно ожидание.
+    После replay события с id не больше seen отбрасываются: клиент
+    их уже получил.
+    """
+
+    __slots__ = (
+        'loop', 'size', 'events', 'lagged', 'ping', 'closed',
+        'waiter', 'timer', 'seen',
+    )
+
+    def __init__(self, loop, size):
+        self.loop = loop
+        self.size = size
+        self.events = deque()
+        self.lagged = False
+        self.ping = False
+        self.closed = False
+        self.waiter = None
+        self.timer = None
+        self.seen = None
+
+    def offer(self, event):
+        """Вызывается в цикле подписчика; переполнение не ждёт читателя."""
+        if self.seen is not None and event_id(event) <= self.seen:
+            return
+        if len(self.events) >= self.size:
+            self.lagged = True
+            self.events.clear()
+        else:
+            self.events.append(event)
+        self.wake()
+
+    def replay(self, events, last_id):
+        """
+        Ставит пропущенные события перед пришедшими от брокера.
+
+        Подписка открывается до чтения базы, поэтому брокер мог уже
+        прислать те же комментарии.
+        """
+        queued = list(self.events)
+        self.events.clear()
+        self.events.extend(events)
+        self.seen = event_id(events[-1]) if events else last_id
+        for event in queued:
+            self.offer(event)
+        self.wake()
+
+    def wake(self):
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    def start_pings(self, interval):
+        def tick():
+            self.ping = True
+            self.wake()
+            self.timer = self.loop.call_later(interval, tick)
+
+        self.timer = self.loop.call_later(interval, tick)
+
+    def close(self):
+        self.closed = True
+        if self.timer is not None:
+            self.timer.cancel()
+        self.wake()
+
+    async def next(self):
+        """Следующая порция для отправки или None, если соединение закрыто."""
+        while not (self.closed or self.lagged or self.events or self.ping):
+            self.waiter = self.loop.create_future()
+            await self.waiter
+            self.waiter = None
+        if self.closed:
+            return None
+        self.ping = False
+        if self.lagged:
+            self.lagged = False
+            self.events.clear()
+            return RELOAD
+        if self.events:
+            body = b''.join(self.events)
+            self.events.clear()
+            return body
+        return PING
+
+
+def deliver(subscriptions, event):
+    for subscription in subscriptions:
+        subscription.offer(event)
+
+
+class Broker:
+    """
+    Интерфейс брокера.
+
+    Брокер на несколько процессов получает события из общего канала
+    и раздаёт их локальным подписчикам так же, как LocalBroker.
+    """
+
+    def subscribe(self, channel, subscription):
+        raise NotImplementedError
+
+    def unsubscribe(self, channel, subscription):
+        raise NotImplementedError
+
+    def publish(self, channel, event):
+        raise NotImplementedError
+
+
+class LocalBroker(Broker):
+    """Раздача событий подписчикам внутри одного процесса."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._channels = defaultdict(set)
+
+    def subscribe(self, channel, subscription):
+        with self._lock:
+            self._channels[channel].add(subscription)
+
+    def unsubscribe(self, channel, subscription):
+        with self._lock:
+            subscriptions = self._channels.get(channel)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._channels[channel]
+
+    def subscribers(self, channel):
+        with self._lock:
+            return len(self._channels.get(channel, ()))
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscriptions = list(self._channels.get(channel, ()))
+        by_loop = defaultdict(list)
+        for subscription in subscriptions:
+            by_loop[subscription.loop].append(subscription)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(deliver, group, event)
+            except RuntimeError:
+                # Цикл уже закрыт, его соединений больше нет.
+                for subscription in group:
+                    self.unsubscribe(channel, subscription)
+
+
+def get_broker():
+    """Брокер из настройки LIVE_BROKER, один на процесс."""
+    global _broker
+    with _lock:
+        if _broker is None:
+            _broker = import_string(settings.LIVE_BROKER)()
+        return _broker
+
+
+def reset_broker():
+    global _broker
+    with _lock:
+        _broker = None
+
+
+def comments_created(comments):
+    """Публикует сохранённые комментарии; вызывается после фиксации."""
+    broker = get_broker()
+    for comment in comments:
+        broker.publish(channel(comment.news_id), comment_event(
+            comment.pk, comment.parent_id, comment.author.username,
+            comment.text_html, comment.created, comment.depth,
+        ))
+
+
+def news_is_live(news_id):
+    return News.objects.filter(
+        pk=news_id, is_hidden=False, is_archived=False
+    ).exists()
+
+
+def missed_events(news_id, last_id, limit):
+    """События после last_id или None, если их больше limit."""
+    rows = list(
+        Comment.objects.filter(news_id=news_id, pk__gt=last_id)
+        .order_by('pk')
+        .values_list(
+            'pk', 'parent_id', 'author__username', 'text_html',
+            'created', 'depth',
+        )[:limit + 1]
+    )
+    if len(rows) > limit:
+        return None
+    return [comment_event(*row) for row in rows]
+
+
+def last_event_id(scope):
+    for name, value in scope.get('headers', ()):
+        if name == b'last-event-id' and value.isdigit():
+            return int(value)
+    return None
+
+
+async def wait_disconnect(receive, subscription):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+    subscription.close()
+
+
+async def not_found(send):
+    await send({
+        'type': 'http.response.start',
+        'status': 404,
+        'headers': [(b'content-type', b'text/plain; charset=utf-8')],
+    })
+    await send({
+        'type': 'http.response.body', 'body': 'Новость не найдена.'.encode(),
+    })
+
+
+async def events(scope, receive, send, news_id):
+    """ASGI-приложение потока событий одной новости."""
+    if not await sync_to_async(news_is_live)(news_id):
+        await not_found(send)
+        return
+    size = settings.LIVE_QUEUE_SIZE
+    subscription = Subscription(asyncio.get_running_loop(), size)
+    broker = get_broker()
+    broker.subscribe(channel(news_id), subscription)
+    disconnect = asyncio.ensure_future(
+        wait_disconnect(receive, subscription)
+    )
+    try:
+        await send({
+            'type': 'http.response.start', 'status': 200, 'headers': HEADERS,
+        })
+        last_id = last_event_id(scope)
+        if last_id is not None:
+            missed = await sync_to_async(missed_events)(
+                news_id, last_id, size
+            )
+            if missed is None:
+                subscription.lagged = True
+            else:
+                subscription.replay(missed, last_id)
+        subscription.start_pings(settings.LIVE_HEARTBEAT)
+        while True:
+            body = await subscription.next()
+            if body is None:
+                break
+            await send({
+                'type': 'http.response.body', 'body': body,
+                'more_body': True,
+            })
+    finally:
+        broker.unsubscribe(channel(news_id), subscription)
+        subscription.close()
+        disconnect.cancel()
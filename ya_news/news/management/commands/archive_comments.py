@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils.timezone import localdate
+
+from news.archive import archive_before
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит комментарии старых новостей в архивную таблицу, '
+        'чтобы рабочая таблица и её индексы оставались небольшими.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=365,
+            help='Архивировать новости старше этого количества дней.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Примерное количество комментариев в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        day = localdate() - timedelta(days=options['older_than_days'])
+        news, comments = archive_before(
+            day, options['batch_size'], self.report,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Архивировано новостей: {news}, комментариев: {comments}.'
+        ))
+
+    def report(self, news, comments):
+        self.stdout.write(
+            f'Перенесено новостей: {news}, комментариев: {comments}.'
+        )
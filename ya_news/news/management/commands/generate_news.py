@@ -0,0 +1,179 @@
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from news import leaderboard, months
+from news.models import (
+    PATH_WIDTH, Comment, News, make_excerpt, make_text_html,
+)
+from yacommon.synthetic import (
+    USER_COLUMNS, TextGenerator, deferred_indexes, fast_load,
+    format_datetime, insert_rows, next_id, user_rows,
+)
+
+USER_TABLE = 'auth_user'
+COMMENT_DAYS = 3
+MAX_VIEWS = 100000
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро заполняет базу детерминированными пользователями, '
+        'новостями и комментариями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--news', type=int, default=10000)
+        parser.add_argument(
+            '--comments', type=int, default=100000,
+            help='Общее количество комментариев.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней до --until распределить даты.',
+        )
+        parser.add_argument(
+            '--until', type=date.fromisoformat, default=date.today(),
+            help='Последний день периода (YYYY-MM-DD).',
+        )
+        parser.add_argument('--batch-size', type=int, default=50000)
+        parser.add_argument(
+            '--keep-indexes', action='store_true',
+            help='Не перестраивать индексы: быстрее для небольших добавок.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда рассчитана только на SQLite.')
+        if options['comments'] and not (options['users'] and options['news']):
+            raise CommandError('Комментариям нужны пользователи и новости.')
+        generator = TextGenerator(options['seed'])
+        days = options['days']
+        first_day = options['until'] - timedelta(days=days)
+        day_strings = [
+            (first_day + timedelta(days=offset)).isoformat()
+            for offset in range(days + 1)
+        ]
+        # Комментарии не позже --until и не в будущем.
+        latest = format_datetime(min(
+            datetime.combine(options['until'], time.max),
+            timezone.now().replace(tzinfo=None),
+        ))
+        news_table = News._meta.db_table
+        comment_table = Comment._meta.db_table
+        first_user = next_id(USER_TABLE)
+        first_news = next_id(news_table)
+        first_comment = next_id(comment_table)
+        news_days = [
+            generator.random.randrange(days) for _ in range(options['news'])
+        ]
+        title_length = News._meta.get_field('title').max_length
+        started = perf_counter()
+        tables = [USER_TABLE, news_table, comment_table]
+        with fast_load(), deferred_indexes(
+                [] if options['keep_indexes'] else tables):
+            total = insert_rows(
+                USER_TABLE, USER_COLUMNS,
+                user_rows(
+                    generator, first_user, options['users'],
+                    datetime.combine(first_day, time.min),
+                ),
+                options['batch_size'],
+            )
+            total += insert_rows(
+                news_table,
+                (
+                    'id', 'title', 'text', 'excerpt', 'date', 'views',
+                    'is_hidden', 'is_archived',
+                ),
+                self.news_rows(
+                    generator, first_news, news_days, day_strings,
+                    title_length,
+                ),
+                options['batch_size'],
+            )
+            total += insert_rows(
+                comment_table,
+                (
+                    'id', 'news_id', 'author_id', 'text', 'text_html',
+                    'created', 'path', 'depth',
+                ),
+                self.comment_rows(
+                    generator, options['comments'], options['users'],
+                    first_user, first_news, first_comment,
+                    news_days, day_strings, latest,
+                ),
+                options['batch_size'],
+            )
+        # Новости и комментарии вставлены в обход сигналов.
+        months.rebuild()
+        leaderboard.rebuild()
+        elapsed = perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано строк: {total} за {elapsed:.1f} с '
+            f'({total / elapsed:.0f} строк/с).'
+        ))
+
+    def news_rows(self, generator, first_news, news_days, day_strings,
+                  title_length):
+        """Строки новостей с готовыми анонсами."""
+        for index, news_day in enumerate(news_days):
+            title = generator.title(title_length)
+            text = generator.paragraph()
+            yield (
+                first_news + index,
+                title,
+                text,
+                make_excerpt(text),
+                day_strings[news_day],
+                int(MAX_VIEWS * generator.random.random() ** 3),
+                False,
+                False,
+            )
+
+    def comment_rows(self, generator, count, users_count, first_user,
+                     first_news, first_comment, news_days, day_strings,
+                     latest):
+        """
+        Строки комментариев.
+
+        Время собирается из готовых строк, чтобы генерация не отставала
+        от executemany. Комментарии распределены неравномерно,
+        как у популярных и непопулярных публикаций. Все комментарии
+        верхнего уровня, путь ветки — их собственный id. Тексты берутся
+        из пула, поэтому их HTML готовится один раз на пул.
+        Даты комментариев к последним новостям обрезаются до latest.
+        """
+        pool = generator.pool
+        pool_html = [make_text_html(text) for text in pool]
+        pool_size = len(pool)
+        clock = [
+            f'{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}'
+            for second in range(86400)
+        ]
+        rand = generator.random.random
+        news_count = len(news_days)
+        last_day = len(day_strings) - 1
+        for comment_id in range(first_comment, first_comment + count):
+            index = int(news_count * rand() ** 3)
+            day = min(
+                news_days[index] + int((COMMENT_DAYS + 1) * rand()), last_day,
+            )
+            author_id = first_user + int(users_count * rand())
+            text_index = int(pool_size * rand())
+            created = f'{day_strings[day]} {clock[int(86400 * rand())]}'
+            yield (
+                comment_id,
+                first_news + index,
+                author_id,
+                pool[text_index],
+                pool_html[text_index],
+                min(created, latest),
+                f'{comment_id:0{PATH_WIDTH}d}',
+                0,
+            )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from news.purge import purge_hidden
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет скрытые новости вместе с комментариями небольшими '
+        'порциями, не блокируя базу надолго.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Сколько комментариев удалять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Пауза между порциями в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_hidden(
+            options['chunk_size'], options['pause'], self.report,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено новостей: {purged}.'
+        ))
+
+    def report(self, news, deleted, total):
+        self.stdout.write(
+            f'Новость {news.pk} «{news}»: удалено комментариев '
+            f'{deleted} из {total}.'
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from news import leaderboard
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики самых обсуждаемых новостей по комментариям, '
+        'например после загрузки данных в обход сигналов.'
+    )
+
+    def handle(self, *args, **options):
+        buckets = leaderboard.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано дневных корзин: {buckets}.'
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from news import months
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает архив новостей по месяцам, '
+        'например после загрузки данных в обход сигналов.'
+    )
+
+    def handle(self, *args, **options):
+        count = months.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано месяцев: {count}.'
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from news.rendering import RENDERED, render_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет анонсы новостей и HTML комментариев, '
+        'созданных в обход save() или до появления этих полей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Сколько строк обновлять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--all', action='store_true', dest='everything',
+            help='Пересчитать все строки, например после смены длины анонса.',
+        )
+
+    def handle(self, *args, **options):
+        for model in RENDERED:
+            rendered = render_rows(
+                model, options['chunk_size'], options['everything'],
+                self.report,
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}: обновлено {rendered}.'
+            ))
+
+    def report(self, model, rendered):
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {rendered}…')
@@ -0,0 +1,37 @@
+"""Промежуточные слои приложения."""
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+
+from yacommon import middleware
+
+from . import edge_cache
+from .models import RequestProfile
+
+
+class ProfilerMiddleware(middleware.ProfilerMiddleware):
+    """Профилировщик запросов, профили пишутся в RequestProfile."""
+    model = RequestProfile
+
+
+class AnonymousCacheMiddleware:
+    """
+    Отдаёт кэшируемые страницы анонимам в обход сессий и CSRF.
+
+    Включается настройкой ANONYMOUS_CACHE, см. news/edge_cache.py.
+    Должен стоять перед SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.ANONYMOUS_CACHE:
+            return self.get_response(request)
+        match = edge_cache.cacheable_match(request)
+        if match is None:
+            return self.get_response(request)
+        if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+            return edge_cache.serve(request, match)
+        response = self.get_response(request)
+        patch_cache_control(response, private=True)
+        return response
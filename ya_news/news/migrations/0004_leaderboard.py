@@ -0,0 +1,49 @@
+# Generated by Django 3.2.15 on 2026-10-19 13:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_news_views'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('comments', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DiscussionScore',
+            fields=[
+                ('news', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='news.news')),
+                ('comments', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('-comments', '-news_id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='discussionscore',
+            index=models.Index(fields=['comments', 'news'], name='news_discus_comment_64fdd9_idx'),
+        ),
+        migrations.AddField(
+            model_name='commentbucket',
+            name='news',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='news.news'),
+        ),
+        migrations.AddIndex(
+            model_name='commentbucket',
+            index=models.Index(fields=['day'], name='news_commen_day_4a7140_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='commentbucket',
+            constraint=models.UniqueConstraint(fields=('news', 'day'), name='unique_news_day_bucket'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.15 on 2026-10-19 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_comment_threads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='is_hidden',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='Скрыта и ждёт удаления'),
+        ),
+    ]
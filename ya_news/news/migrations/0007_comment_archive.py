@@ -0,0 +1,48 @@
+# Generated by Django 3.2.15 on 2026-10-19 13:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('news', '0006_news_is_hidden'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='is_archived',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Комментарии в архиве'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('path', models.TextField(default='', editable=False)),
+                ('depth', models.PositiveSmallIntegerField(default=0, editable=False)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('news', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='news.news')),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='news.archivedcomment', verbose_name='Ответ на')),
+            ],
+            options={
+                'verbose_name': 'Архивный комментарий',
+                'verbose_name_plural': 'Архивные комментарии',
+                'ordering': ('created',),
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['news', 'path'], name='news_archiv_news_id_3076a6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['news', 'depth', 'path'], name='news_archiv_news_id_6741c1_idx'),
+        ),
+    ]
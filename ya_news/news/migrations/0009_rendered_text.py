@@ -0,0 +1,59 @@
+# Generated by Django 3.2.15 on 2026-10-19 13:53
+
+from django.db import migrations, models
+
+from news.models import make_excerpt, make_text_html
+
+CHUNK_SIZE = 1000
+# Модель: исходное поле, подготовленное поле и функция подготовки,
+# как news.rendering.RENDERED.
+RENDERED = (
+    ('News', 'text', 'excerpt', make_excerpt),
+    ('Comment', 'text', 'text_html', make_text_html),
+    ('ArchivedComment', 'text', 'text_html', make_text_html),
+)
+
+
+def fill_rendered(apps, schema_editor):
+    """Заполняет новые поля у уже созданных строк порциями по pk."""
+    db = schema_editor.connection.alias
+    for name, source, target, render in RENDERED:
+        model = apps.get_model('news', name)
+        queryset = (
+            model.objects.using(db).order_by('pk').only(source, target)
+        )
+        last_pk = 0
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_pk)[:CHUNK_SIZE])
+            if not chunk:
+                break
+            for obj in chunk:
+                setattr(obj, target, render(getattr(obj, source)))
+            model.objects.using(db).bulk_update(chunk, [target])
+            last_pk = chunk[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0008_news_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='text_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='text_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='excerpt',
+            field=models.TextField(default='', editable=False, verbose_name='Анонс'),
+        ),
+        migrations.RunPython(fill_rendered, migrations.RunPython.noop),
+    ]
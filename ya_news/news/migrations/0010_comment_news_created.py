@@ -0,0 +1,21 @@
+# Generated by Django 3.2.15 on 2026-10-19 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_rendered_text'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['news', 'created'], name='news_archiv_news_id_8ca567_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['news', 'created'], name='news_commen_news_id_b83898_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.15 on 2026-10-19 14:13
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+def fill_months(apps, schema_editor):
+    """Считает месяцы по уже опубликованным новостям, как months.rebuild."""
+    db = schema_editor.connection.alias
+    News = apps.get_model('news', 'News')
+    NewsMonth = apps.get_model('news', 'NewsMonth')
+    rows = (
+        News.objects.using(db).filter(is_hidden=False)
+        .annotate(month=TruncMonth('date'))
+        .order_by().values('month').annotate(count=Count('pk'))
+    )
+    NewsMonth.objects.using(db).bulk_create(
+        NewsMonth(month=row['month'], news=row['count']) for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0010_comment_news_created'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True)),
+                ('news', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('-month',),
+            },
+        ),
+        migrations.RunPython(fill_months, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.15 on 2026-10-19 14:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0011_news_month'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedcomment',
+            index=models.Index(fields=['author', 'created', 'id'], name='news_archiv_author__08369b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['author', 'created', 'id'], name='news_commen_author__01372b_idx'),
+        ),
+    ]
@@ -1,13 +1,40 @@
 from datetime import datetime
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+# Путь комментария — id всех предков и его самого по PATH_WIDTH цифр.
+PATH_WIDTH = 10
+# Символ сразу после цифр: [path, path + PATH_END) — всё поддерево.
+PATH_END = ':'
+# Длина анонса новости в словах.
+EXCERPT_WORDS = 15
+
+
+def make_excerpt(text):
+    """Анонс как у фильтра truncatewords."""
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
+def make_text_html(text):
+    """Текст комментария, экранированный и с <br> вместо переводов строк."""
+    return str(linebreaksbr(text, autoescape=True))
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
-    date = models.DateField(default=datetime.today)
+    date = models.DateField(default=datetime.today, db_index=True)
+    views = models.PositiveIntegerField('Просмотры', default=0, db_index=True)
+    is_hidden = models.BooleanField(
+        'Скрыта и ждёт удаления', default=False, db_index=True,
+    )
+    is_archived = models.BooleanField(
+        'Комментарии в архиве', default=False, editable=False,
+    )
+    excerpt = models.TextField('Анонс', default='', editable=False)
 
     class Meta:
         ordering = ('-date',)
@@ -17,8 +44,16 @@ class News(models.Model):
     def __str__(self):
         return self.title
 
+    def render(self):
+        self.excerpt = make_excerpt(self.text)
 
-class Comment(models.Model):
+    def save(self, *args, **kwargs):
+        self.render()
+        super().save(*args, **kwargs)
+
+
+class AbstractComment(models.Model):
+    """Поля комментария, общие для рабочей и архивной таблиц."""
     news = models.ForeignKey(
         News,
         on_delete=models.CASCADE
@@ -29,9 +64,143 @@ class Comment(models.Model):
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='replies',
+        verbose_name='Ответ на',
+    )
+    path = models.TextField(default='', editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    text_html = models.TextField(default='', editable=False)
 
     class Meta:
+        abstract = True
         ordering = ('created',)
+        indexes = (
+            models.Index(fields=('news', 'path')),
+            models.Index(fields=('news', 'depth', 'path')),
+            models.Index(fields=('news', 'created')),
+            models.Index(fields=('author', 'created', 'id')),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+    def render(self):
+        self.text_html = make_text_html(self.text)
+
+    def save(self, *args, **kwargs):
+        self.render()
+        super().save(*args, **kwargs)
+
+
+class Comment(AbstractComment):
+    is_archived = False
+
+    class Meta(AbstractComment.Meta):
+        pass
+
+    def set_depth(self):
+        self.depth = self.parent.depth + 1 if self.parent_id else 0
+
+    def save(self, *args, **kwargs):
+        """
+        Новый комментарий получает путь после вставки, когда известен id.
+
+        Пачки из bulk_create дополняются путями через threads.fill_paths.
+        """
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        self.set_depth()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.path = (
+                (self.parent.path if self.parent_id else '')
+                + f'{self.pk:0{PATH_WIDTH}d}'
+            )
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+
+
+class ArchivedComment(AbstractComment):
+    """
+    Комментарий к старой новости, перенесённый командой archive_comments.
+
+    id и пути сохраняются, поэтому ветки читаются теми же запросами.
+    """
+    is_archived = True
+
+    class Meta(AbstractComment.Meta):
+        verbose_name = 'Архивный комментарий'
+        verbose_name_plural = 'Архивные комментарии'
+
+
+class CommentBucket(models.Model):
+    """Количество комментариев к новости за один день."""
+    news = models.ForeignKey(News, on_delete=models.CASCADE)
+    day = models.DateField()
+    comments = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('news', 'day'), name='unique_news_day_bucket'
+            ),
+        )
+        indexes = (models.Index(fields=('day',)),)
+
+
+class DiscussionScore(models.Model):
+    """Количество комментариев к новости за последние дни."""
+    news = models.OneToOneField(
+        News, on_delete=models.CASCADE, primary_key=True,
+    )
+    comments = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ('-comments', '-news_id')
+        indexes = (models.Index(fields=('comments', 'news')),)
+
+    def __str__(self):
+        return f'{self.news}: {self.comments}'
+
+
+class NewsMonth(models.Model):
+    """Количество видимых новостей за месяц, month — его первый день."""
+    month = models.DateField(unique=True)
+    news = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ('-month',)
+
+    def __str__(self):
+        return f'{self.month:%Y-%m}: {self.news}'
+
+
+class RequestProfile(models.Model):
+    """Профиль запроса, снятый по требованию сотрудника."""
+    created = models.DateTimeField(auto_now_add=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+    )
+    method = models.CharField(max_length=10)
+    path = models.TextField()
+    view_name = models.CharField(max_length=200, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    duration = models.FloatField('Длительность, мс')
+    mode = models.CharField(max_length=20)
+    report = models.TextField('Отчёт')
+    collapsed = models.TextField('Стеки в формате collapsed')
+
+    class Meta:
+        ordering = ('-created',)
+        verbose_name = 'Профиль запроса'
+        verbose_name_plural = 'Профили запросов'
+
+    def __str__(self):
+        return f'{self.method} {self.path}'
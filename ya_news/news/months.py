@@ -0,0 +1,104 @@
+"""
+Архив новостей по месяцам.
+
+Количество видимых новостей за месяц лежит в NewsMonth и меняется
+при сохранении, скрытии и удалении новости, поэтому навигация
+по архиву — это чтение нескольких десятков строк, а не GROUP BY
+по всей таблице News. Страница месяца выбирается по индексу News.date.
+"""
+from collections import Counter
+from datetime import date, datetime
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+from .models import News, NewsMonth
+
+MONTHS = NewsMonth._meta.db_table
+
+ADD_TO_MONTH = (
+    f'INSERT INTO {MONTHS} (month, news) VALUES (%s, %s) '
+    f'ON CONFLICT (month) DO UPDATE SET news = news + excluded.news'
+)
+
+
+def month_of(day):
+    """Первый день месяца; News.date до перечитывания может быть datetime."""
+    if isinstance(day, datetime):
+        day = day.date()
+    return day.replace(day=1)
+
+
+def next_month(month):
+    if month.month == 12:
+        return date(month.year + 1, 1, 1)
+    return date(month.year, month.month + 1, 1)
+
+
+def add(changes):
+    """Прибавляет к месяцам числа из Counter {первый день месяца: число}."""
+    rows = [
+        (month.isoformat(), count)
+        for month, count in changes.items() if count
+    ]
+    if not rows:
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(ADD_TO_MONTH, rows)
+
+
+def state(news):
+    """Месяц, в котором новость видна, или None для скрытой."""
+    return None if news.is_hidden else month_of(news.date)
+
+
+def news_saved(before, after):
+    """Учитывает переход новости из месяца before в after; None — скрыта."""
+    changes = Counter()
+    if before is not None:
+        changes[before] -= 1
+    if after is not None:
+        changes[after] += 1
+    add(changes)
+
+
+def news_hidden(queryset):
+    """Вычитает новости, которые сейчас будут скрыты одним UPDATE."""
+    add(Counter({
+        month_of(day): -count
+        for day, count in Counter(
+            queryset.filter(is_hidden=False).values_list('date', flat=True)
+        ).items()
+    }))
+
+
+def sidebar():
+    """Месяцы с новостями, от новых к старым, одним запросом."""
+    return list(NewsMonth.objects.filter(news__gt=0))
+
+
+def month_page(month, page, per_page):
+    """Новости месяца для страницы page и признак следующей страницы."""
+    news_list = list(
+        News.objects.filter(
+            is_hidden=False, date__gte=month, date__lt=next_month(month),
+        ).only('title', 'date', 'excerpt').order_by('-date', '-pk')
+        [(page - 1) * per_page:page * per_page + 1]
+    )
+    return news_list[:per_page], len(news_list) > per_page
+
+
+def rebuild():
+    """Пересчитывает месяцы по таблице новостей."""
+    with transaction.atomic():
+        NewsMonth.objects.all().delete()
+        rows = (
+            News.objects.filter(is_hidden=False)
+            .annotate(month=TruncMonth('date'))
+            .order_by().values('month').annotate(count=Count('pk'))
+        )
+        NewsMonth.objects.bulk_create(
+            NewsMonth(month=row['month'], news=row['count']) for row in rows
+        )
+    return NewsMonth.objects.count()
@@ -0,0 +1,71 @@
+"""
+Удаление скрытых новостей небольшими порциями.
+
+Каскадное удаление новости загружает в память все её комментарии
+и держит блокировку SQLite до конца. Здесь комментарии удаляются
+порциями в коротких транзакциях обычным QuerySet.delete(), поэтому
+pre_delete и post_delete приходят для каждого комментария, а между
+порциями база свободна для других запросов.
+"""
+from functools import partial
+from time import sleep
+
+from django.db import transaction
+
+from . import months, updates
+from .models import News
+from .threads import comment_model
+
+
+def hide(queryset):
+    """Скрывает новости сразу, удаление остаётся purge_hidden_news."""
+    news_ids = list(queryset.values_list('pk', flat=True))
+    with transaction.atomic():
+        months.news_hidden(queryset)
+        hidden = queryset.update(is_hidden=True)
+    updates.news_changed.defer(news_ids)
+    return hidden
+
+
+def purge_news(news, chunk_size=500, pause=0.0, progress=None):
+    """
+    Удаляет комментарии новости порциями, затем саму новость.
+
+    Комментарии архивной новости удаляются из архивной таблицы.
+    Порции идут по убыванию пути, то есть ответы раньше родителей:
+    удаляемые комментарии не тянут за собой каскадом ничего
+    за пределами порции. progress(удалено, всего) вызывается после
+    каждой порции. Возвращает количество удалённых комментариев.
+    """
+    model = comment_model(news)
+    comments = model.objects.filter(news=news)
+    total = comments.count()
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(
+                comments.order_by('-path').values_list('pk', flat=True)
+                [:chunk_size]
+            )
+            if not chunk:
+                break
+            model.objects.filter(pk__in=chunk).delete()
+        deleted += len(chunk)
+        if progress is not None:
+            progress(deleted, total)
+        if pause:
+            sleep(pause)
+    news.delete()
+    return deleted
+
+
+def purge_hidden(chunk_size=500, pause=0.0, progress=None):
+    """Удаляет все скрытые новости, progress(новость, удалено, всего)."""
+    purged = 0
+    for news in News.objects.filter(is_hidden=True).order_by('pk'):
+        purge_news(
+            news, chunk_size, pause,
+            progress and partial(progress, news),
+        )
+        purged += 1
+    return purged
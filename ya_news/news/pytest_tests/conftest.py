@@ -1,12 +1,76 @@
 """Модуль фикстур для тестов приложения."""
-from datetime import datetime, timedelta
-
 from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
 from django.test.client import Client
+from django.test.utils import (
+    override_settings, setup_databases, teardown_databases,
+)
 from django.urls import reverse
 import pytest
 
+from news.counters import news_views
 from news.models import News, Comment
+from news.pytest_tests.factories import make_comments, make_news
+from yacommon import snapshot
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(request, django_test_environment, django_db_blocker,
+                    django_db_createdb):
+    """Фикстура тестовой базы, восстанавливаемой из снимка миграций."""
+    verbosity = request.config.option.verbose
+    with django_db_blocker.unblock():
+        restored = (
+            None if django_db_createdb
+            else snapshot.restore(DEFAULT_DB_ALIAS)
+        )
+        if restored:
+            db_cfg = [restored]
+        else:
+            db_cfg = setup_databases(verbosity=verbosity, interactive=False)
+            snapshot.save(DEFAULT_DB_ALIAS)
+    yield
+    with django_db_blocker.unblock():
+        teardown_databases(db_cfg, verbosity=verbosity)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def fast_password_hasher():
+    """Фикстура быстрого хеширования паролей, например для admin_client."""
+    with override_settings(
+        PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']
+    ):
+        yield
+
+
+@pytest.fixture(scope='session', autouse=True)
+def view_counter_without_thread():
+    """Фикстура, отключающая фоновую запись счётчиков просмотров."""
+    with override_settings(VIEW_COUNTER_FLUSH_INTERVAL=0):
+        yield
+
+
+@pytest.fixture(scope='session', autouse=True)
+def tasks_in_sync():
+    """Фикстура, выполняющая отложенные задачи сразу после фиксации."""
+    with override_settings(TASKS_SYNC=True):
+        yield
+
+
+@pytest.fixture(scope='session', autouse=True)
+def static_without_manifest():
+    """Фикстура, отдающая статику без collectstatic и манифеста."""
+    with override_settings(STATICFILES_STORAGE=(
+        'django.contrib.staticfiles.storage.StaticFilesStorage'
+    )):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def pending_views():
+    """Фикстура, не дающая просмотрам одного теста попасть в другой."""
+    yield news_views.pending
+    news_views.pending.drain()
 
 
 @pytest.fixture
@@ -61,22 +125,13 @@ def comment(author, news):
 @pytest.fixture
 def bunch_of_news():
     """Фикстура создающая несколько объектов новостей."""
-    today = datetime.now()
-    all_news = [
-        News(title=f'Новость {index}', text='Просто текст.',
-             date=today - timedelta(days=index))
-        for index in range(settings.NEWS_COUNT_ON_HOME_PAGE + 1)
-    ]
-    News.objects.bulk_create(all_news)
+    return make_news(settings.NEWS_COUNT_ON_HOME_PAGE + 1)
 
 
 @pytest.fixture
 def bunch_of_comments(author, news):
     """Фикстура создающая несколько объектов комментариев."""
-    for index in range(10):
-        Comment.objects.create(
-            news=news, author=author, text=f'Tекст {index}',
-        )
+    return make_comments(news, author, 10)
 
 
 @pytest.fixture
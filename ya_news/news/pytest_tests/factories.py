@@ -0,0 +1,49 @@
+"""Фабрики объектов для тестов: всё создаётся одним bulk_create."""
+from datetime import datetime, timedelta
+
+from news.models import Comment, News
+from news.threads import fill_paths
+
+
+def rendered(objects):
+    """Заполняет подготовленные поля, которые bulk_create пропускает."""
+    for obj in objects:
+        obj.render()
+        yield obj
+
+
+def make_news(count, **fields):
+    """Создаёт count новостей с датами по убыванию от сегодняшней."""
+    today = datetime.today()
+    News.objects.bulk_create(rendered(
+        News(
+            **{
+                'title': f'Новость {index}',
+                'text': 'Просто текст.',
+                'date': today - timedelta(days=index),
+                **fields,
+            }
+        )
+        for index in range(count)
+    ))
+    return list(News.objects.order_by('-pk')[:count])[::-1]
+
+
+def make_comments(news, author, count, **fields):
+    """Создаёт count комментариев автора к новости."""
+    Comment.objects.bulk_create(rendered(
+        Comment(
+            **{
+                'news': news,
+                'author': author,
+                'text': f'Tекст {index}',
+                **fields,
+            }
+        )
+        for index in range(count)
+    ))
+    last_pk = Comment.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first()
+    fill_paths(last_pk - count + 1, last_pk)
+    return list(news.comment_set.all())
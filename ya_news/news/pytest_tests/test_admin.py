@@ -0,0 +1,138 @@
+"""Модуль тестов админки новостей на большом количестве комментариев."""
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+import pytest
+
+from news.admin import INLINE_COMMENTS
+from news.archive import move
+from news.models import Comment, News
+
+COMMENTS = 100000
+MAX_QUERIES = 12
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def popular_news():
+    """Фикстура 100 тысяч комментариев, возвращает самую обсуждаемую."""
+    call_command(
+        'generate_news', '--users=50', '--news=100',
+        f'--comments={COMMENTS}', stdout=StringIO(),
+    )
+    return News.objects.annotate(
+        count=Count('comment')
+    ).order_by('-count').first()
+
+
+def get(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return response, context.captured_queries
+
+
+def test_changelist_counts_comments_per_page(admin_client, popular_news):
+    """Список новостей считает комментарии только для своей страницы."""
+    response, queries = get(
+        admin_client, reverse('admin:news_news_changelist')
+    )
+    assert len(queries) <= MAX_QUERIES
+    rows = {
+        news.pk: news.comments_count
+        for news in response.context['cl'].result_list
+    }
+    assert rows[popular_news.pk] == popular_news.count
+    assert all(
+        ' IN (' in query['sql']
+        for query in queries if '"news_comment"' in query['sql']
+    )
+
+
+def test_change_pages_do_not_load_all_rows(admin_client, popular_news):
+    """
+    Страница новости показывает последние комментарии без форм.
+
+    Все комментарии открываются постранично, автор выбирается поиском.
+    """
+    response, queries = get(
+        admin_client,
+        reverse('admin:news_news_change', args=(popular_news.pk,)),
+    )
+    assert len(queries) <= MAX_QUERIES
+    formset = response.context['inline_admin_formsets'][0].formset
+    assert [form.instance.pk for form in formset.forms] == list(
+        Comment.objects.filter(news=popular_news)
+        .order_by('-pk').values_list('pk', flat=True)[:INLINE_COMMENTS]
+    )
+    content = response.content.decode()
+    assert 'comment_set-0-author' not in content
+    assert f'?news__id__exact={popular_news.pk}' in content
+    changelist = reverse('admin:news_comment_changelist')
+    response, queries = get(
+        admin_client, f'{changelist}?news__id__exact={popular_news.pk}'
+    )
+    assert len(queries) <= MAX_QUERIES
+    assert response.context['cl'].result_count == popular_news.count
+    comment = Comment.objects.filter(news=popular_news).first()
+    response, queries = get(
+        admin_client, reverse('admin:news_comment_change', args=(comment.pk,))
+    )
+    assert len(queries) <= MAX_QUERIES
+    assert response.content.decode().count('<option') == 1
+
+
+def test_change_page_saves_with_inline(admin_client, news, comment):
+    """Новость сохраняется вместе с формами комментариев только для чтения."""
+    url = reverse('admin:news_news_change', args=(news.pk,))
+    formset = admin_client.get(url).context['inline_admin_formsets'][0].formset
+    data = {
+        'title': 'Новый заголовок', 'text': news.text,
+        'date': '2024-01-31', 'views': 0,
+    }
+    data.update(
+        (f'{formset.prefix}-{key}', value)
+        for key, value in formset.management_form.initial.items()
+    )
+    data[f'{formset.prefix}-0-id'] = comment.pk
+    data[f'{formset.prefix}-0-news'] = news.pk
+    response = admin_client.post(url, data)
+    assert response.status_code == HTTPStatus.FOUND
+    news.refresh_from_db()
+    assert news.title == 'Новый заголовок'
+    assert Comment.objects.get().text == comment.text
+
+
+def test_saved_comment_keeps_news_and_parent(admin_client, news, comment):
+    """У сохранённого комментария новость и родитель только для чтения."""
+    other = News.objects.create(title='Другая', text='Текст')
+    url = reverse('admin:news_comment_change', args=(comment.pk,))
+    form = admin_client.get(url).context['adminform'].form
+    assert 'news' not in form.fields and 'parent' not in form.fields
+    admin_client.post(url, {
+        'news': other.pk, 'author': comment.author.pk, 'text': 'Новый текст',
+    })
+    comment.refresh_from_db()
+    assert comment.news == news
+    assert comment.text == 'Новый текст'
+    add_form = admin_client.get(
+        reverse('admin:news_comment_add')
+    ).context['adminform'].form
+    assert 'news' in add_form.fields
+
+
+def test_delete_summary_counts_archived_comments(admin_client, news, comment):
+    """Подтверждение удаления считает и архивные комментарии."""
+    move([news.pk])
+    response = admin_client.get(
+        reverse('admin:news_news_delete', args=(news.pk,))
+    )
+    assert dict(response.context['model_count']) == {
+        'Новости': 1, 'Архивные комментарии': 1,
+    }
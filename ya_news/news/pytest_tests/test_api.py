@@ -0,0 +1,118 @@
+"""Модуль тестов JSON API."""
+from datetime import timedelta
+from http import HTTPStatus
+import json
+
+from asgiref.sync import async_to_sync
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.urls import reverse
+from django.utils import timezone
+import pytest
+
+from news.api import COMMENT_ORDERING
+from news.models import Comment, News
+from news.pytest_tests.factories import make_comments
+from yanews.asgi import application
+
+pytestmark = pytest.mark.django_db
+
+
+def streamed_json(response):
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'] == 'application/json'
+    return json.loads(b''.join(response.streaming_content))
+
+
+def test_news_list_follows_home_ordering(client, bunch_of_news, comment,
+                                         settings):
+    """Новости идут в порядке News.Meta, страницы связаны через next."""
+    settings.API_NEWS_PER_PAGE = 7
+    url = reverse('news:api_list')
+    first = client.get(url).json()
+    second = client.get(url, {'page': first['next']}).json()
+    assert second['next'] is None
+    results = first['results'] + second['results']
+    assert [row['id'] for row in results] == list(
+        News.objects.values_list('pk', flat=True)
+    )
+    news = News.objects.get(pk=comment.news_id)
+    assert results[0] == {
+        'id': news.pk,
+        'title': news.title,
+        'date': news.date.isoformat(),
+        'excerpt': news.excerpt,
+        'views': 0,
+        'comments': 1,
+    }
+
+
+def test_news_detail_counts_view(client, news):
+    """Новость отдаётся целиком и засчитывает просмотр."""
+    url = reverse('news:api_detail', args=(news.pk,))
+    client.get(url)
+    data = client.get(url).json()
+    assert data['text'] == news.text
+    assert data['views'] == 2
+    News.objects.filter(pk=news.pk).update(is_hidden=True)
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_comment_pages_are_streamed(client, news, author, settings):
+    """Комментарии идут в порядке Comment.Meta частями по несколько строк."""
+    settings.API_COMMENTS_PER_PAGE = 7
+    settings.API_STREAM_CHUNK = 3
+    comments = make_comments(news, author, 10)
+    now = timezone.now()
+    for index, comment in enumerate(comments):
+        Comment.objects.filter(pk=comment.pk).update(
+            created=now - timedelta(minutes=index)
+        )
+    url = reverse('news:api_comments', args=(news.pk,))
+    response = client.get(url)
+    assert len(list(response.streaming_content)) == 5
+    first = streamed_json(client.get(url))
+    second = streamed_json(client.get(url, {'page': first['next']}))
+    assert second['next'] is None
+    assert [row['id'] for row in first['results'] + second['results']] == [
+        comment.pk for comment in comments[::-1]
+    ]
+    assert first['results'][0]['author'] == author.username
+
+
+def test_comment_page_reads_index_in_order(news):
+    """Порядок страницы берётся из индекса, без сортировки в памяти."""
+    plan = Comment.objects.filter(news=news).order_by(
+        *COMMENT_ORDERING
+    )[:10].explain()
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_comment_page_under_asgi(news, author):
+    """Страница комментариев отдаётся и через ASGI-приложение."""
+    make_comments(news, author, 3)
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http', 'method': 'GET', 'query_string': b'',
+        'path': reverse('news:api_comments', args=(news.pk,)),
+        'headers': [(b'host', b'testserver')],
+    }
+    # Как и тестовый клиент: закрытие соединения прервало бы
+    # транзакцию теста.
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        async_to_sync(application)(scope, receive, send)
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+    assert messages[0]['status'] == HTTPStatus.OK
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    assert len(json.loads(body)['results']) == 3
@@ -0,0 +1,79 @@
+"""Модуль тестов архива комментариев."""
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils.timezone import localdate
+import pytest
+
+from news.archive import batches
+from news.models import ArchivedComment, Comment, News
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def old_news(author):
+    """Новость двухлетней давности с веткой из трёх комментариев."""
+    news = News.objects.create(
+        title='Старая', text='Текст', date=localdate() - timedelta(days=730),
+    )
+    parent = None
+    for text in ('Корень', 'Ответ', 'Ответ на ответ'):
+        parent = Comment.objects.create(
+            news=news, author=author, text=text, parent=parent,
+        )
+    return news
+
+
+@pytest.fixture
+def archived(old_news, comment):
+    """Фикстура запуска архивации: свежая новость с comment остаётся."""
+    hot = list(Comment.objects.filter(news=old_news).values_list(
+        'pk', 'path', 'depth', 'parent_id', 'text'
+    ))
+    out = StringIO()
+    call_command('archive_comments', '--older-than-days=365', stdout=out)
+    old_news.refresh_from_db()
+    return hot, out.getvalue()
+
+
+def test_batches_keep_news_whole():
+    """Пачки ограничены по комментариям, но новость не делится."""
+    counts = [(1, 3), (2, 3), (3, 10), (4, 1), (5, 1)]
+    assert list(batches(counts, 6)) == [
+        ([1, 2], 6), ([3], 10), ([4, 5], 2),
+    ]
+
+
+def test_comments_move_with_ids_and_paths(archived, old_news, comment):
+    """Комментарии старых новостей переезжают в архив без изменений."""
+    hot, output = archived
+    assert list(ArchivedComment.objects.order_by('pk').values_list(
+        'pk', 'path', 'depth', 'parent_id', 'text'
+    )) == hot
+    assert list(Comment.objects.all()) == [comment]
+    assert old_news.is_archived
+    assert 'комментариев: 3' in output
+
+
+def test_detail_reads_archive(archived, old_news, not_author_client):
+    """Страница старой новости читает ветки из архива, ответить нельзя."""
+    url = reverse('news:detail', args=(old_news.pk,))
+    response = not_author_client.get(url)
+    assert [comment.text for comment in response.context['comments']] == [
+        'Корень', 'Ответ', 'Ответ на ответ',
+    ]
+    assert 'form' not in response.context
+    response = not_author_client.post(url, data={'text': 'Поздно'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert not Comment.objects.filter(news=old_news).exists()
+
+
+def test_thread_reads_archive(archived, client):
+    """Ветка архивного комментария открывается по тому же адресу."""
+    root = ArchivedComment.objects.get(depth=0)
+    response = client.get(reverse('news:thread', args=(root.pk,)))
+    assert len(response.context['comments']) == 3
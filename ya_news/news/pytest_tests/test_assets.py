@@ -0,0 +1,171 @@
+"""Модуль тестов отдачи статики."""
+import gzip
+from wsgiref.util import setup_testing_defaults
+
+from asgiref.sync import async_to_sync
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test.utils import override_settings
+from django.utils.http import http_date
+import pytest
+
+from yacommon import assets, checks
+from yacommon.management.commands.vendor_static import (
+    ASSETS, STATIC_DIR, integrity,
+)
+from yanews.asgi import application as asgi_application
+
+NAME = 'admin/css/base.css'
+
+
+@pytest.fixture(scope='module')
+def collected(tmp_path_factory):
+    """Фикстура STATIC_ROOT, собранного collectstatic один раз на модуль."""
+    root = tmp_path_factory.mktemp('static')
+    with override_settings(
+        STATIC_ROOT=root,
+        STATICFILES_STORAGE='yacommon.assets.CompressedManifestStorage',
+    ):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        assets.reset_index()
+        yield root
+    assets.reset_index()
+
+
+class Django:
+    """WSGI-приложение вместо Django: отмечает, что запрос дошёл до него."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, environ, start_response):
+        self.calls += 1
+        start_response('404 Not Found', [])
+        return [b'django']
+
+
+def wsgi_get(path, **headers):
+    environ = {'PATH_INFO': path, 'wsgi.file_wrapper': FileWrapper}
+    environ.update(headers)
+    setup_testing_defaults(environ)
+    django = Django()
+    started = []
+    body = assets.StaticFilesApplication(django)(
+        environ, lambda status, headers: started.append((status, headers))
+    )
+    status, headers = started[0]
+    return status, dict(headers), body, django.calls
+
+
+class FileWrapper:
+    """wsgi.file_wrapper сервера: файл уходит целиком, без чтения в Python."""
+
+    def __init__(self, file, block_size):
+        self.file = file
+
+    def content(self):
+        with self.file:
+            return self.file.read()
+
+
+def test_collectstatic_hashes_and_compresses(collected):
+    """Команда collectstatic пишет хешированные имена и сжатые копии."""
+    hashed = staticfiles_storage.stored_name(NAME)
+    assert hashed != NAME
+    original = (collected / hashed).read_bytes()
+    assert gzip.decompress((collected / f'{hashed}.gz').read_bytes()) == (
+        original
+    )
+
+
+def test_hashed_file_is_immutable(collected):
+    """Файл с хешем отдаётся сжатым, с вечным кэшем и через file_wrapper."""
+    hashed = staticfiles_storage.stored_name(NAME)
+    status, headers, body, calls = wsgi_get(
+        f'/static/{hashed}', HTTP_ACCEPT_ENCODING='br;q=0, gzip',
+    )
+    assert status == '200 OK'
+    assert headers['Cache-Control'] == assets.IMMUTABLE
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert headers['Content-Type'] == 'text/css; charset=utf-8'
+    assert isinstance(body, FileWrapper)
+    content = body.content()
+    assert int(headers['Content-Length']) == len(content)
+    assert gzip.decompress(content) == (collected / hashed).read_bytes()
+    assert calls == 0
+
+
+def test_plain_file_without_gzip(collected):
+    """Без gzip отдаётся исходный файл; имя без хеша кэшируется недолго."""
+    status, headers, body, _ = wsgi_get(f'/static/{NAME}')
+    assert 'Content-Encoding' not in headers
+    assert headers['Cache-Control'] == 'public, max-age=300'
+    assert body.content() == (collected / NAME).read_bytes()
+
+
+def test_not_modified(collected):
+    """Неизменившийся файл отвечает 304 без тела."""
+    modified = (collected / NAME).stat().st_mtime
+    status, _, body, _ = wsgi_get(
+        f'/static/{NAME}', HTTP_IF_MODIFIED_SINCE=http_date(modified),
+    )
+    assert status == '304 Not Modified'
+    assert body == []
+
+
+@pytest.mark.parametrize(
+    'path', ('/static/missing.css', f'/static/../static/{NAME}', '/news/1/'),
+)
+def test_other_paths_go_to_django(collected, path):
+    """Чего нет в индексе, обрабатывает Django."""
+    *_, calls = wsgi_get(path)
+    assert calls == 1
+
+
+def test_asgi_zerocopy(collected):
+    """ASGI-сервер с zerocopysend получает открытый файл."""
+    sent = []
+
+    async def send(message):
+        if message['type'] == 'http.response.zerocopysend':
+            message = {**message, 'file': message['file'].read()}
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': f'/static/{NAME}',
+        'headers': [], 'extensions': {'http.response.zerocopysend': {}},
+    }
+    async_to_sync(asgi_application)(scope, None, send)
+    assert sent[0]['status'] == 200
+    assert sent[1]['file'] == (collected / NAME).read_bytes()
+
+
+@pytest.mark.django_db
+def test_pages_use_local_bootstrap(client, home_url):
+    """Bootstrap подключается со своего сервера, без CDN."""
+    content = client.get(home_url).content.decode()
+    assert 'cdn.jsdelivr.net' not in content
+    assert f'/static/{ASSETS[0][0]}' in content
+
+
+def test_missing_vendored_file_is_reported(monkeypatch, tmp_path):
+    """Нескачанный сторонний файл виден в manage.py check."""
+    monkeypatch.setattr(checks, 'STATIC_DIR', tmp_path)
+    assert [
+        warning.id for warning in checks.vendored_assets(None)
+    ] == ['yacommon.W001'] * len(ASSETS)
+
+
+def test_missing_manifest_entry_raises(collected):
+    """Файл, которого нет в манифесте, — ошибка, а не исходное имя."""
+    with pytest.raises(ValueError):
+        staticfiles_storage.stored_name('missing.css')
+
+
+def test_vendored_files_match_integrity():
+    """Скачанные файлы совпадают с хешами из vendor_static."""
+    for name, _, expected in ASSETS:
+        path = STATIC_DIR / name
+        if path.exists():
+            assert integrity(path.read_bytes()) == expected
@@ -0,0 +1,62 @@
+"""Модуль тестов management-команд."""
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+from django.core.management import call_command
+from django.utils import timezone
+import pytest
+
+from news.models import Comment, DiscussionScore, News
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+def generated_rows():
+    return (
+        list(User.objects.values_list('username', 'first_name', 'last_name')),
+        list(News.objects.values_list('title', 'text', 'date', 'views')),
+        list(Comment.objects.values_list(
+            'news_id', 'author_id', 'text', 'created'
+        )),
+    )
+
+
+def test_generate_news_is_deterministic():
+    """
+    Функция тестов.
+
+    Проверка, что генератор создаёт заданное количество строк
+    и при одинаковом зерне воспроизводит те же данные.
+    """
+    options = dict(users=5, news=7, comments=40, seed=42, batch_size=16)
+    call_command('generate_news', '--until=2024-01-31', **options)
+    first_run = generated_rows()
+    assert [len(rows) for rows in first_run] == [5, 7, 40]
+    Comment.objects.all().delete()
+    News.objects.all().delete()
+    User.objects.all().delete()
+    call_command('generate_news', '--until=2024-01-31', **options)
+    assert generated_rows() == first_run
+
+
+def test_generate_news_comments_not_after_until():
+    """Комментарии к последним новостям не позже --until и не в будущем."""
+    options = dict(users=5, news=7, comments=200, days=1)
+    call_command('generate_news', '--until=2024-01-31', **options)
+    assert Comment.objects.latest('created').created < datetime(
+        2024, 2, 1, tzinfo=timezone.utc
+    )
+    Comment.objects.all().delete()
+    call_command('generate_news', **options)
+    assert Comment.objects.latest('created').created <= timezone.now()
+
+
+def test_generate_news_fills_leaderboard():
+    """Комментарии генератора сразу учтены в топе обсуждаемых."""
+    call_command('generate_news', users=5, news=7, comments=40, days=1)
+    assert DiscussionScore.objects.aggregate(
+        total=Sum('comments')
+    )['total'] == 40
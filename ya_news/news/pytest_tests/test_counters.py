@@ -0,0 +1,94 @@
+"""Модуль тестов счётчиков просмотров."""
+from threading import Thread
+
+from django.db import DatabaseError
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+import pytest
+
+from news.counters import news_views
+from news.models import News
+from yacommon.counters import ShardedCounter
+
+pytestmark = pytest.mark.django_db
+
+
+def test_sharded_counter_keeps_all_increments():
+    """Одновременные приращения из разных потоков не теряются."""
+    counter = ShardedCounter()
+
+    def add():
+        for key in range(1000):
+            counter.add(key % 10)
+
+    threads = [Thread(target=add) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.get(0) == 800
+    assert counter.drain() == {key: 800 for key in range(10)}
+    assert counter.drain() == {}
+
+
+def test_threads_spread_over_shards():
+    """Потоки пишут в разные шарды, а не все под одним замком."""
+    counter = ShardedCounter()
+    threads = [Thread(target=counter.add, args=(0,)) for _ in range(32)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    used = [counts for _, counts in counter._shards if counts]
+    assert len(used) > 1
+    assert counter.get(0) == 32
+
+
+def test_detail_view_does_not_write(client, news, detail_url):
+    """Просмотр не пишет в базу, но сразу виден на странице."""
+    client.get(detail_url)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(detail_url)
+    assert not any(
+        query['sql'].startswith('UPDATE') for query in queries
+    )
+    assert response.context['news'].views == 2
+    News.objects.filter(pk=news.pk).update(views=10)
+    response = client.get(detail_url)
+    assert response.context['news'].views == 13
+
+
+def test_flush_uses_single_update(django_assert_num_queries, bunch_of_news):
+    """Накопленные просмотры записываются одним запросом."""
+    for index, news in enumerate(bunch_of_news):
+        for _ in range(index):
+            news_views.hit(news.pk)
+    with django_assert_num_queries(1):
+        news_views.flush()
+    assert [news.views for news in News.objects.order_by('pk')] == list(
+        range(len(bunch_of_news))
+    )
+    assert news_views.pending.drain() == {}
+
+
+def test_failed_flush_keeps_pending(monkeypatch, news):
+    """При ошибке записи просмотры остаются до следующей попытки."""
+    news_views.hit(news.pk)
+
+    def fail(*args, **kwargs):
+        raise DatabaseError
+
+    monkeypatch.setattr(QuerySet, 'update', fail)
+    assert news_views.flush() == 0
+    assert news_views.pending.get(news.pk) == 1
+
+
+def test_popular_ordering(client, bunch_of_news, home_url):
+    """С параметром sort=popular новости идут по убыванию просмотров."""
+    for views, news in enumerate(bunch_of_news):
+        News.objects.filter(pk=news.pk).update(views=views)
+    response = client.get(home_url, {'sort': 'popular'})
+    views = [news.views for news in response.context['object_list']]
+    assert views == sorted(views, reverse=True)
+    assert views[0] == len(bunch_of_news) - 1
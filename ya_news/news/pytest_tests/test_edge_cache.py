@@ -0,0 +1,172 @@
+"""Модуль тестов кэшируемых страниц для анонимов."""
+import gzip
+import re
+from http import HTTPStatus
+from time import monotonic
+
+from django.conf import settings
+from django.test.client import Client
+from django.urls import reverse
+import pytest
+
+from news import edge_cache
+from news.models import Comment
+from news.purge import hide
+
+pytestmark = pytest.mark.django_db
+
+MAX_AGE = re.compile(r's-maxage=(\d+)')
+
+
+class StandInProxy(edge_cache.Purger):
+    """
+    Кэширующий прокси перед тестовым клиентом.
+
+    Хранит ответы с s-maxage, кроме private, по пути и Accept-Encoding,
+    запросы с cookie сессии пропускает к приложению.
+    """
+
+    def __init__(self):
+        self.pages = {}
+        self.origin_requests = 0
+        self.purged = []
+
+    def get(self, path, client=None, encoding='gzip'):
+        client = client or Client()
+        key = (path, encoding)
+        session = settings.SESSION_COOKIE_NAME in client.cookies
+        cached = self.pages.get(key)
+        if not session and cached and cached[0] > monotonic():
+            return cached[1]
+        self.origin_requests += 1
+        response = client.get(path, HTTP_ACCEPT_ENCODING=encoding)
+        cache_control = response.get('Cache-Control', '')
+        max_age = MAX_AGE.search(cache_control)
+        if not session and max_age and 'private' not in cache_control:
+            expires = monotonic() + int(max_age.group(1))
+            self.pages[key] = (expires, response)
+        return response
+
+    def purge(self, paths):
+        self.purged.append(list(paths))
+        for key in list(self.pages):
+            if key[0].split('?')[0] in paths:
+                del self.pages[key]
+
+
+@pytest.fixture(autouse=True)
+def anonymous_cache(settings):
+    """Фикстура режима кэша со стоящим перед приложением прокси."""
+    settings.ANONYMOUS_CACHE = True
+    settings.ANONYMOUS_CACHE_PURGER = (
+        'news.pytest_tests.test_edge_cache.StandInProxy'
+    )
+    edge_cache.reset_purger()
+    edge_cache.pages.clear()
+    yield edge_cache.get_purger()
+    edge_cache.reset_purger()
+    edge_cache.pages.clear()
+
+
+def body(response):
+    if response.get('Content-Encoding') == 'gzip':
+        return gzip.decompress(response.content).decode()
+    return response.content.decode()
+
+
+@pytest.mark.parametrize(
+    'url', (pytest.lazy_fixture('home_url'), pytest.lazy_fixture('detail_url'))
+)
+def test_anonymous_page_is_public(client, url):
+    """Аноним получает общую страницу без cookie и Vary: Cookie."""
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+    assert response.status_code == HTTPStatus.OK
+    assert response['Cache-Control'] == (
+        f'public, max-age=0, s-maxage={settings.ANONYMOUS_CACHE_MAX_AGE}, '
+        f'stale-while-revalidate={settings.ANONYMOUS_CACHE_STALE}'
+    )
+    assert response['Vary'] == 'Accept-Encoding'
+    assert response['Content-Encoding'] == 'gzip'
+    assert not response.cookies
+    assert 'Войти' in body(response)
+
+
+def test_plain_body_without_gzip(client, home_url):
+    """Без gzip в Accept-Encoding отдаётся то же тело без сжатия."""
+    compressed = client.get(home_url, HTTP_ACCEPT_ENCODING='gzip')
+    plain = client.get(home_url)
+    assert 'Content-Encoding' not in plain
+    assert plain.content.decode() == body(compressed)
+    assert int(plain['Content-Length']) == len(plain.content)
+
+
+def test_repeated_page_without_queries(
+        client, bunch_of_news, home_url, django_assert_num_queries):
+    """Повторный запрос страницы не доходит до базы."""
+    client.get(home_url)
+    with django_assert_num_queries(0):
+        response = client.get(home_url)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_missing_news_not_cached(client):
+    """Несуществующая новость не кэшируется."""
+    url = reverse('news:detail', args=(1,))
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert 's-maxage' not in response.get('Cache-Control', '')
+
+
+def test_logged_in_page_is_private(author_client, home_url):
+    """Страница пользователя проходит обычный путь и помечается private."""
+    response = author_client.get(home_url)
+    assert 'private' in response['Cache-Control']
+    assert 'Cookie' in response['Vary']
+    assert 'Пользователь: Автор' in response.content.decode()
+
+
+def test_proxy_serves_cached_page(anonymous_cache, detail_url, author_client):
+    """Прокси отдаёт страницу анонимам сам, пользователя — пропускает."""
+    anonymous_cache.get(detail_url)
+    anonymous_cache.get(detail_url)
+    assert anonymous_cache.origin_requests == 1
+    response = anonymous_cache.get(detail_url, author_client)
+    assert anonymous_cache.origin_requests == 2
+    assert 'Пользователь: Автор' in response.content.decode()
+    assert 'Войти' in body(anonymous_cache.get(detail_url))
+
+
+def test_new_comment_purges_pages(
+        anonymous_cache, news, author, detail_url, home_url,
+        django_capture_on_commit_callbacks):
+    """Новый комментарий сбрасывает страницу новости и главную."""
+    anonymous_cache.get(f'{detail_url}?page=1')
+    anonymous_cache.get(detail_url)
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(news=news, author=author, text='Свежий')
+    assert anonymous_cache.purged == [[home_url, detail_url]]
+    assert not anonymous_cache.pages
+    assert 'Свежий' in body(anonymous_cache.get(detail_url))
+    assert anonymous_cache.origin_requests == 3
+
+
+def test_changed_news_purges_pages(
+        anonymous_cache, news, detail_url, home_url,
+        django_capture_on_commit_callbacks):
+    """Правка и скрытие новости сбрасывают её страницы."""
+    anonymous_cache.get(home_url)
+    with django_capture_on_commit_callbacks(execute=True):
+        news.title = 'Новый заголовок'
+        news.save()
+    assert 'Новый заголовок' in body(anonymous_cache.get(home_url))
+    with django_capture_on_commit_callbacks(execute=True):
+        hide(type(news).objects.filter(pk=news.pk))
+    assert anonymous_cache.purged[-1] == [home_url, detail_url]
+    assert 'Новый заголовок' not in body(anonymous_cache.get(home_url))
+
+
+def test_disabled_mode_keeps_sessions(settings, client, home_url):
+    """Без ANONYMOUS_CACHE страница проходит все слои как раньше."""
+    settings.ANONYMOUS_CACHE = False
+    response = client.get(home_url)
+    assert 's-maxage' not in response.get('Cache-Control', '')
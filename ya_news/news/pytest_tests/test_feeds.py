@@ -0,0 +1,123 @@
+"""Модуль тестов лент Atom и RSS."""
+from http import HTTPStatus
+
+from django.urls import reverse
+from django.utils.http import http_date
+import pytest
+
+from news import feeds
+from news.models import Comment, News
+from news.purge import hide
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def empty_feeds():
+    """Фикстура, не дающая лентам одного теста попасть в другой."""
+    feeds.feeds.clear()
+    yield
+    feeds.feeds.clear()
+
+
+@pytest.fixture
+def comments_feed_url(news):
+    """Фикстура маршрута ленты комментариев новости."""
+    return reverse('news:comments_feed', args=(news.pk, 'atom'))
+
+
+@pytest.mark.parametrize(
+    'feed_format, content_type',
+    (
+        ('atom', 'application/atom+xml; charset=utf-8'),
+        ('rss', 'application/rss+xml; charset=utf-8'),
+    ),
+)
+def test_latest_news_feed(client, bunch_of_news, feed_format, content_type):
+    """Лента свежих новостей в обоих форматах."""
+    hidden = bunch_of_news[0]
+    News.objects.filter(pk=hidden.pk).update(is_hidden=True)
+    response = client.get(reverse('news:feed', args=(feed_format,)))
+    assert response['Content-Type'] == content_type
+    content = response.content.decode()
+    assert f'http://testserver/news/{bunch_of_news[1].pk}/' in content
+    assert f'/news/{hidden.pk}/' not in content
+    assert bunch_of_news[1].excerpt
+    assert bunch_of_news[1].excerpt in content
+
+
+@pytest.mark.parametrize(
+    'url',
+    (
+        reverse('news:feed', args=('json',)),
+        reverse('news:comments_feed', args=(1, 'atom')),
+    ),
+)
+def test_missing_feeds(client, url):
+    """Неизвестный формат и несуществующая новость — 404."""
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_not_modified_without_queries(
+        client, comment, comments_feed_url, django_assert_num_queries):
+    """Повторный запрос ленты отвечает 304 без запросов к базе."""
+    response = client.get(comments_feed_url)
+    assert comment.text in response.content.decode()
+    with django_assert_num_queries(0):
+        assert client.get(
+            comments_feed_url, HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code == HTTPStatus.NOT_MODIFIED
+        assert client.get(
+            comments_feed_url,
+            HTTP_IF_MODIFIED_SINCE=http_date(comment.created.timestamp()),
+        ).status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_new_comment_read_incrementally(
+        client, comment, news, author, comments_feed_url,
+        django_capture_on_commit_callbacks, django_assert_num_queries):
+    """Новый комментарий дочитывается в ленту одним запросом."""
+    etag = client.get(comments_feed_url)['ETag']
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(news=news, author=author, text='Свежий')
+    with django_assert_num_queries(1):
+        response = client.get(comments_feed_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    content = response.content.decode()
+    assert content.index('Свежий') < content.index(comment.text)
+
+
+def test_changes_rebuild_feeds(
+        client, comment, news, comments_feed_url,
+        django_capture_on_commit_callbacks):
+    """Правка комментария и скрытие новости пересобирают ленты."""
+    latest_url = reverse('news:feed', args=('rss',))
+    client.get(comments_feed_url)
+    client.get(latest_url)
+    with django_capture_on_commit_callbacks(execute=True):
+        comment.text = 'Исправлено'
+        comment.save()
+    assert 'Исправлено' in client.get(comments_feed_url).content.decode()
+    with django_capture_on_commit_callbacks(execute=True):
+        hide(News.objects.filter(pk=news.pk))
+    assert news.title not in client.get(latest_url).content.decode()
+    assert client.get(comments_feed_url).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_cache_evicts_least_recent(news):
+    """Сверх size в памяти остаются ленты, которые читали последними."""
+    cache = feeds.FeedCache(size=2, max_age=60)
+    latest = cache.get(feeds.LATEST)
+    comments = cache.get(news.pk)
+    assert cache.get(feeds.LATEST) is latest
+    other = News.objects.create(title='Другая', text='Текст')
+    cache.get(other.pk)
+    assert cache.get(feeds.LATEST) is latest
+    assert cache.get(news.pk) is not comments
+
+
+def test_cache_expires_feeds(news):
+    """Лента старше max_age собирается заново."""
+    cache = feeds.FeedCache(size=10, max_age=0)
+    latest = cache.get(feeds.LATEST)
+    assert cache.get(feeds.LATEST) is not latest
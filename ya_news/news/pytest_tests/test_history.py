@@ -0,0 +1,95 @@
+"""Модуль тестов истории комментариев пользователя."""
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+import pytest
+from pytest_django.asserts import assertRedirects
+
+from news.history import history_page, parse_cursor
+from news.models import ArchivedComment, Comment, News
+
+pytestmark = pytest.mark.django_db
+
+HISTORY_URL = reverse('news:history')
+
+
+@pytest.fixture
+def history(author, not_author, news):
+    """Комментарии автора: с одинаковым временем, в архиве и к скрытой."""
+    other_news = News.objects.create(title='Другая', text='Текст')
+    hidden_news = News.objects.create(
+        title='Скрытая', text='Текст', is_hidden=True,
+    )
+    now = timezone.now()
+    comments = []
+    for index, target in enumerate((news, other_news, news, other_news)):
+        comments.append(Comment.objects.create(
+            news=target, author=author, text=f'Комментарий {index}',
+        ))
+    archived = ArchivedComment.objects.create(
+        news=other_news, author=author, text='Из архива',
+    )
+    Comment.objects.create(news=hidden_news, author=author, text='Скрыт')
+    Comment.objects.create(news=news, author=not_author, text='Чужой')
+    times = [now - timedelta(minutes=minutes) for minutes in (5, 3, 3, 1)]
+    for comment, created in zip(comments, times):
+        Comment.objects.filter(pk=comment.pk).update(created=created)
+    ArchivedComment.objects.filter(pk=archived.pk).update(
+        created=now - timedelta(minutes=4),
+    )
+    # Новые сначала, при равном времени — больший id.
+    return [
+        ('Комментарий 3', 'Другая'), ('Комментарий 2', news.title),
+        ('Комментарий 1', 'Другая'), ('Из архива', 'Другая'),
+        ('Комментарий 0', news.title),
+    ]
+
+
+def test_pages_follow_keys(author_client, history, settings):
+    """Страницы по ключу проходят все комментарии по одному разу."""
+    settings.COMMENT_HISTORY_PER_PAGE = 2
+    seen = []
+    url = HISTORY_URL
+    while url:
+        context = author_client.get(url).context
+        seen += [
+            (comment.text, comment.news.title)
+            for comment in context['comments']
+        ]
+        url = context['next_cursor'] and (
+            f'{HISTORY_URL}?{urlencode({"after": context["next_cursor"]})}'
+        )
+    assert seen == history
+
+
+def test_anonymous_redirected(client):
+    """Аноним отправляется на страницу входа."""
+    login_url = reverse('users:login')
+    assertRedirects(
+        client.get(HISTORY_URL), f'{login_url}?next={HISTORY_URL}'
+    )
+
+
+@pytest.mark.parametrize('value', (None, '', 'мусор', 'вчера_12', '_1'))
+def test_bad_cursor_means_first_page(value):
+    """Непонятный ключ означает первую страницу."""
+    assert parse_cursor(value) is None
+
+
+def test_page_seeks_author_index(author, history):
+    """Страница — поиск диапазона по (author, created, id) в обеих таблицах."""
+    _, cursor = history_page(author, None, 2)
+    with CaptureQueriesContext(connection) as queries:
+        history_page(author, parse_cursor(cursor), 2)
+    assert len(queries) == 2
+    for query in queries:
+        with connection.cursor() as db_cursor:
+            db_cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+            plan = ' '.join(row[-1] for row in db_cursor.fetchall())
+        assert '_author__' in plan
+        assert 'author_id=? AND created<?' in plan
+        assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,119 @@
+"""Модуль тестов блока самых обсуждаемых новостей."""
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+import pytest
+
+from news import archive, leaderboard
+from news.models import Comment, CommentBucket, DiscussionScore
+from news.write_behind import flush_comments
+
+pytestmark = pytest.mark.django_db
+
+
+def scores():
+    return dict(DiscussionScore.objects.values_list('news_id', 'comments'))
+
+
+def make_old_comment(news, author, days):
+    """Комментарий, написанный days дней назад, без отправки сигналов."""
+    Comment.objects.bulk_create(
+        [Comment(news=news, author=author, text='Старый')]
+    )
+    comment = Comment.objects.latest('pk')
+    comment.created = timezone.now() - timedelta(days=days)
+    Comment.objects.filter(pk=comment.pk).update(created=comment.created)
+    return comment
+
+
+def test_comments_update_scores(author, bunch_of_news):
+    """Добавление и удаление комментариев сразу меняет топ."""
+    first, second = bunch_of_news[:2]
+    for index in range(3):
+        Comment.objects.create(news=second, author=author, text=str(index))
+    Comment.objects.create(news=first, author=author, text='Ещё')
+    assert [score.news for score in leaderboard.top(5)] == [second, first]
+    Comment.objects.filter(news=second).first().delete()
+    Comment.objects.filter(news=second).first().delete()
+    assert scores() == {first.pk: 1, second.pk: 1}
+
+
+def test_write_behind_batch_is_counted(author, news):
+    """Пачка отложенной записи тоже попадает в счётчики."""
+    flush_comments([
+        Comment(news=news, author=author, text=str(index))
+        for index in range(4)
+    ])
+    assert scores() == {news.pk: 4}
+
+
+def test_window_slides_without_recount(
+        monkeypatch, settings, author, news, django_assert_num_queries):
+    """Сдвиг окна вычитает только выпавшие дни."""
+    settings.MOST_DISCUSSED_DAYS = 3
+    for days in (0, 1, 2):
+        leaderboard.comments_added([make_old_comment(news, author, days)])
+    leaderboard.slide()
+    assert scores() == {news.pk: 3}
+    today = timezone.localdate()
+    monkeypatch.setattr(
+        leaderboard, 'localdate',
+        lambda value=None: (
+            today + timedelta(days=2) if value is None
+            else timezone.localdate(value)
+        ),
+    )
+    with django_assert_num_queries(6):
+        assert [score.comments for score in leaderboard.top(5)] == [1]
+    assert list(CommentBucket.objects.values_list('day', flat=True)) == [
+        today
+    ]
+
+
+def test_top_reads_index(bunch_of_news, author):
+    """Топ читается по индексу без сортировки всей таблицы."""
+    for news in bunch_of_news:
+        Comment.objects.create(news=news, author=author, text='Текст')
+    queryset = DiscussionScore.objects.filter(comments__gt=0)[:5]
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        plan = ' '.join(row[-1] for row in cursor.fetchall())
+    assert 'INDEX' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_rebuild_matches_incremental(author, bunch_of_news):
+    """Пересчёт командой даёт те же суммы, что и сигналы."""
+    for index, news in enumerate(bunch_of_news[:4]):
+        for _ in range(index + 1):
+            Comment.objects.create(news=news, author=author, text='Текст')
+    make_old_comment(bunch_of_news[0], author, 30)
+    expected = scores()
+    DiscussionScore.objects.all().delete()
+    call_command('rebuild_leaderboard', stdout=StringIO())
+    assert scores() == expected
+
+
+def test_archived_news_leave_top(author, bunch_of_news):
+    """Новости с комментариями в архиве выпадают из топа, как при пересчёте."""
+    archived, fresh = bunch_of_news[:2]
+    for news in (archived, fresh, fresh):
+        Comment.objects.create(news=news, author=author, text='Текст')
+    archive.move([archived.pk])
+    assert [score.news_id for score in leaderboard.top(5)] == [fresh.pk]
+    assert not CommentBucket.objects.filter(news=archived).exists()
+    incremental = scores()
+    leaderboard.rebuild()
+    assert scores() == incremental
+
+
+def test_home_page_shows_most_discussed(client, home_url, comment):
+    """Главная показывает блок самых обсуждаемых новостей."""
+    response = client.get(home_url)
+    assert [
+        score.news for score in response.context['most_discussed']
+    ] == [comment.news]
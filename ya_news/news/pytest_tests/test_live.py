@@ -0,0 +1,194 @@
+"""Модуль тестов потока новых комментариев."""
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync, sync_to_async
+import pytest
+
+from news import live
+from news.models import Comment, News
+from news.write_behind import flush_comments
+from yanews.asgi import application
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def local_broker(settings):
+    """Фикстура отдельного брокера на каждый тест."""
+    settings.LIVE_BROKER = 'news.live.LocalBroker'
+    live.reset_broker()
+    yield live.get_broker()
+    live.reset_broker()
+
+
+class Stream:
+    """Соединение с ASGI-приложением без сервера."""
+
+    def __init__(self, path, headers=()):
+        self.received = asyncio.Queue()
+        self.sent = asyncio.Queue()
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': path,
+            'headers': list(headers),
+        }
+        self.task = asyncio.ensure_future(
+            application(scope, self.received.get, self.sent.put)
+        )
+
+    async def message(self):
+        return await asyncio.wait_for(self.sent.get(), 1)
+
+    async def start(self):
+        return (await self.message())['status']
+
+    async def events(self):
+        """События одной порции."""
+        body = (await self.message())['body'].decode()
+        events = []
+        for text in body.strip().split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in text.splitlines())
+            if 'data' in fields:
+                fields['data'] = json.loads(fields['data'])
+            events.append(fields)
+        return events
+
+    async def close(self):
+        await self.received.put({'type': 'http.disconnect'})
+        await asyncio.wait_for(self.task, 1)
+
+
+def test_new_comment_is_pushed(news, author, local_broker,
+                               django_capture_on_commit_callbacks):
+    """Комментарий приходит подписчикам новости после фиксации."""
+    def create_comment():
+        with django_capture_on_commit_callbacks(execute=True):
+            return Comment.objects.create(
+                news=news, author=author, text='Первый\n<b>!</b>',
+            )
+
+    async def scenario():
+        stream = Stream(live.live_path(news.pk))
+        assert await stream.start() == 200
+        comment = await sync_to_async(create_comment)()
+        events = await stream.events()
+        await stream.close()
+        return comment, events
+
+    comment, (event,) = async_to_sync(scenario)()
+    assert event['id'] == str(comment.pk)
+    assert event['event'] == 'comment'
+    assert event['data']['text_html'] == 'Первый<br>&lt;b&gt;!&lt;/b&gt;'
+    assert event['data']['author'] == author.username
+    assert local_broker.subscribers(live.channel(news.pk)) == 0
+
+
+def test_closed_discussions_are_not_streamed(news):
+    """Для архивных и несуществующих новостей потока нет."""
+    News.objects.filter(pk=news.pk).update(is_archived=True)
+
+    async def scenario():
+        statuses = []
+        for pk in (news.pk, news.pk + 1):
+            stream = Stream(live.live_path(pk))
+            statuses.append(await stream.start())
+            await stream.task
+        return statuses
+
+    assert async_to_sync(scenario)() == [404, 404]
+
+
+def test_slow_reader_gets_reload(news, local_broker, settings):
+    """Переполненная очередь очищается, клиент получает reload."""
+    settings.LIVE_QUEUE_SIZE = 2
+    settings.LIVE_HEARTBEAT = 0.01
+
+    async def scenario():
+        stream = Stream(live.live_path(news.pk))
+        await stream.start()
+        for index in range(3):
+            local_broker.publish(live.channel(news.pk), b'data: {}\n\n')
+        events = await stream.events() + await stream.events()
+        await stream.close()
+        return events
+
+    reload, ping = async_to_sync(scenario)()
+    assert reload['event'] == 'reload'
+    assert ping == {'': 'ping'}
+
+
+def test_reconnect_replays_missed_comments(news, author):
+    """По Last-Event-ID дочитываются пропущенные комментарии."""
+    first, second, third = (
+        Comment.objects.create(news=news, author=author, text=str(index))
+        for index in range(3)
+    )
+
+    async def scenario():
+        stream = Stream(
+            live.live_path(news.pk),
+            [(b'last-event-id', str(first.pk).encode())],
+        )
+        await stream.start()
+        events = await stream.events()
+        await stream.close()
+        return events
+
+    assert [event['id'] for event in async_to_sync(scenario)()] == [
+        str(second.pk), str(third.pk),
+    ]
+
+
+def test_replay_skips_comments_already_queued(news, author):
+    """Комментарий, пришедший и от брокера, и из базы, уходит один раз."""
+    first, second, third, fourth = (
+        Comment.objects.create(news=news, author=author, text=str(index))
+        for index in range(4)
+    )
+    missed = live.missed_events(news.pk, first.pk, 10)[:2]
+    (new,) = live.missed_events(news.pk, third.pk, 10)
+    subscription = live.Subscription(None, 10)
+    subscription.offer(missed[-1])
+    subscription.replay(missed, first.pk)
+    subscription.offer(missed[-1])
+    subscription.offer(new)
+    assert [live.event_id(event) for event in subscription.events] == [
+        second.pk, third.pk, fourth.pk,
+    ]
+
+
+def test_write_behind_batch_is_published(news, author, local_broker,
+                                         django_capture_on_commit_callbacks):
+    """Пачка из очереди записи получает id и публикуется."""
+    received = []
+
+    class Loop:
+        def call_soon_threadsafe(self, callback, *args):
+            callback(*args)
+
+    class Recorder(live.Subscription):
+        def offer(self, event):
+            received.append(event)
+
+    subscription = Recorder(Loop(), 10)
+    local_broker.subscribe(live.channel(news.pk), subscription)
+    comments = [
+        Comment(news=news, author=author, text=f'Пачка {index}')
+        for index in range(3)
+    ]
+    with django_capture_on_commit_callbacks(execute=True):
+        flush_comments(comments)
+    assert [comment.pk for comment in comments] == list(
+        Comment.objects.order_by('pk').values_list('pk', flat=True)
+    )
+    assert [event.split(b'\n')[0] for event in received] == [
+        f'id: {comment.pk}'.encode() for comment in comments
+    ]
+
+
+def test_detail_page_subscribes(client, news, detail_url, settings):
+    """Страница новости подписывается на поток, если он включён."""
+    path = live.live_path(news.pk)
+    assert path not in client.get(detail_url).content.decode()
+    settings.LIVE_COMMENTS = True
+    assert path in client.get(detail_url).content.decode()
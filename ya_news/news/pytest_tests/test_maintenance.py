@@ -0,0 +1,100 @@
+"""Модуль тестов обслуживания базы."""
+from datetime import datetime
+from io import StringIO
+import sqlite3
+
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+import pytest
+
+from news.models import News
+from yacommon import maintenance
+
+
+@pytest.fixture
+def backups(settings, tmp_path):
+    """Фикстура каталога резервных копий во временной директории."""
+    settings.DB_BACKUP_DIR = tmp_path
+    settings.DB_MAINTENANCE_PAUSE = 0
+    return tmp_path
+
+
+def at(hour):
+    return timezone.make_aware(datetime(2024, 1, 10, hour, 30))
+
+
+@pytest.mark.parametrize(
+    'hour, window, expected',
+    (
+        (3, (3, 5), True), (5, (3, 5), False), (2, (3, 5), False),
+        (23, (22, 2), True), (1, (22, 2), True), (12, (22, 2), False),
+    ),
+)
+def test_window(hour, window, expected):
+    """Окно обслуживания может переходить через полночь."""
+    assert maintenance.in_window(at(hour), window) is expected
+
+
+def test_next_window():
+    """Следующее окно — сегодня, если ещё не началось, иначе завтра."""
+    assert maintenance.next_window(at(1), (3, 5)) == at(3).replace(minute=0)
+    assert maintenance.next_window(at(4), (3, 5)).day == 11
+
+
+@pytest.mark.django_db(transaction=True)
+def test_backup_copies_in_page_steps(backups, news):
+    """Копия снимается многими короткими шагами и содержит данные."""
+    step, = maintenance.backup(pages=1)
+    assert step.locks > 1
+    assert step.longest <= step.total
+    copy, = backups.iterdir()
+    with sqlite3.connect(copy) as target:
+        assert target.execute(
+            f'SELECT title FROM {News._meta.db_table}'
+        ).fetchall() == [(news.title,)]
+
+
+def test_prune_keeps_newest(tmp_path):
+    """Старые копии удаляются, остаются keep последних."""
+    for stamp in ('20240101-000000', '20240102-000000', '20240103-000000'):
+        (tmp_path / maintenance.backup_name('main', '/db.sqlite3', stamp)
+         ).touch()
+    maintenance.prune(tmp_path, 'main', '/db.sqlite3', 2)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'db-20240102-000000.sqlite3', 'db-20240103-000000.sqlite3',
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_incremental_vacuum_frees_pages():
+    """После удаления строк vacuum порциями возвращает страницы."""
+    maintenance.enable_vacuum('main')
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст' * 200)
+        for index in range(500)
+    )
+    News.objects.all().delete()
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA freelist_count')
+        assert cursor.fetchone()[0] > 0
+        step = maintenance.vacuum('main', pages=10)
+        cursor.execute('PRAGMA freelist_count')
+        assert cursor.fetchone()[0] == 0
+    assert step.locks > 1
+
+
+@pytest.mark.django_db
+def test_command_respects_window(backups, settings):
+    """Вне окна команда только снимает копию, с --force — всё."""
+    settings.DB_MAINTENANCE_WINDOW = (
+        (timezone.localtime().hour + 2) % 24,
+        (timezone.localtime().hour + 3) % 24,
+    )
+    out = StringIO()
+    call_command('maintain_db', stdout=out)
+    assert 'backup main' in out.getvalue()
+    assert 'analyze' not in out.getvalue()
+    call_command('maintain_db', '--force', stdout=out)
+    assert 'analyze: блокировок 2' in out.getvalue()
+    assert 'vacuum main' in out.getvalue()
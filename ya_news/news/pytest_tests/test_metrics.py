@@ -0,0 +1,134 @@
+"""Модуль тестов замеров времени и журнала медленных запросов."""
+import json
+from http import HTTPStatus
+
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.urls import reverse
+import pytest
+
+from yacommon import slow_queries
+from yacommon.metrics import registry
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    """Фикстура очистки накопленных метрик."""
+    registry.clear()
+    yield
+    registry.clear()
+
+
+def test_server_timing_header(client, bunch_of_comments, detail_url):
+    """Функция проверки заголовка Server-Timing на странице новости."""
+    response = client.get(detail_url)
+    stages = [
+        part.split(';')[0]
+        for part in response['Server-Timing'].split(', ')
+    ]
+    assert stages == ['db', 'view', 'tpl', 'total']
+    assert 'queries"' in response['Server-Timing']
+
+
+def test_metrics_endpoint(client, settings, news, detail_url):
+    """
+    Функция тестов.
+
+    Проверка, что гистограммы копятся по имени маршрута
+    и отдаются в текстовом формате Prometheus.
+    """
+    settings.METRICS_ALLOWED_IPS = ('127.0.0.1',)
+    client.get(detail_url)
+    client.get(detail_url)
+    response = client.get(reverse('metrics'))
+    assert response['Content-Type'].startswith('text/plain')
+    content = response.content.decode()
+    assert (
+        'http_request_duration_seconds_count'
+        '{view="news:detail",stage="total"} 2'
+    ) in content
+    assert 'db_queries_total{view="news:detail"}' in content
+
+
+def test_metrics_only_for_staff(client, author_client, admin_client):
+    """Без адреса из списка метрики видны только сотрудникам."""
+    url = reverse('metrics')
+    assert client.get(url).status_code == HTTPStatus.FORBIDDEN
+    assert author_client.get(url).status_code == HTTPStatus.FORBIDDEN
+    assert admin_client.get(url).status_code == HTTPStatus.OK
+
+
+@pytest.fixture
+def slow_query_log(settings, tmp_path):
+    """Фикстура журнала, в который попадает каждый запрос."""
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    settings.SLOW_QUERY_SAMPLE_RATE = 0
+    settings.SLOW_QUERY_LOG_FILE = tmp_path / 'slow.log'
+    slow_queries.reset()
+    return settings.SLOW_QUERY_LOG_FILE
+
+
+def test_slow_query_log(client, news, detail_url, slow_query_log):
+    """
+    Функция тестов.
+
+    Проверка, что медленный запрос пишется с маршрутом, параметрами
+    и планом, а повторы одного отпечатка отбрасываются выборкой.
+    """
+    client.get(detail_url)
+    client.get(detail_url)
+    entries = [
+        json.loads(line)
+        for line in slow_query_log.read_text(encoding='utf-8').splitlines()
+    ]
+    news_entries = [
+        entry for entry in entries if 'FROM "news_news"' in entry['sql']
+    ]
+    assert len(news_entries) == 1
+    entry = news_entries[0]
+    assert entry['view'] == 'news:detail'
+    assert entry['params'] == [news.pk]
+    assert any('news_news' in step for step in entry['plan'])
+
+
+def test_slow_queries_command(client, news, detail_url, slow_query_log,
+                              capsys):
+    """Функция проверки сводки по медленным запросам."""
+    client.get(detail_url)
+    call_command('slow_queries', file=slow_query_log, top=50)
+    output = capsys.readouterr().out
+    assert 'news:detail' in output
+    assert '"news_news"."id" = ?' in output
+
+
+def test_slow_queries_command_skips_bad_lines(
+        client, news, detail_url, slow_query_log, capsys):
+    """Пустые и повреждённые строки журнала пропускаются с предупреждением."""
+    client.get(detail_url)
+    with open(slow_query_log, 'a', encoding='utf-8') as log_file:
+        log_file.write('\n   \n{"fingerprint": \n')
+    call_command('slow_queries', file=slow_query_log, top=50)
+    output = capsys.readouterr()
+    assert 'news:detail' in output.out
+    assert output.err.count('не разобрана') == 1
+
+
+def test_failed_query_is_not_explained(rf, slow_query_log):
+    """План снимается только у запроса, который выполнился."""
+    def failing(*args):
+        raise DatabaseError('database is locked')
+
+    connection.ensure_connection()
+    wrapper = slow_queries.SlowQueryLogger(rf.get('/'), 0, 0)
+    context = {'connection': connection}
+    with pytest.raises(DatabaseError):
+        wrapper(failing, 'SELECT 1', (), False, context)
+    wrapper(lambda *args: None, 'SELECT 1', (), False, context)
+    failed, succeeded = (
+        json.loads(line)
+        for line in slow_query_log.read_text(encoding='utf-8').splitlines()
+    )
+    assert failed['plan'] is None
+    assert succeeded['plan']
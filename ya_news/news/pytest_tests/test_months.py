@@ -0,0 +1,123 @@
+"""Модуль тестов архива новостей по месяцам."""
+from datetime import date
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+import pytest
+
+from news import months
+from news.models import News, NewsMonth
+from news.purge import hide
+
+pytestmark = pytest.mark.django_db
+
+JANUARY = date(2024, 1, 1)
+FEBRUARY = date(2024, 2, 1)
+
+
+def counts():
+    return dict(
+        NewsMonth.objects.filter(news__gt=0).values_list('month', 'news')
+    )
+
+
+@pytest.fixture
+def archive():
+    """Фикстура новостей за январь и февраль."""
+    return [
+        News.objects.create(title=f'Новость {day}', text='Текст', date=day)
+        for day in (
+            date(2024, 1, 5), date(2024, 1, 20), date(2024, 1, 31),
+            date(2024, 2, 1),
+        )
+    ]
+
+
+def test_months_follow_news_changes(archive):
+    """Сохранение, перенос, скрытие и удаление новостей меняют счётчики."""
+    assert counts() == {JANUARY: 3, FEBRUARY: 1}
+    moved = archive[0]
+    moved.date = date(2024, 2, 10)
+    moved.save()
+    assert counts() == {JANUARY: 2, FEBRUARY: 2}
+    hide(News.objects.filter(pk__in=(archive[1].pk, archive[3].pk)))
+    assert counts() == {JANUARY: 1, FEBRUARY: 1}
+    archive[2].delete()
+    News.objects.get(pk=archive[1].pk).delete()
+    assert counts() == {FEBRUARY: 1}
+    months.rebuild()
+    assert counts() == {FEBRUARY: 1}
+
+
+def test_rebuild_command(archive):
+    """Команда пересчитывает месяцы после записи в обход сигналов."""
+    News.objects.filter(pk=archive[0].pk).update(date=date(2023, 12, 31))
+    out = StringIO()
+    call_command('rebuild_news_months', stdout=out)
+    assert counts() == {date(2023, 12, 1): 1, JANUARY: 2, FEBRUARY: 1}
+    assert 'Пересчитано месяцев: 3.' in out.getvalue()
+
+
+def test_sidebar_is_one_query(archive, client, django_assert_num_queries):
+    """Навигация по архиву читается одним запросом и есть на главной."""
+    with django_assert_num_queries(1):
+        sidebar = months.sidebar()
+    assert [(row.month, row.news) for row in sidebar] == [
+        (FEBRUARY, 1), (JANUARY, 3),
+    ]
+    content = client.get(reverse('news:home')).content.decode()
+    assert reverse('news:archive', args=(2024, 1)) in content
+
+
+def test_month_pages(archive, client, settings):
+    """Страницы месяца идут от новых к старым."""
+    settings.ARCHIVE_NEWS_PER_PAGE = 2
+    url = reverse('news:archive', args=(2024, 1))
+    response = client.get(url)
+    assert response.context['news_list'] == [archive[2], archive[1]]
+    assert response.context['next_page'] == 2
+    response = client.get(url, {'page': 2})
+    assert response.context['news_list'] == [archive[0]]
+    assert response.context['next_page'] == 0
+
+
+def test_missing_month(client):
+    """Несуществующий месяц — 404."""
+    response = client.get(reverse('news:archive', args=(2024, 13)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_month_page_uses_date_index():
+    """Страница месяца выбирается по индексу даты без сортировки."""
+    with CaptureQueriesContext(connection) as queries:
+        months.month_page(JANUARY, 3, 20)
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {queries[0]["sql"]}')
+        plan = ' '.join(row[-1] for row in cursor.fetchall())
+    assert 'USING INDEX news_news_date' in plan
+    assert 'date>? AND date<?' in plan.replace('=', '')
+    assert 'TEMP B-TREE' not in plan
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_fills_months():
+    """Миграция NewsMonth считает месяцы по уже лежащим новостям."""
+    executor = MigrationExecutor(connection)
+    executor.migrate([('news', '0010_comment_news_created')])
+    old_news = executor.loader.project_state(
+        ('news', '0010_comment_news_created')
+    ).apps.get_model('news', 'News')
+    old_news.objects.bulk_create((
+        old_news(title='Январь', text='Текст', date=JANUARY),
+        old_news(title='Январь', text='Текст', date=JANUARY),
+        old_news(title='Скрытая', text='Текст', date=FEBRUARY,
+                 is_hidden=True),
+    ))
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes('news'))
+    assert counts() == {JANUARY: 2}
@@ -0,0 +1,64 @@
+"""Модуль тестов профилирования запросов."""
+from http import HTTPStatus
+
+from django.urls import reverse
+import pytest
+
+from news.models import RequestProfile
+
+pytestmark = pytest.mark.django_db
+
+
+def test_staff_can_profile_request(admin_client, bunch_of_comments,
+                                   detail_url):
+    """
+    Функция тестов.
+
+    Проверка, что запрос сотрудника с параметром profile
+    профилируется и сохраняется вместе с метаданными.
+    """
+    response = admin_client.get(f'{detail_url}?profile=cprofile')
+    assert response.status_code == HTTPStatus.OK
+    profile = RequestProfile.objects.get()
+    assert response['X-Profile-Id'] == str(profile.pk)
+    assert profile.view_name == 'news:detail'
+    assert profile.status_code == HTTPStatus.OK
+    assert 'cumulative' in profile.report
+    assert ';' in profile.collapsed
+
+
+def test_header_selects_sampling_profiler(admin_client, detail_url):
+    """Функция проверки выбора сэмплирующего профилировщика заголовком."""
+    admin_client.get(detail_url, HTTP_X_PROFILE='sample')
+    assert RequestProfile.objects.get().mode == 'sample'
+
+
+@pytest.mark.parametrize(
+    'url_suffix',
+    ('', '?profile=cprofile'),
+)
+def test_regular_requests_are_not_profiled(not_author_client, detail_url,
+                                           url_suffix):
+    """
+    Функция тестов.
+
+    Проверка, что без параметра и для обычных пользователей
+    профиль не снимается.
+    """
+    response = not_author_client.get(detail_url + url_suffix)
+    assert 'X-Profile-Id' not in response
+    assert not RequestProfile.objects.exists()
+
+
+def test_profile_admin_pages(admin_client, detail_url):
+    """Функция проверки страниц профиля в админке."""
+    admin_client.get(f'{detail_url}?profile=cprofile')
+    profile = RequestProfile.objects.get()
+    change_url = reverse(
+        'admin:news_requestprofile_change', args=(profile.pk,)
+    )
+    assert admin_client.get(change_url).status_code == HTTPStatus.OK
+    response = admin_client.get(
+        reverse('admin:news_requestprofile_collapsed', args=(profile.pk,))
+    )
+    assert response.content.decode() == profile.collapsed
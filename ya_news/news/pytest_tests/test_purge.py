@@ -0,0 +1,95 @@
+"""Модуль тестов отложенного удаления новостей."""
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models.signals import post_delete
+from django.urls import reverse
+import pytest
+
+from news.archive import move
+from news.models import ArchivedComment, Comment, DiscussionScore, News
+from news.purge import purge_news
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def discussed_news(news, author):
+    """Новость с ветками комментариев, учтёнными в топе обсуждаемых."""
+    for thread in range(3):
+        root = Comment.objects.create(news=news, author=author, text='Ветка')
+        parent = root
+        for _ in range(thread + 2):
+            parent = Comment.objects.create(
+                news=news, author=author, text='Ответ', parent=parent,
+            )
+    return news
+
+
+def test_admin_delete_only_hides(
+        admin_client, discussed_news, detail_url, home_url):
+    """Удаление из админки сразу скрывает новость, но не удаляет её."""
+    url = reverse('admin:news_news_delete', args=(discussed_news.pk,))
+    response = admin_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['model_count'] == {
+        'Новости': 1, 'comments': Comment.objects.count(),
+    }.items()
+    admin_client.post(url, {'post': 'yes'})
+    discussed_news.refresh_from_db()
+    assert discussed_news.is_hidden
+    assert Comment.objects.count() == 12
+    assert admin_client.get(detail_url).status_code == HTTPStatus.NOT_FOUND
+    assert not admin_client.get(home_url).context['object_list']
+
+
+def test_purge_in_chunks_keeps_signals(discussed_news):
+    """Комментарии удаляются порциями, сигналы приходят для каждого."""
+    deleted_pks = []
+    progress = []
+
+    def receiver(sender, instance, **kwargs):
+        deleted_pks.append(instance.pk)
+
+    post_delete.connect(receiver, sender=Comment)
+    try:
+        deleted = purge_news(
+            discussed_news, chunk_size=5,
+            progress=lambda *args: progress.append(args),
+        )
+    finally:
+        post_delete.disconnect(receiver, sender=Comment)
+    assert deleted == 12
+    assert progress == [(5, 12), (10, 12), (12, 12)]
+    assert len(set(deleted_pks)) == 12
+    assert not Comment.objects.exists()
+    assert not News.objects.exists()
+    assert not DiscussionScore.objects.exists()
+
+
+def test_purge_archived_news(discussed_news):
+    """Комментарии архивной новости удаляются из архива порциями."""
+    move([discussed_news.pk])
+    discussed_news.refresh_from_db()
+    progress = []
+    deleted = purge_news(
+        discussed_news, chunk_size=5,
+        progress=lambda *args: progress.append(args),
+    )
+    assert deleted == 12
+    assert progress == [(5, 12), (10, 12), (12, 12)]
+    assert not ArchivedComment.objects.exists()
+    assert not News.objects.exists()
+
+
+def test_purge_command(discussed_news, bunch_of_news):
+    """Команда удаляет только скрытые новости и сообщает о прогрессе."""
+    discussed_news.is_hidden = True
+    discussed_news.save()
+    out = StringIO()
+    call_command(
+        'purge_hidden_news', '--chunk-size=10', '--pause=0', stdout=out
+    )
+    assert 'удалено комментариев 12 из 12' in out.getvalue()
+    assert News.objects.count() == len(bunch_of_news)
@@ -0,0 +1,79 @@
+"""Модуль тестов заранее подготовленных анонсов и HTML комментариев."""
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from news.models import EXCERPT_WORDS, Comment, News, make_excerpt
+
+pytestmark = pytest.mark.django_db
+
+TEXT = 'Строка <b>один</b>\nстрока & два'
+TEXT_HTML = 'Строка &lt;b&gt;один&lt;/b&gt;<br>строка &amp; два'
+
+
+def test_save_renders_fields(news, comment, author_client,
+                             comment_edit_url):
+    """Анонс и HTML пересчитываются при каждом сохранении."""
+    news.text = ' '.join(['слово'] * (EXCERPT_WORDS + 5))
+    news.save()
+    news.refresh_from_db()
+    assert news.excerpt == ' '.join(['слово'] * EXCERPT_WORDS) + ' …'
+    author_client.post(comment_edit_url, data={'text': TEXT})
+    comment.refresh_from_db()
+    assert comment.text_html == TEXT_HTML
+
+
+def test_pages_use_rendered_fields(client, news, comment, home_url,
+                                   detail_url):
+    """Главная не читает тексты новостей, страница новости — готовый HTML."""
+    Comment.objects.filter(pk=comment.pk).update(text_html=TEXT_HTML)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(home_url)
+    content = response.content.decode()
+    assert news.excerpt in content
+    assert 'Комментариев: 1' in content
+    assert not any(
+        '"news_news"."text"' in query['sql']
+        for query in context.captured_queries
+    )
+    assert TEXT_HTML in client.get(detail_url).content.decode()
+
+
+def test_render_texts_fills_empty_fields(bunch_of_comments, news):
+    """Команда заполняет пустые поля порциями и не трогает готовые."""
+    Comment.objects.exclude(pk=bunch_of_comments[0].pk).update(text_html='')
+    News.objects.update(excerpt='')
+    out = StringIO()
+    call_command('render_texts', '--chunk-size=3', stdout=out)
+    output = out.getvalue()
+    assert 'comments: обновлено 9.' in output
+    assert 'Новости: обновлено 1.' in output
+    assert 'comments: 3…' in output
+    news.refresh_from_db()
+    assert news.excerpt == news.text
+    for comment in Comment.objects.all():
+        assert comment.text_html == comment.text
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_fills_rendered_fields(author):
+    """Миграция заполняет анонсы и HTML у уже лежащих строк."""
+    executor = MigrationExecutor(connection)
+    executor.migrate([('news', '0008_news_date_index')])
+    old_apps = executor.loader.project_state(
+        ('news', '0008_news_date_index')
+    ).apps
+    old_news = old_apps.get_model('news', 'News').objects.create(
+        title='Заголовок', text=TEXT,
+    )
+    old_apps.get_model('news', 'Comment').objects.create(
+        news=old_news, author_id=author.pk, text=TEXT,
+    )
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes('news'))
+    assert News.objects.get().excerpt == make_excerpt(TEXT)
+    assert Comment.objects.get().text_html == TEXT_HTML
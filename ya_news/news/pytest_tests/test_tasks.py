@@ -0,0 +1,130 @@
+"""Модуль тестов отложенных задач."""
+from contextvars import Context
+from threading import Event, current_thread
+
+from django.urls import reverse
+import pytest
+
+from news import tasks
+from news.models import Comment
+
+calls = []
+release = Event()
+
+
+@tasks.task(retries=2, retry_delay=0)
+def remember(value):
+    calls.append((value, current_thread().name))
+
+
+@tasks.task(retries=2, retry_delay=0)
+def flaky(failures):
+    calls.append(failures)
+    if len(calls) <= failures:
+        raise RuntimeError('Сбой')
+
+
+@tasks.task(retries=0)
+def wait_for_release():
+    release.wait(5)
+
+
+@pytest.fixture(autouse=True)
+def in_pool(settings):
+    """Фикстура задач в пуле потоков вместо синхронного режима."""
+    settings.TASKS_SYNC = False
+    settings.TASKS_QUEUE_FILE = None
+    calls.clear()
+    release.clear()
+    yield
+    release.set()
+    tasks.shutdown()
+
+
+@pytest.mark.django_db
+def test_runs_after_commit_and_response(django_capture_on_commit_callbacks):
+    """Задача запроса ждёт фиксации и отправки ответа."""
+    tasks.collect_request_tasks(sender=None)
+    with django_capture_on_commit_callbacks(execute=True):
+        remember.defer('запрос')
+        assert calls == []
+    assert calls == []
+    tasks.submit_request_tasks(sender=None)
+    assert tasks.shutdown()
+    (value, thread), = calls
+    assert value == 'запрос'
+    assert thread.startswith('tasks')
+
+
+def test_requests_in_one_thread_keep_own_tasks():
+    """Запросы ASGI в одном потоке не отправляют чужие задачи."""
+    first, second = Context(), Context()
+    first.run(tasks.collect_request_tasks, sender=None)
+    second.run(tasks.collect_request_tasks, sender=None)
+    first.run(tasks.schedule, tasks.Call(remember, ('первый',), {}))
+    second.run(tasks.submit_request_tasks, sender=None)
+    assert tasks.shutdown()
+    assert calls == []
+    first.run(tasks.submit_request_tasks, sender=None)
+    assert tasks.shutdown()
+    assert [value for value, _ in calls] == ['первый']
+
+
+@pytest.mark.django_db
+def test_outside_request_runs_after_commit(django_capture_on_commit_callbacks):
+    """Вне запроса задача уходит в пул сразу после фиксации."""
+    with django_capture_on_commit_callbacks() as callbacks:
+        remember.defer('команда')
+    assert calls == []
+    callbacks[0]()
+    assert tasks.shutdown()
+    assert [value for value, _ in calls] == ['команда']
+
+
+@pytest.mark.parametrize('failures, attempts', ((2, 3), (5, 3)))
+def test_retries(failures, attempts):
+    """Упавшая задача повторяется retries раз и не больше."""
+    call = tasks.Call(flaky, (failures,), {})
+    assert call.run() is (failures < attempts)
+    assert len(calls) == attempts
+
+
+def test_full_pool_runs_in_caller():
+    """Если очередь пула занята, задачу выполняет вызывающий поток."""
+    executor = tasks.Executor(workers=1, queue_size=1)
+    executor.submit(tasks.Call(wait_for_release, (), {}))
+    executor.submit(tasks.Call(remember, ('сразу',), {}))
+    assert calls == [('сразу', current_thread().name)]
+    release.set()
+    assert executor.stop(5)
+
+
+def test_queue_file_survives_restart(tmp_path):
+    """Задачи, не выполненные до остановки, выполняет следующий запуск."""
+    path = tmp_path / 'tasks.sqlite3'
+    executor = tasks.Executor(1, 10, tasks.Journal(path, lease=600))
+    executor.submit(tasks.Call(wait_for_release, (), {}))
+    executor.submit(tasks.Call(remember, ('после перезапуска',), {}))
+    assert not executor.stop(timeout=0)
+    release.set()
+    assert calls == []
+    restarted = tasks.Executor(1, 10, tasks.Journal(path, lease=600))
+    assert restarted.stop(5)
+    assert [value for value, _ in calls] == ['после перезапуска']
+    assert tasks.Journal(path, lease=600).claim() == []
+
+
+@pytest.mark.django_db
+def test_comment_updates_deferred(
+        author_client, news, form_data, django_capture_on_commit_callbacks):
+    """Публикация и ленты нового комментария идут задачей в пуле."""
+    url = reverse('news:detail', args=(news.pk,))
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(
+            'news.updates.comments_created.func',
+            lambda comment_ids: calls.append(comment_ids),
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            author_client.post(url, data=form_data)
+        assert tasks.shutdown()
+    assert calls == [[Comment.objects.get().pk]]
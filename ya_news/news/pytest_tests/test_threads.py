@@ -0,0 +1,118 @@
+"""Модуль тестов веток комментариев."""
+from http import HTTPStatus
+
+from django.db import connection
+from django.urls import reverse
+import pytest
+
+from news.models import PATH_WIDTH, Comment
+from news.threads import FILL_PATHS, MAX_INDENT, subtree, thread_page
+from news.write_behind import flush_comments
+
+pytestmark = pytest.mark.django_db
+
+
+def reply(parent, author, text='Ответ'):
+    return Comment.objects.create(
+        news=parent.news, author=author, text=text, parent=parent,
+    )
+
+
+@pytest.fixture
+def tree(news, author):
+    """Две ветки: в первой пять ответов разной глубины, во второй один."""
+    first = Comment.objects.create(news=news, author=author, text='1')
+    first_reply = reply(first, author, '1.1')
+    reply(first_reply, author, '1.1.1')
+    reply(first_reply, author, '1.1.2')
+    reply(first, author, '1.2')
+    reply(first, author, '1.3')
+    second = Comment.objects.create(news=news, author=author, text='2')
+    reply(second, author, '2.1')
+    return first, second
+
+
+def test_reply_gets_path_and_depth(
+        not_author_client, comment, detail_url, url_to_comments):
+    """Ответ, отправленный через форму, встаёт в ветку родителя."""
+    response = not_author_client.post(
+        detail_url, data={'text': 'Ответ', 'parent': comment.pk}
+    )
+    assert response.url == url_to_comments
+    answer = Comment.objects.get(parent=comment)
+    assert answer.depth == 1
+    assert answer.path == comment.path + f'{answer.pk:0{PATH_WIDTH}d}'
+
+
+def test_cant_reply_to_other_news(
+        not_author_client, comment, bunch_of_news):
+    """Ответить можно только на комментарий той же новости."""
+    other_url = reverse('news:detail', args=(bunch_of_news[0].pk,))
+    response = not_author_client.post(
+        other_url, data={'text': 'Ответ', 'parent': comment.pk}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert 'parent' in response.context['form'].errors
+    assert Comment.objects.count() == 1
+
+
+def test_subtree_is_one_range_query(tree, django_assert_num_queries):
+    """Поддерево читается одним запросом в порядке обхода."""
+    with django_assert_num_queries(1):
+        texts = [comment.text for comment in subtree(tree[0])]
+    assert texts == ['1', '1.1', '1.1.1', '1.1.2', '1.2', '1.3']
+    sql, params = subtree(tree[0]).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        plan = ' '.join(row[-1] for row in cursor.fetchall())
+    assert 'INDEX news_commen' in plan
+    assert '(news_id=? AND path>? AND path<?)' in plan
+
+
+def test_thread_page(tree, news, django_assert_num_queries):
+    """Страница веток приходит с первыми ответами в каждой ветке."""
+    with django_assert_num_queries(2):
+        comments, has_next = thread_page(news, 1, threads=1, replies=2)
+        assert [comment.author.username for comment in comments]
+    assert [comment.text for comment in comments] == ['1', '1.1', '1.1.1']
+    assert comments[-1].hidden_replies == 3
+    assert has_next
+    comments, has_next = thread_page(news, 2, threads=1, replies=2)
+    assert [comment.text for comment in comments] == ['2', '2.1']
+    assert comments[-1].hidden_replies == 0
+    assert not has_next
+
+
+def test_deep_thread_renders_flat(client, news, author):
+    """Глубокая ветка рисуется без рекурсии и с ограниченным отступом."""
+    parent = root = Comment.objects.create(news=news, author=author, text='0')
+    for depth in range(1, 200):
+        parent = reply(parent, author, str(depth))
+    response = client.get(reverse('news:thread', args=(root.pk,)))
+    assert response.status_code == HTTPStatus.OK
+    comments = response.context['comments']
+    assert len(comments) == 200
+    assert comments[-1].depth == 199
+    assert comments[-1].indent == MAX_INDENT
+
+
+def test_write_behind_batch_gets_paths(news, author, comment):
+    """Пачке из bulk_create пути проставляются в той же транзакции."""
+    flush_comments([
+        Comment(news=news, author=author, text='Ответ', parent=comment),
+        Comment(news=news, author=author, text='Новая ветка'),
+    ])
+    answer = Comment.objects.get(text='Ответ')
+    root = Comment.objects.get(text='Новая ветка')
+    assert answer.depth == 1
+    assert answer.path == comment.path + f'{answer.pk:0{PATH_WIDTH}d}'
+    assert root.path == f'{root.pk:0{PATH_WIDTH}d}'
+
+
+def test_fill_paths_seeks_inserted_ids():
+    """Пути пачки дописываются поиском по id, без обхода таблицы."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {FILL_PATHS}', [1, 2])
+        plan = ' '.join(row[-1] for row in cursor.fetchall())
+    assert 'rowid>? AND rowid<?' in plan.replace('=', '')
+    assert f'SCAN {Comment._meta.db_table}' not in plan.replace(' AS', '')
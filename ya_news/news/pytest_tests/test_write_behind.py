@@ -0,0 +1,190 @@
+"""Модуль тестов отложенной пакетной записи комментариев."""
+from http import HTTPStatus
+from threading import Event
+
+from django.db import DatabaseError
+import pytest
+from pytest_django.asserts import assertRedirects
+
+from news import write_behind
+from news.models import Comment
+from news.write_behind import Pending, QueueFull, WriteBehindQueue
+
+
+class FakeStorage:
+    """Запоминает записанные пачки вместо базы данных."""
+
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.single = []
+        self.fail_on = fail_on
+        self.release = Event()
+        self.release.set()
+
+    def flush(self, items):
+        self.release.wait()
+        if self.fail_on in items:
+            raise ValueError(self.fail_on)
+        self.batches.append(list(items))
+
+    def flush_one(self, item):
+        if item == self.fail_on:
+            raise ValueError(item)
+        self.single.append(item)
+
+
+@pytest.fixture
+def storage():
+    return FakeStorage()
+
+
+@pytest.fixture
+def make_queue():
+    queues = []
+
+    def make(storage, **options):
+        queue = WriteBehindQueue(storage.flush, storage.flush_one, **options)
+        queues.append((storage, queue))
+        return queue
+
+    yield make
+    for storage, queue in queues:
+        storage.release.set()
+        queue.stop()
+
+
+def test_items_are_written_in_batches(storage, make_queue):
+    """Элементы, пришедшие за max_delay, записываются одной пачкой."""
+    storage.release.clear()
+    queue = make_queue(storage, max_batch=10, max_delay=0.05)
+    pendings = [queue.submit(index) for index in range(25)]
+    storage.release.set()
+    for pending in pendings:
+        pending.wait(1)
+    assert [len(batch) for batch in storage.batches] == [10, 10, 5]
+    assert sum(storage.batches, []) == list(range(25))
+
+
+def test_full_queue_raises(storage, make_queue):
+    """Переполненная очередь отказывает, а не растёт без предела."""
+    storage.release.clear()
+    queue = make_queue(
+        storage, max_size=2, max_batch=1, put_timeout=0.01
+    )
+    queue.submit('first')
+    pendings = []
+    with pytest.raises(QueueFull):
+        for index in range(10):
+            pendings.append(queue.submit(index))
+    storage.release.set()
+    for pending in pendings:
+        pending.wait(1)
+
+
+def test_stop_drains_queue(storage, make_queue):
+    """Остановка дописывает всё, что уже принято в очередь."""
+    storage.release.clear()
+    queue = make_queue(storage, max_batch=5)
+    pendings = [queue.submit(index) for index in range(12)]
+    storage.release.set()
+    queue.stop()
+    assert sum(storage.batches, []) == list(range(12))
+    assert [pending.wait(0) for pending in pendings] == list(range(12))
+    with pytest.raises(QueueFull):
+        queue.submit('late')
+
+
+def test_failed_batch_is_retried_one_by_one(make_queue):
+    """Ошибка одной строки не мешает записать остальные."""
+    storage = FakeStorage(fail_on='bad')
+    storage.release.clear()
+    queue = make_queue(storage, max_delay=0.05)
+    pendings = [queue.submit(item) for item in ('a', 'bad', 'b')]
+    storage.release.set()
+    assert pendings[0].wait(1) == 'a'
+    with pytest.raises(ValueError):
+        pendings[1].wait(1)
+    assert pendings[2].wait(1) == 'b'
+    assert storage.single == ['a', 'b']
+
+
+@pytest.fixture
+def write_behind_enabled(settings):
+    settings.COMMENT_WRITE_BEHIND = True
+    settings.COMMENT_WRITE_BEHIND_DELAY_MS = 1
+    yield
+    write_behind.shutdown()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_is_saved_before_redirect(
+        write_behind_enabled, not_author_client, not_author, news,
+        form_data, detail_url, url_to_comments):
+    """В отложенном режиме редирект приходит после записи комментария."""
+    response = not_author_client.post(detail_url, data=form_data)
+    assertRedirects(response, url_to_comments)
+    comment = Comment.objects.get()
+    assert comment.text == form_data['text']
+    assert comment.news == news
+    assert comment.author == not_author
+
+
+@pytest.mark.django_db
+def test_full_queue_returns_503(
+        write_behind_enabled, monkeypatch, not_author_client,
+        form_data, detail_url):
+    """При переполненной очереди пользователь получает 503."""
+    class Rejecting:
+        def submit(self, item):
+            raise QueueFull
+
+    monkeypatch.setattr(
+        'news.views.comment_queue', lambda: Rejecting()
+    )
+    response = not_author_client.post(detail_url, data=form_data)
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response['Retry-After'] == '1'
+    assert Comment.objects.count() == 0
+
+
+class Accepting:
+    """Очередь, которая принимает комментарий, но не пишет его сама."""
+
+    def __init__(self, error=None):
+        self.error = error
+
+    def submit(self, item):
+        pending = Pending(item)
+        if self.error is not None:
+            pending.finish(self.error)
+        return pending
+
+
+@pytest.mark.django_db
+def test_commit_timeout_says_comment_is_queued(
+        write_behind_enabled, settings, monkeypatch, not_author_client,
+        form_data, detail_url):
+    """Если пачка не записана вовремя, 202 сообщает, что комментарий принят."""
+    settings.COMMENT_WRITE_BEHIND_COMMIT_TIMEOUT = 0
+    monkeypatch.setattr('news.views.comment_queue', lambda: Accepting())
+    response = not_author_client.post(detail_url, data=form_data)
+    assert response.status_code == HTTPStatus.ACCEPTED
+    assert 'Retry-After' not in response
+    assert 'появится чуть позже' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_flush_error_returns_form_error(
+        write_behind_enabled, monkeypatch, not_author_client,
+        form_data, detail_url):
+    """Если пачку не удалось записать, форма возвращается с ошибкой."""
+    monkeypatch.setattr(
+        'news.views.comment_queue',
+        lambda: Accepting(DatabaseError('database is locked')),
+    )
+    response = not_author_client.post(detail_url, data=form_data)
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['form'].non_field_errors() == [
+        'Не удалось сохранить комментарий, попробуйте ещё раз.'
+    ]
+    assert Comment.objects.count() == 0
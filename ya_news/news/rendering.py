@@ -0,0 +1,46 @@
+"""
+Заранее подготовленные анонсы новостей и HTML комментариев.
+
+Поля пересчитываются в save(). Строки, созданные до появления полей
+или в обход save(), заполняет команда render_texts: порциями по pk,
+каждая порция в своей транзакции.
+"""
+from django.db import transaction
+
+from .models import (
+    ArchivedComment, Comment, News, make_excerpt, make_text_html,
+)
+
+# Модель: исходное поле, подготовленное поле и функция подготовки.
+RENDERED = {
+    News: ('text', 'excerpt', make_excerpt),
+    Comment: ('text', 'text_html', make_text_html),
+    ArchivedComment: ('text', 'text_html', make_text_html),
+}
+
+
+def render_rows(model, chunk_size=1000, everything=False, progress=None):
+    """
+    Заполняет подготовленное поле модели, возвращает число строк.
+
+    Без everything обновляются только строки с пустым полем.
+    progress(модель, обновлено) вызывается после каждой порции.
+    """
+    source, target, render = RENDERED[model]
+    queryset = model.objects.order_by('pk').only(source, target)
+    if not everything:
+        queryset = queryset.filter(**{target: ''}).exclude(**{source: ''})
+    last_pk = 0
+    rendered = 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return rendered
+        for obj in chunk:
+            setattr(obj, target, render(getattr(obj, source)))
+        with transaction.atomic():
+            model.objects.bulk_update(chunk, [target])
+        last_pk = chunk[-1].pk
+        rendered += len(chunk)
+        if progress is not None:
+            progress(model, rendered)
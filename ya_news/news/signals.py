@@ -0,0 +1,58 @@
+"""Обработчики сигналов приложения."""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import leaderboard, months, updates
+from .models import Comment, News
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        leaderboard.comments_added([instance])
+
+
+@receiver(post_save, sender=Comment)
+def update_after_comment_save(sender, instance, created, **kwargs):
+    if created:
+        updates.comments_created.defer([instance.pk])
+    else:
+        updates.news_changed.defer([instance.news_id])
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_deleted_comment(sender, instance, **kwargs):
+    leaderboard.comments_removed([instance])
+
+
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    updates.news_changed.defer([instance.news_id])
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def purge_news_pages(sender, instance, **kwargs):
+    updates.news_changed.defer([instance.pk])
+
+
+@receiver(pre_save, sender=News)
+def remember_news_month(sender, instance, **kwargs):
+    instance._month_before = None
+    if instance._state.adding:
+        return
+    row = News.objects.filter(pk=instance.pk).values_list(
+        'date', 'is_hidden'
+    ).first()
+    if row is not None and not row[1]:
+        instance._month_before = months.month_of(row[0])
+
+
+@receiver(post_save, sender=News)
+def count_news_month(sender, instance, **kwargs):
+    months.news_saved(instance._month_before, months.state(instance))
+
+
+@receiver(post_delete, sender=News)
+def uncount_news_month(sender, instance, **kwargs):
+    months.news_saved(months.state(instance), None)
@@ -0,0 +1,310 @@
+"""
+Отложенные задачи: работа после записи, которой не место в запросе.
+
+Функция, помеченная @task, ставится в очередь через .defer(...)
+после фиксации транзакции (on_commit), а внутри запроса — ещё и
+после отправки ответа (request_finished). Задачи выполняет
+ограниченный пул потоков процесса, упавшая задача повторяется
+до retries раз с растущей паузой. Если задан TASKS_QUEUE_FILE,
+задача до выполнения лежит в файле SQLite, и задачи остановленного
+процесса выполняет следующий запуск. В режиме TASKS_SYNC задача
+выполняется сразу после фиксации в том же потоке — так в тестах
+её результат виден без ожидания.
+"""
+import atexit
+import json
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from threading import BoundedSemaphore, Condition, Lock
+from time import monotonic, sleep, time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+CREATE_TABLE = (
+    'CREATE TABLE IF NOT EXISTS tasks (id INTEGER PRIMARY KEY, '
+    'name TEXT NOT NULL, arguments TEXT NOT NULL, owner TEXT, claimed REAL)'
+)
+
+_lock = Lock()
+_executor = None
+# Задачи текущего запроса. Не threading.local: под ASGI запросы
+# идут вперемешку в одном потоке, а контекст у каждого свой.
+_pending = ContextVar('pending', default=None)
+
+
+class Task:
+    """Функция, которую можно выполнить позже через defer."""
+
+    def __init__(self, func, retries, retry_delay):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<Task {self.name}>'
+
+    def defer(self, *args, **kwargs):
+        """
+        Выполнит задачу после фиксации и после ответа на запрос.
+
+        Для файловой очереди аргументы должны сериализоваться в JSON:
+        ошибка видна здесь, а не в фоновом потоке.
+        """
+        call = Call(self, args, kwargs)
+        if settings.TASKS_QUEUE_FILE:
+            call.encode()
+        transaction.on_commit(lambda: schedule(call))
+
+
+def task(retries=3, retry_delay=0.5):
+    """Декоратор задачи: retries повторов, пауза retry_delay * 2**n с."""
+    def decorator(func):
+        return Task(func, retries, retry_delay)
+    return decorator
+
+
+class Call:
+    """Задача с аргументами и её строка в файловой очереди."""
+
+    __slots__ = ('task', 'args', 'kwargs', 'row_id')
+
+    def __init__(self, task, args, kwargs, row_id=None):
+        self.task = task
+        self.args = args
+        self.kwargs = kwargs
+        self.row_id = row_id
+
+    def encode(self):
+        return json.dumps([self.args, self.kwargs])
+
+    def run(self):
+        """Выполняет задачу, повторяя при ошибке; True — выполнена."""
+        for attempt in range(self.task.retries + 1):
+            try:
+                self.task(*self.args, **self.kwargs)
+            except Exception:
+                if attempt == self.task.retries:
+                    logger.exception('Задача %s не выполнена', self.task.name)
+                    return False
+                logger.warning(
+                    'Задача %s упала, повтор %s', self.task.name, attempt + 1,
+                    exc_info=True,
+                )
+                sleep(self.task.retry_delay * 2 ** attempt)
+            else:
+                return True
+
+
+class Journal:
+    """
+    Файловая очередь задач в SQLite.
+
+    Строка живёт от постановки задачи до её выполнения. Задачи
+    процесса помечены его owner; при остановке неуспевшие задачи
+    освобождаются, а задачи упавшего процесса считаются брошенными
+    через lease секунд. И те и другие забирает следующий запуск.
+    """
+
+    def __init__(self, path, lease):
+        self.owner = uuid4().hex
+        self.lease = lease
+        self._lock = Lock()
+        self._db = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30,
+        )
+        self._db.execute('PRAGMA journal_mode = WAL')
+        self._db.execute(CREATE_TABLE)
+
+    def add(self, call):
+        with self._lock:
+            return self._db.execute(
+                'INSERT INTO tasks (name, arguments, owner, claimed) '
+                'VALUES (?, ?, ?, ?)',
+                (call.task.name, call.encode(), self.owner, time()),
+            ).lastrowid
+
+    def done(self, row_id):
+        with self._lock:
+            self._db.execute('DELETE FROM tasks WHERE id = ?', (row_id,))
+
+    def claim(self):
+        """Забирает свободные и брошенные задачи, возвращает их Call."""
+        with self._lock:
+            rows = self._db.execute(
+                'UPDATE tasks SET owner = ?, claimed = ? '
+                'WHERE owner IS NULL OR claimed < ? '
+                'RETURNING id, name, arguments',
+                (self.owner, time(), time() - self.lease),
+            ).fetchall()
+        calls = []
+        for row_id, name, arguments in rows:
+            try:
+                task = import_string(name)
+            except ImportError:
+                logger.error('Задача %s больше не существует', name)
+                self.done(row_id)
+                continue
+            args, kwargs = json.loads(arguments)
+            calls.append(Call(task, args, kwargs, row_id))
+        return calls
+
+    def release(self):
+        """Отдаёт невыполненные задачи процесса следующему запуску."""
+        with self._lock:
+            self._db.execute(
+                'UPDATE tasks SET owner = NULL WHERE owner = ?', (self.owner,)
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class Executor:
+    """
+    Ограниченный пул потоков для задач.
+
+    В очереди пула не больше queue_size задач; если места нет,
+    задачу выполняет сам вызывающий поток, а не копит память.
+    """
+
+    def __init__(self, workers=4, queue_size=1000, journal=None):
+        self.journal = journal
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix='tasks')
+        self._slots = BoundedSemaphore(queue_size)
+        self._idle = Condition()
+        self._running = 0
+        self._closed = False
+        if journal is not None:
+            for call in journal.claim():
+                self._start(call)
+
+    def persist(self, call):
+        """Записывает задачу в файловую очередь, если она включена."""
+        if self.journal is not None and call.row_id is None:
+            call.row_id = self.journal.add(call)
+
+    def submit(self, call):
+        self.persist(call)
+        if self._closed:
+            # Задача из on_commit, пришедшая во время остановки.
+            self._finish(call)
+            return
+        self._start(call)
+
+    def _start(self, call):
+        if not self._slots.acquire(blocking=False):
+            logger.warning(
+                'Очередь задач заполнена, %s выполняется в вызывающем потоке',
+                call.task.name,
+            )
+            self._finish(call)
+            return
+        with self._idle:
+            self._running += 1
+        self._pool.submit(self._work, call)
+
+    def _work(self, call):
+        close_old_connections()
+        try:
+            self._finish(call)
+        finally:
+            close_old_connections()
+            self._slots.release()
+            with self._idle:
+                self._running -= 1
+                self._idle.notify_all()
+
+    def _finish(self, call):
+        call.run()
+        # Задача, не выполненная и после повторов, из очереди тоже
+        # уходит: ошибка уже в журнале, бесконечный повтор не поможет.
+        if self.journal is not None:
+            self.journal.done(call.row_id)
+
+    def stop(self, timeout=None):
+        """Ждёт начатые задачи не дольше timeout, остальные освобождает."""
+        self._closed = True
+        deadline = None if timeout is None else monotonic() + timeout
+        with self._idle:
+            while self._running:
+                left = None if deadline is None else deadline - monotonic()
+                if left is not None and left <= 0:
+                    break
+                self._idle.wait(left)
+            drained = not self._running
+        self._pool.shutdown(wait=drained, cancel_futures=True)
+        if self.journal is not None:
+            # Задача, которая ещё выполняется, после release может
+            # выполниться повторно: очередь гарантирует «хотя бы раз».
+            self.journal.release()
+            if drained:
+                self.journal.close()
+        return drained
+
+
+def get_executor():
+    """Пул задач процесса, создаётся при первом обращении."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            path = settings.TASKS_QUEUE_FILE
+            _executor = Executor(
+                settings.TASKS_WORKERS,
+                settings.TASKS_QUEUE_SIZE,
+                path and Journal(path, settings.TASKS_QUEUE_LEASE),
+            )
+        return _executor
+
+
+@atexit.register
+def shutdown(timeout=None):
+    """Дожидается задач перед завершением процесса."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is None:
+        return True
+    return executor.stop(
+        settings.TASKS_SHUTDOWN_TIMEOUT if timeout is None else timeout
+    )
+
+
+def schedule(call):
+    """Запускает задачу; внутри запроса — после отправки ответа."""
+    if settings.TASKS_SYNC:
+        call.task(*call.args, **call.kwargs)
+        return
+    executor = get_executor()
+    executor.persist(call)
+    pending = _pending.get()
+    if pending is not None:
+        pending.append(call)
+        return
+    executor.submit(call)
+
+
+@receiver(request_started)
+def collect_request_tasks(sender, **kwargs):
+    _pending.set([])
+
+
+@receiver(request_finished)
+def submit_request_tasks(sender, **kwargs):
+    pending = _pending.get()
+    _pending.set(None)
+    for call in pending or ():
+        get_executor().submit(call)
@@ -0,0 +1,130 @@
+"""
+Ветки комментариев на материализованных путях.
+
+Путь комментария — id его предков и его собственный, каждый
+дополнен нулями до PATH_WIDTH цифр. Сортировка по пути даёт обход
+дерева в глубину, поддерево — это диапазон [path, path + PATH_END)
+по индексу (news, path), поэтому ни рекурсивных запросов,
+ни запросов на каждый уровень не нужно.
+"""
+from django.db import connection
+from django.db.models import prefetch_related_objects
+
+from .models import PATH_END, PATH_WIDTH, ArchivedComment, Comment
+
+TABLE = Comment._meta.db_table
+# Дальше этой глубины ветка рисуется без дополнительного отступа.
+MAX_INDENT = 8
+
+FILL_PATHS = (
+    f'UPDATE {TABLE} SET path = COALESCE(('
+    f'SELECT parent.path FROM {TABLE} AS parent '
+    f'WHERE parent.id = {TABLE}.parent_id'
+    f"), '') || printf('%%0{PATH_WIDTH}d', id) "
+    f"WHERE id BETWEEN %s AND %s AND path = ''"
+)
+
+# Страница веток: корни страницы выбираются по индексу
+# (news, depth, path), затем одним диапазоном по (news, path) читаются
+# их поддеревья, и от каждого остаются первые replies + 1 строк.
+THREAD_PAGE = f'''
+WITH roots AS (
+    SELECT path FROM {{table}}
+    WHERE news_id = %s AND depth = 0
+    ORDER BY path LIMIT %s OFFSET %s
+), bounds AS (
+    SELECT
+        (SELECT MIN(path) FROM roots) AS low,
+        COALESCE(
+            (SELECT path FROM roots ORDER BY path LIMIT 1 OFFSET %s),
+            (SELECT MAX(path) FROM roots) || '{PATH_END}'
+        ) AS high,
+        (SELECT COUNT(*) FROM roots) AS roots_count
+)
+SELECT * FROM (
+    SELECT
+        comment.*,
+        ROW_NUMBER() OVER thread AS position,
+        COUNT(*) OVER (PARTITION BY substr(path, 1, {PATH_WIDTH}))
+            AS thread_size,
+        bounds.roots_count
+    FROM {{table}} AS comment, bounds
+    WHERE comment.news_id = %s
+        AND comment.path >= bounds.low AND comment.path < bounds.high
+    WINDOW thread AS (
+        PARTITION BY substr(path, 1, {PATH_WIDTH}) ORDER BY path
+    )
+)
+WHERE position <= %s + 1
+ORDER BY path
+'''
+
+
+THREAD_PAGES = {
+    model: THREAD_PAGE.format(table=model._meta.db_table)
+    for model in (Comment, ArchivedComment)
+}
+
+
+def comment_model(news):
+    """Таблица, в которой лежат комментарии новости."""
+    return ArchivedComment if news.is_archived else Comment
+
+
+def fill_paths(first_pk, last_pk):
+    """
+    Дописывает пути комментариям first_pk..last_pk из bulk_create.
+
+    Диапазон id — поиск по первичному ключу, а не обход всей таблицы.
+    Строки обновляются по возрастанию id, поэтому родитель из той же
+    пачки получает путь раньше ответа.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(FILL_PATHS, [first_pk, last_pk])
+
+
+def subtree(comment):
+    """Комментарий и все ответы на него в порядке обхода."""
+    return (
+        type(comment).objects
+        .filter(
+            news_id=comment.news_id,
+            path__gte=comment.path,
+            path__lt=comment.path + PATH_END,
+        )
+        .select_related('author')
+        .order_by('path')
+    )
+
+
+def thread_page(news, page, threads, replies):
+    """
+    Страница веток новости с первыми replies ответами в каждой.
+
+    Возвращает комментарии в порядке обхода и признак следующей
+    страницы. У последнего показанного комментария ветки hidden_replies —
+    сколько ответов ветки не попало на страницу.
+    """
+    model = comment_model(news)
+    comments = list(model.objects.raw(THREAD_PAGES[model], [
+        news.pk, threads + 1, (page - 1) * threads, threads,
+        news.pk, replies,
+    ]))
+    prefetch_related_objects(comments, 'author')
+    for index, comment in enumerate(comments):
+        comment.hidden_replies = 0
+        is_last = (
+            index + 1 == len(comments) or comments[index + 1].depth == 0
+        )
+        if is_last:
+            comment.hidden_replies = comment.thread_size - comment.position
+            comment.root_id = int(comment.path[:PATH_WIDTH])
+    has_next = bool(comments) and comments[0].roots_count > threads
+    return indent(comments), has_next
+
+
+def indent(comments, base_depth=0):
+    """Проставляет отступы для плоской отрисовки дерева без рекурсии."""
+    for comment in comments:
+        comment.indent = min(comment.depth - base_depth, MAX_INDENT)
+    return comments
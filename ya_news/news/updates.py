@@ -0,0 +1,29 @@
+"""
+Обновления после записи: страницы в кеше, ленты и live-события.
+
+Выполняются задачами news.tasks уже после ответа на запрос,
+который изменил новости или комментарии. Аргументы — id,
+поэтому задачи переживают файловую очередь.
+"""
+from . import edge_cache, feeds, live
+from .models import Comment
+from .tasks import task
+
+
+@task()
+def news_changed(news_ids):
+    """Правка, скрытие или удаление новостей и их комментариев."""
+    edge_cache.news_changed(news_ids)
+    feeds.news_changed(news_ids)
+
+
+@task()
+def comments_created(comment_ids):
+    """Новые комментарии: публикация, ленты и страницы их новостей."""
+    comments = list(
+        Comment.objects.filter(pk__in=comment_ids)
+        .select_related('author').order_by('pk')
+    )
+    live.comments_created(comments)
+    feeds.comments_created(comments)
+    edge_cache.news_changed({comment.news_id for comment in comments})
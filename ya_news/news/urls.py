@@ -1,16 +1,36 @@
 from django.urls import path
 
-from news import views
+from news import api, feeds, views
 
 app_name = 'news'
 
 urlpatterns = [
     path('', views.NewsList.as_view(), name='home'),
     path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path(
+        'archive/<int:year>/<int:month>/',
+        views.NewsMonthArchive.as_view(),
+        name='archive'
+    ),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
         name='delete'
     ),
     path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
+    path('my_comments/', views.CommentHistory.as_view(), name='history'),
+    path('thread/<int:pk>/', views.CommentThread.as_view(), name='thread'),
+    path('feed/<str:feed_format>/', feeds.feed_view, name='feed'),
+    path(
+        'news/<int:pk>/feed/<str:feed_format>/',
+        feeds.feed_view,
+        name='comments_feed'
+    ),
+    path('api/news/', api.news_list, name='api_list'),
+    path('api/news/<int:pk>/', api.news_detail, name='api_detail'),
+    path(
+        'api/news/<int:pk>/comments/',
+        api.news_comments,
+        name='api_comments'
+    ),
 ]
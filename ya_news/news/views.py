@@ -1,56 +1,143 @@
+from datetime import date
+
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.views import generic
 
-from .forms import CommentForm
-from .models import Comment, News
+from . import leaderboard, months
+from .history import history_page, parse_cursor
+from .archive import comments_counts
+from .counters import news_views
+from .live import live_path
+from .forms import CommentForm, NewCommentForm
+from .models import ArchivedComment, Comment, News
+from .threads import MAX_INDENT, indent, subtree, thread_page
+from .write_behind import QueueFull, comment_queue
+
+
+def get_page_number(request):
+    """Номер страницы из ?page, по умолчанию первая."""
+    page = request.GET.get('page', '')
+    return int(page) if page.isdigit() and int(page) > 0 else 1
 
 
 class NewsList(generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
+    orderings = {'popular': ('-views', '-date')}
 
     def get_queryset(self):
         """
         Выводим только несколько последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество определяется в настройках проекта,
+        с параметром sort=popular — самые просматриваемые.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        queryset = self.model.objects.filter(
+            is_hidden=False
+        ).only('title', 'date', 'excerpt')
+        ordering = self.orderings.get(self.request.GET.get('sort'))
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset[:settings.NEWS_COUNT_ON_HOME_PAGE]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        news_list = context['object_list']
+        counts = comments_counts([news.pk for news in news_list])
+        for news in news_list:
+            news.comments_count = counts[news.pk]
+        context['most_discussed'] = leaderboard.top(
+            settings.MOST_DISCUSSED_COUNT
+        )
+        context['archive_months'] = months.sidebar()
+        return context
+
+
+class NewsMonthArchive(generic.TemplateView):
+    """Новости одного месяца по страницам, новые сначала."""
+    template_name = 'news/archive.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if not 1 <= self.kwargs['month'] <= 12:
+            raise Http404('Нет такого месяца.')
+        month = date(self.kwargs['year'], self.kwargs['month'], 1)
+        page = get_page_number(self.request)
+        context['news_list'], has_next = months.month_page(
+            month, page, settings.ARCHIVE_NEWS_PER_PAGE
+        )
+        context['month'] = month
+        context['previous_page'] = page - 1
+        context['next_page'] = page + 1 if has_next else 0
+        context['archive_months'] = months.sidebar()
+        return context
+
+
+class CommentThreadsMixin:
+    """Страница веток комментариев новости, номер страницы в ?page."""
+
+    def get_page_number(self):
+        return get_page_number(self.request)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = self.get_page_number()
+        context['comments'], has_next = thread_page(
+            self.object, page,
+            settings.COMMENT_THREADS_PER_PAGE,
+            settings.COMMENT_REPLIES_PER_THREAD,
+        )
+        context['previous_page'] = page - 1
+        context['next_page'] = page + 1 if has_next else 0
+        return context
 
 
-class NewsDetail(generic.DetailView):
+class NewsDetail(CommentThreadsMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
         obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
+            self.model.objects.filter(is_hidden=False), pk=self.kwargs['pk']
         )
-        return obj
+        news_views.hit(obj.pk)
+        return news_views.merge(obj)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.request.user.is_authenticated:
-            context['form'] = CommentForm()
+        if settings.LIVE_COMMENTS and not self.object.is_archived:
+            context['live_url'] = live_path(self.object.pk)
+            context['max_indent'] = MAX_INDENT
+        if self.request.user.is_authenticated and not self.object.is_archived:
+            reply_to = self.request.GET.get('reply_to', '')
+            context['form'] = NewCommentForm(
+                news=self.object,
+                initial={'parent': reply_to if reply_to.isdigit() else None},
+            )
         return context
 
 
 class NewsComment(
         LoginRequiredMixin,
+        CommentThreadsMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
     model = News
-    form_class = CommentForm
+    queryset = News.objects.filter(is_hidden=False, is_archived=False)
+    form_class = NewCommentForm
     template_name = 'news/detail.html'
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['news'] = self.object
+        return kwargs
+
     def post(self, request, *args, **kwargs):
         self.object = self.get_object()
         return super().post(request, *args, **kwargs)
@@ -59,7 +146,33 @@ class NewsComment(
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        if not settings.COMMENT_WRITE_BEHIND:
+            comment.save()
+            return super().form_valid(form)
+        try:
+            pending = comment_queue().submit(comment)
+        except QueueFull:
+            response = HttpResponse(
+                'Слишком много комментариев, попробуйте позже.', status=503
+            )
+            response['Retry-After'] = settings.COMMENT_WRITE_BEHIND_RETRY_AFTER
+            return response
+        try:
+            pending.wait(settings.COMMENT_WRITE_BEHIND_COMMIT_TIMEOUT)
+        except TimeoutError:
+            # Комментарий остаётся в очереди и будет записан:
+            # повторная отправка создала бы копию.
+            return HttpResponse(
+                'Комментарий принят и появится чуть позже, '
+                'отправлять его ещё раз не нужно.',
+                status=202,
+            )
+        except Exception:
+            # Ошибку записи уже залогировала очередь.
+            form.add_error(
+                None, 'Не удалось сохранить комментарий, попробуйте ещё раз.'
+            )
+            return self.form_invalid(form)
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -78,6 +191,43 @@ class NewsDetailView(generic.View):
         return view(request, *args, **kwargs)
 
 
+class CommentThread(generic.DetailView):
+    """Ветка комментариев целиком, в том числе из архива."""
+    model = Comment
+    template_name = 'news/thread.html'
+
+    def get_object(self, queryset=None):
+        for model in (Comment, ArchivedComment):
+            comment = model.objects.filter(
+                pk=self.kwargs['pk'], news__is_hidden=False
+            ).select_related('news').first()
+            if comment is not None:
+                return comment
+        raise Http404('Комментарий не найден.')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['news'] = self.object.news
+        context['comments'] = indent(
+            list(subtree(self.object)), self.object.depth
+        )
+        return context
+
+
+class CommentHistory(LoginRequiredMixin, generic.TemplateView):
+    """Комментарии пользователя ко всем новостям, новые сначала."""
+    template_name = 'news/history.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'], context['next_cursor'] = history_page(
+            self.request.user,
+            parse_cursor(self.request.GET.get('after')),
+            settings.COMMENT_HISTORY_PER_PAGE,
+        )
+        return context
+
+
 class CommentBase(LoginRequiredMixin):
     """Базовый класс для работы с комментариями."""
     model = Comment
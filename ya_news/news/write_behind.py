@@ -0,0 +1,246 @@
+"""
+Отложенная пакетная запись комментариев.
+
+При всплеске комментариев каждый запрос в обычном режиме ждёт свою
+транзакцию, а SQLite выполняет пишущие транзакции строго по очереди.
+В режиме COMMENT_WRITE_BEHIND запросы кладут проверенные комментарии
+в очередь процесса, фоновый поток сохраняет их пачками одной
+транзакцией, а запрос ждёт фиксации своей пачки.
+"""
+import atexit
+import logging
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+from time import monotonic
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from . import leaderboard, updates
+from .threads import fill_paths
+from .models import Comment
+
+logger = logging.getLogger(__name__)
+
+STOP = object()
+MS = 1000
+
+_lock = Lock()
+_comment_queue = None
+
+
+class QueueFull(Exception):
+    """Очередь переполнена или уже остановлена."""
+
+
+class Pending:
+    """Ожидание записи одного элемента очереди."""
+
+    __slots__ = ('item', 'error', '_done')
+
+    def __init__(self, item):
+        self.item = item
+        self.error = None
+        self._done = Event()
+
+    def finish(self, error=None):
+        self.error = error
+        self._done.set()
+
+    def wait(self, timeout=None):
+        """Ждёт фиксации пачки и пробрасывает ошибку записи."""
+        if not self._done.wait(timeout):
+            raise TimeoutError('Пачка не записана за отведённое время.')
+        if self.error is not None:
+            raise self.error
+        return self.item
+
+
+class WriteBehindQueue:
+    """
+    Ограниченная очередь с фоновым потоком записи.
+
+    flush получает список элементов и должен записать их целиком;
+    если он падает, элементы пробуют записать по одному через
+    flush_one, чтобы ошибка одной строки не задела остальные.
+    """
+
+    def __init__(self, flush, flush_one=None, max_size=1000, max_batch=100,
+                 max_delay=0.005, put_timeout=0.1):
+        self.flush = flush
+        self.flush_one = flush_one
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.put_timeout = put_timeout
+        self._queue = Queue(max_size)
+        self._lock = Lock()
+        self._closed = False
+        self._thread = Thread(
+            target=self._run, name='write-behind', daemon=True,
+        )
+        self._thread.start()
+
+    def submit(self, item):
+        """
+        Ставит элемент в очередь и возвращает Pending.
+
+        Если очередь заполнена дольше put_timeout, бросает QueueFull:
+        запрос должен получить отказ, а не копить очередь без предела.
+        """
+        with self._lock:
+            if self._closed:
+                raise QueueFull('Очередь остановлена.')
+        pending = Pending(item)
+        try:
+            self._queue.put(pending, timeout=self.put_timeout)
+        except Full:
+            raise QueueFull('Очередь записи переполнена.') from None
+        return pending
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    def stop(self, timeout=None):
+        """Перестаёт принимать элементы и дописывает очередь."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(STOP)
+        self._thread.join(timeout)
+
+    def _collect(self, first):
+        """Добирает пачку до max_batch элементов или до max_delay."""
+        batch = [first]
+        deadline = monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            timeout = deadline - monotonic()
+            if timeout <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=timeout)
+            except Empty:
+                break
+            if pending is STOP:
+                return batch, True
+            batch.append(pending)
+        return batch, False
+
+    def _run(self):
+        try:
+            stopped = False
+            while not stopped:
+                pending = self._queue.get()
+                if pending is STOP:
+                    break
+                batch, stopped = self._collect(pending)
+                self._write(batch)
+            # Элементы, попавшие в очередь одновременно с остановкой.
+            leftovers = []
+            while True:
+                try:
+                    pending = self._queue.get_nowait()
+                except Empty:
+                    break
+                if pending is not STOP:
+                    leftovers.append(pending)
+            for start in range(0, len(leftovers), self.max_batch):
+                self._write(leftovers[start:start + self.max_batch])
+        finally:
+            connection.close()
+
+    def _write(self, batch):
+        try:
+            self.flush([pending.item for pending in batch])
+        except Exception as error:
+            if self.flush_one is None or len(batch) == 1:
+                logger.exception('Не удалось записать пачку')
+                for pending in batch:
+                    pending.finish(error)
+                return
+            self._write_one_by_one(batch)
+            return
+        for pending in batch:
+            pending.finish()
+
+    def _write_one_by_one(self, batch):
+        for pending in batch:
+            try:
+                self.flush_one(pending.item)
+            except Exception as error:
+                logger.exception('Не удалось записать элемент')
+                pending.finish(error)
+            else:
+                pending.finish()
+
+
+def set_ids(comments):
+    """
+    Проставляет id строкам, только что вставленным bulk_create.
+
+    Внутри пишущей транзакции SQLite других писателей нет, поэтому
+    строки пачки получили подряд идущие id, последний из них — max(id).
+    """
+    last_pk = Comment.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first()
+    first_pk = last_pk - len(comments) + 1
+    for offset, comment in enumerate(comments):
+        comment.pk = first_pk + offset
+
+
+def flush_comments(comments):
+    """
+    Сохраняет пачку комментариев одной транзакцией.
+
+    bulk_create не вызывает save(), не отправляет post_save и не
+    возвращает id в SQLite, поэтому HTML текста, id, пути веток,
+    счётчики обсуждений и публикация готовятся здесь же.
+    """
+    for comment in comments:
+        comment.set_depth()
+        comment.render()
+    try:
+        with transaction.atomic():
+            Comment.objects.bulk_create(comments)
+            set_ids(comments)
+            fill_paths(comments[0].pk, comments[-1].pk)
+            leaderboard.comments_added(comments)
+            updates.comments_created.defer(
+                [comment.pk for comment in comments]
+            )
+    except DatabaseError:
+        # Следующая пачка откроет соединение заново.
+        connection.close()
+        raise
+
+
+def flush_comment(comment):
+    with transaction.atomic():
+        comment.save()
+
+
+def comment_queue():
+    """Очередь комментариев процесса, создаётся при первом обращении."""
+    global _comment_queue
+    with _lock:
+        if _comment_queue is None:
+            _comment_queue = WriteBehindQueue(
+                flush_comments,
+                flush_comment,
+                max_size=settings.COMMENT_WRITE_BEHIND_QUEUE_SIZE,
+                max_batch=settings.COMMENT_WRITE_BEHIND_BATCH_SIZE,
+                max_delay=settings.COMMENT_WRITE_BEHIND_DELAY_MS / MS,
+                put_timeout=settings.COMMENT_WRITE_BEHIND_PUT_TIMEOUT_MS / MS,
+            )
+        return _comment_queue
+
+
+@atexit.register
+def shutdown(timeout=None):
+    """Дописывает очередь комментариев перед завершением процесса."""
+    global _comment_queue
+    with _lock:
+        queue, _comment_queue = _comment_queue, None
+    if queue is not None:
+        queue.stop(timeout)
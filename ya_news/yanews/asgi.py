@@ -2,6 +2,9 @@
 ASGI config for yanews project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests to /news/<pk>/live/ are answered by the Server-Sent Events
+stream from news.live, static files by yacommon.assets, everything else
+by Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -13,4 +16,20 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from news import live  # noqa: E402
+from yacommon import assets  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http':
+        match = live.PATH.match(scope['path'])
+        if match is not None:
+            await live.events(scope, receive, send, int(match['pk']))
+            return
+        static_file = assets.find(scope['path'])
+        if static_file is not None and scope['method'] in ('GET', 'HEAD'):
+            await assets.serve_asgi(scope, receive, send, static_file)
+            return
+    await django_application(scope, receive, send)
@@ -1,8 +1,11 @@
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Общий с другим проектом код, см. yacommon/.
+sys.path.append(str(BASE_DIR.parent))
 
 SECRET_KEY = 'django-insecure-7)dgs++2!#==aye4rd=5)c)bw0eokiyqx0hts6#t80!$c&$s+('
 
@@ -17,15 +20,20 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'yacommon.apps.CommonConfig',
     'news.apps.NewsConfig',
 ]
 
 MIDDLEWARE = [
+    'yacommon.middleware.TimingMiddleware',
+    'yacommon.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'news.middleware.AnonymousCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'news.middleware.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -73,6 +81,12 @@ USE_L10N = True
 USE_TZ = True
 
 STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'collected_static'
+STATICFILES_STORAGE = 'yacommon.assets.CompressedManifestStorage'
+# Отдавать STATIC_ROOT из wsgi.py и asgi.py, если перед приложением
+# нет nginx. Файлы без хеша в имени кэшируются на STATIC_MAX_AGE секунд.
+SERVE_STATIC = True
+STATIC_MAX_AGE = 300
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -80,3 +94,88 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_SAMPLE_RATE = 0.1
+SLOW_QUERY_LOG_FILE = BASE_DIR / 'slow_queries.log'
+
+# Адреса, с которых /metrics/ доступна без входа, например сервера
+# Prometheus. Не 127.0.0.1, если перед приложением стоит прокси.
+METRICS_ALLOWED_IPS = ()
+
+# Отложенная пакетная запись комментариев, см. news/write_behind.py.
+COMMENT_WRITE_BEHIND = False
+COMMENT_WRITE_BEHIND_QUEUE_SIZE = 1000
+COMMENT_WRITE_BEHIND_BATCH_SIZE = 100
+COMMENT_WRITE_BEHIND_DELAY_MS = 5
+COMMENT_WRITE_BEHIND_PUT_TIMEOUT_MS = 100
+COMMENT_WRITE_BEHIND_COMMIT_TIMEOUT = 5
+COMMENT_WRITE_BEHIND_RETRY_AFTER = 1
+
+# Период записи счётчиков просмотров в базу, секунды; 0 — только при выходе.
+VIEW_COUNTER_FLUSH_INTERVAL = 5
+
+# Блок «самые обсуждаемые» на главной: окно в днях и размер списка.
+MOST_DISCUSSED_DAYS = 7
+MOST_DISCUSSED_COUNT = 5
+
+# Ветки комментариев на странице новости и первые ответы в каждой.
+COMMENT_THREADS_PER_PAGE = 20
+COMMENT_REPLIES_PER_THREAD = 3
+
+# JSON API: новостей и комментариев на странице, строк в одной части потока.
+API_NEWS_PER_PAGE = 20
+API_COMMENTS_PER_PAGE = 500
+API_STREAM_CHUNK = 100
+
+# Новые комментарии через Server-Sent Events, см. news/live.py.
+# Поток обслуживает только ASGI-приложение yanews.asgi.
+LIVE_COMMENTS = False
+LIVE_BROKER = 'news.live.LocalBroker'
+LIVE_QUEUE_SIZE = 16
+LIVE_HEARTBEAT = 15
+
+# Кэшируемые прокси страницы для анонимов, см. news/edge_cache.py.
+# s-maxage и stale-while-revalidate в секундах, страниц в памяти процесса.
+ANONYMOUS_CACHE = False
+ANONYMOUS_CACHE_MAX_AGE = 60
+ANONYMOUS_CACHE_STALE = 300
+ANONYMOUS_CACHE_SIZE = 1000
+ANONYMOUS_CACHE_PURGER = 'news.edge_cache.NullPurger'
+ANONYMOUS_CACHE_PROXY = 'http://127.0.0.1:6081'
+
+# Элементов в лентах Atom и RSS, лент в памяти процесса и сколько
+# секунд лента живёт без сброса сигналом, см. news/feeds.py.
+FEED_ITEMS = 20
+FEED_CACHE_SIZE = 1000
+FEED_CACHE_MAX_AGE = 60
+
+# Новостей на странице архива за месяц, см. news/months.py.
+ARCHIVE_NEWS_PER_PAGE = 20
+
+# Комментариев на странице «Мои комментарии», см. news/history.py.
+COMMENT_HISTORY_PER_PAGE = 50
+
+# Обслуживание базы: каталог и число резервных копий, страниц
+# за шаг копирования и vacuum, пауза между шагами в секундах,
+# строк на индекс для ANALYZE и окно (час начала, час конца)
+# по местному времени для ANALYZE и vacuum.
+DB_BACKUP_DIR = BASE_DIR / 'backups'
+DB_BACKUP_KEEP = 7
+DB_BACKUP_PAGES = 100
+DB_VACUUM_PAGES = 200
+DB_MAINTENANCE_PAUSE = 0.01
+DB_ANALYSIS_LIMIT = 1000
+DB_MAINTENANCE_WINDOW = (3, 5)
+
+# Отложенные задачи, см. news/tasks.py: потоков в пуле, задач
+# в его очереди, файл SQLite для очереди, переживающей перезапуск
+# (None — только память), через сколько секунд задачи упавшего
+# процесса считаются брошенными, сколько ждать задачи при остановке.
+# TASKS_SYNC выполняет задачи сразу после фиксации, для тестов.
+TASKS_WORKERS = 4
+TASKS_QUEUE_SIZE = 1000
+TASKS_QUEUE_FILE = None
+TASKS_QUEUE_LEASE = 600
+TASKS_SHUTDOWN_TIMEOUT = 10
+TASKS_SYNC = False
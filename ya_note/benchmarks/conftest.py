@@ -0,0 +1,2 @@
+"""Фикстуры бенчмарков, см. yacommon/benchmarks.py."""
+from yacommon.benchmarks import *  # noqa: F401,F403
@@ -0,0 +1,89 @@
+"""Бенчмарки горячих путей YaNote."""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.urls import reverse
+import pytest
+
+from notes.counters import note_views
+from notes.forms import NoteForm
+from notes.models import Note
+
+User = get_user_model()
+
+
+def seed(users_count, notes_count):
+    """Создаёт users_count пользователей по notes_count заметок."""
+    User.objects.bulk_create(
+        User(username=f'Пользователь {index}') for index in range(users_count)
+    )
+    users = User.objects.order_by('pk')
+    Note.objects.bulk_create(
+        Note(
+            author=user, title=f'Заметка {index}', text='Текст заметки.',
+            slug=f'note-{user.pk}-{index}',
+        )
+        for user in users
+        for index in range(notes_count)
+    )
+    return users.first()
+
+
+@pytest.fixture
+def author(dataset_size, settings):
+    """Фикстура набора данных U пользователей × K заметок."""
+    settings.VIEW_COUNTER_FLUSH_INTERVAL = 0
+    yield seed(*dataset_size)
+    note_views.pending.drain()
+
+
+@pytest.fixture
+def author_client(author):
+    client = Client()
+    client.force_login(author)
+    return client
+
+
+@pytest.mark.django_db
+def test_notes_list(bench, author_client, dataset_size):
+    url = reverse('notes:list')
+    bench.measure(
+        f'notes_list[{dataset_size[0]}x{dataset_size[1]}]',
+        lambda index: author_client.get(url),
+    )
+
+
+@pytest.mark.django_db
+def test_note_create(bench, author_client, dataset_size):
+    url = reverse('notes:add')
+
+    def post(index):
+        response = author_client.post(
+            url, {'title': f'Новая заметка {index}', 'text': 'Текст'}
+        )
+        assert response.status_code == 302
+
+    bench.measure(f'note_create[{dataset_size[0]}x{dataset_size[1]}]', post)
+
+
+@pytest.mark.django_db
+def test_slug_validation(bench, author, dataset_size):
+    def validate(index):
+        form = NoteForm(data={'title': f'Заметка {index}', 'text': 'Текст'})
+        assert form.is_valid()
+
+    bench.measure(
+        f'slug_validation[{dataset_size[0]}x{dataset_size[1]}]', validate
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_live_notes_list(bench, live_get, author_client, dataset_size):
+    url = reverse('notes:list')
+    cookie = author_client.cookies[settings.SESSION_COOKIE_NAME].value
+    headers = {'Cookie': f'{settings.SESSION_COOKIE_NAME}={cookie}'}
+    bench.measure(
+        f'live_notes_list[{dataset_size[0]}x{dataset_size[1]}]',
+        lambda index: live_get(url, headers),
+        count_queries=False,
+    )
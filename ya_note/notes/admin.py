@@ -1,5 +1,62 @@
 from django.contrib import admin
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
 
-from .models import Note
+from .models import Note, RequestProfile
 
 admin.site.register(Note)
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """Просмотр профилей запросов, снятых ProfilerMiddleware."""
+    list_display = (
+        'created', 'method', 'path', 'view_name',
+        'status_code', 'duration', 'mode', 'user',
+    )
+    list_filter = ('mode', 'view_name')
+    list_select_related = ('user',)
+    fields = (
+        'created', 'user', 'method', 'path', 'view_name',
+        'status_code', 'duration', 'mode', 'report_text', 'collapsed_link',
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Отчёт')
+    def report_text(self, obj):
+        return format_html('<pre>{}</pre>', obj.report)
+
+    @admin.display(description='Стеки для flamegraph')
+    def collapsed_link(self, obj):
+        url = reverse('admin:notes_requestprofile_collapsed', args=(obj.pk,))
+        return format_html('<a href="{}">Скачать collapsed stacks</a>', url)
+
+    def get_urls(self):
+        return [
+            path(
+                '<int:pk>/collapsed/',
+                self.admin_site.admin_view(self.collapsed_view),
+                name='notes_requestprofile_collapsed',
+            ),
+        ] + super().get_urls()
+
+    def collapsed_view(self, request, pk):
+        """Отдаёт стеки в формате, который понимает flamegraph.pl."""
+        if not self.has_view_permission(request):
+            return HttpResponse(status=403)
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        response = HttpResponse(
+            profile.collapsed, content_type='text/plain; charset=utf-8'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="profile-{pk}.collapsed"'
+        )
+        return response
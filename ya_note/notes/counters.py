@@ -0,0 +1,9 @@
+"""Счётчик просмотров, см. yacommon/counters.py."""
+import atexit
+
+from yacommon.counters import ViewCounter
+
+from .models import Note
+
+note_views = ViewCounter(Note)
+atexit.register(note_views.stop)
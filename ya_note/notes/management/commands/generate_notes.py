@@ -0,0 +1,99 @@
+from datetime import date, datetime, time
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from notes.models import Note
+from yacommon.synthetic import (
+    USER_COLUMNS, TextGenerator, deferred_indexes, fast_load, insert_rows,
+    next_id, user_rows,
+)
+
+USER_TABLE = 'auth_user'
+MAX_VIEWS = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро заполняет базу детерминированными пользователями '
+        'и заметками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument(
+            '--notes', type=int, default=100000,
+            help='Общее количество заметок.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--since', type=date.fromisoformat, default=date.today(),
+            help='Дата регистрации пользователей (YYYY-MM-DD).',
+        )
+        parser.add_argument('--batch-size', type=int, default=50000)
+        parser.add_argument(
+            '--keep-indexes', action='store_true',
+            help='Не перестраивать индексы: быстрее для небольших добавок.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда рассчитана только на SQLite.')
+        if options['notes'] and not options['users']:
+            raise CommandError('Заметкам нужны пользователи.')
+        generator = TextGenerator(options['seed'])
+        note_table = Note._meta.db_table
+        first_user = next_id(USER_TABLE)
+        first_note = next_id(note_table)
+        title_length = Note._meta.get_field('title').max_length
+        tables = [USER_TABLE, note_table]
+        started = perf_counter()
+        with fast_load(), deferred_indexes(
+                [] if options['keep_indexes'] else tables):
+            total = insert_rows(
+                USER_TABLE, USER_COLUMNS,
+                user_rows(
+                    generator, first_user, options['users'],
+                    datetime.combine(options['since'], time.min),
+                ),
+                options['batch_size'],
+            )
+            total += insert_rows(
+                note_table,
+                ('id', 'title', 'text', 'slug', 'author_id', 'views'),
+                self.note_rows(
+                    generator, options['notes'], options['users'],
+                    first_user, first_note, title_length,
+                ),
+                options['batch_size'],
+            )
+        elapsed = perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано строк: {total} за {elapsed:.1f} с '
+            f'({total / elapsed:.0f} строк/с).'
+        ))
+
+    def note_rows(self, generator, count, users_count, first_user,
+                  first_note, title_length):
+        """
+        Строки заметок.
+
+        Тексты выбираются из заранее собранных абзацев, чтобы генерация
+        не отставала от executemany. Slug строится из id, поэтому
+        уникален без проверок. Уникальный индекс по нему удалить нельзя,
+        а дополнение нулями делает вставки в него последовательными.
+        """
+        pool = generator.pool
+        pool_size = len(pool)
+        texts = [generator.paragraph(1, 4) for _ in range(pool_size)]
+        rand = generator.random.random
+        for note_id in range(first_note, first_note + count):
+            yield (
+                note_id,
+                pool[int(pool_size * rand())][:title_length],
+                texts[int(pool_size * rand())],
+                f'note-{note_id:09d}',
+                first_user + int(users_count * rand()),
+                int(MAX_VIEWS * rand() ** 3),
+            )
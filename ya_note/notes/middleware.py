@@ -0,0 +1,9 @@
+"""Промежуточные слои приложения."""
+from yacommon import middleware
+
+from .models import RequestProfile
+
+
+class ProfilerMiddleware(middleware.ProfilerMiddleware):
+    """Профилировщик запросов, профили пишутся в RequestProfile."""
+    model = RequestProfile
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.15 on 2026-10-19 13:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_requestprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='views',
+            field=models.PositiveIntegerField(db_index=True, default=0, verbose_name='Просмотры'),
+        ),
+    ]
@@ -27,6 +27,7 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    views = models.PositiveIntegerField('Просмотры', default=0, db_index=True)
 
     def __str__(self):
         return self.title
@@ -36,3 +37,30 @@ class Note(models.Model):
             max_slug_length = self._meta.get_field('slug').max_length
             self.slug = slugify(self.title)[:max_slug_length]
         super().save(*args, **kwargs)
+
+
+class RequestProfile(models.Model):
+    """Профиль запроса, снятый по требованию сотрудника."""
+    created = models.DateTimeField(auto_now_add=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+    )
+    method = models.CharField(max_length=10)
+    path = models.TextField()
+    view_name = models.CharField(max_length=200, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    duration = models.FloatField('Длительность, мс')
+    mode = models.CharField(max_length=20)
+    report = models.TextField('Отчёт')
+    collapsed = models.TextField('Стеки в формате collapsed')
+
+    class Meta:
+        ordering = ('-created',)
+        verbose_name = 'Профиль запроса'
+        verbose_name_plural = 'Профили запросов'
+
+    def __str__(self):
+        return f'{self.method} {self.path}'
@@ -0,0 +1,61 @@
+"""Модуль фикстур pytest для запуска тестов приложения."""
+from django.db import DEFAULT_DB_ALIAS
+from django.test.utils import (
+    override_settings, setup_databases, teardown_databases,
+)
+import pytest
+
+from notes.counters import note_views
+from yacommon import snapshot
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(request, django_test_environment, django_db_blocker,
+                    django_db_createdb):
+    """Фикстура тестовой базы, восстанавливаемой из снимка миграций."""
+    verbosity = request.config.option.verbose
+    with django_db_blocker.unblock():
+        restored = (
+            None if django_db_createdb
+            else snapshot.restore(DEFAULT_DB_ALIAS)
+        )
+        if restored:
+            db_cfg = [restored]
+        else:
+            db_cfg = setup_databases(verbosity=verbosity, interactive=False)
+            snapshot.save(DEFAULT_DB_ALIAS)
+    yield
+    with django_db_blocker.unblock():
+        teardown_databases(db_cfg, verbosity=verbosity)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def fast_password_hasher():
+    """Фикстура быстрого хеширования паролей."""
+    with override_settings(
+        PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']
+    ):
+        yield
+
+
+@pytest.fixture(scope='session', autouse=True)
+def view_counter_without_thread():
+    """Фикстура, отключающая фоновую запись счётчиков просмотров."""
+    with override_settings(VIEW_COUNTER_FLUSH_INTERVAL=0):
+        yield
+
+
+@pytest.fixture(scope='session', autouse=True)
+def static_without_manifest():
+    """Фикстура, отдающая статику без collectstatic и манифеста."""
+    with override_settings(STATICFILES_STORAGE=(
+        'django.contrib.staticfiles.storage.StaticFilesStorage'
+    )):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def pending_views():
+    """Фикстура, не дающая просмотрам одного теста попасть в другой."""
+    yield note_views.pending
+    note_views.pending.drain()
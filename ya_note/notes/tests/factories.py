@@ -0,0 +1,33 @@
+"""Фабрики объектов для тестов: всё создаётся одним bulk_create."""
+from django.contrib.auth import get_user_model
+from django.test import Client
+
+from notes.models import Note
+
+User = get_user_model()
+
+
+def make_users(*usernames):
+    """Создаёт пользователей и возвращает их в порядке имён."""
+    User.objects.bulk_create(User(username=name) for name in usernames)
+    users = User.objects.in_bulk(usernames, field_name='username')
+    return [users[name] for name in usernames]
+
+
+def logged_in_client(user):
+    """Клиент с выполненным входом пользователя."""
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def make_notes(author, count, prefix='probe'):
+    """Создаёт count заметок автора со slug вида prefix0, prefix1..."""
+    Note.objects.bulk_create(
+        Note(
+            author=author, title=f'Заголовок {index}',
+            text=f'Tекст {index}', slug=f'{prefix}{index}',
+        )
+        for index in range(count)
+    )
+    return list(Note.objects.filter(author=author).order_by('pk'))
@@ -0,0 +1,117 @@
+"""Модуль тестов отдачи статики."""
+import gzip
+import shutil
+import tempfile
+from pathlib import Path
+from wsgiref.util import setup_testing_defaults
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from yacommon import assets
+from yacommon.management.commands.vendor_static import ASSETS
+
+NAME = 'admin/css/base.css'
+STATIC_ROOT = Path(tempfile.mkdtemp())
+
+
+class FileWrapper:
+    """wsgi.file_wrapper сервера: файл уходит целиком, без чтения в Python."""
+
+    def __init__(self, file, block_size):
+        self.file = file
+
+    def content(self):
+        with self.file:
+            return self.file.read()
+
+
+@override_settings(
+    STATIC_ROOT=STATIC_ROOT,
+    STATICFILES_STORAGE='yacommon.assets.CompressedManifestStorage',
+)
+class TestStaticFiles(SimpleTestCase):
+    """Класс тестов collectstatic и WSGI-приложения статики."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Метод сборки статики один раз на класс."""
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        assets.reset_index()
+
+    @classmethod
+    def tearDownClass(cls):
+        assets.reset_index()
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def get(self, path, **headers):
+        environ = {'PATH_INFO': path, 'wsgi.file_wrapper': FileWrapper}
+        environ.update(headers)
+        setup_testing_defaults(environ)
+        started = []
+        self.django_calls = 0
+
+        def django(environ, start_response):
+            self.django_calls += 1
+            start_response('404 Not Found', [])
+            return [b'django']
+
+        body = assets.StaticFilesApplication(django)(
+            environ, lambda status, headers: started.append((status, headers))
+        )
+        status, headers = started[0]
+        return status, dict(headers), body
+
+    def test_hashed_file_is_immutable(self):
+        """Метод проверки сжатого файла с хешем и вечным кэшем."""
+        hashed = staticfiles_storage.stored_name(NAME)
+        self.assertNotEqual(hashed, NAME)
+        status, headers, body = self.get(
+            f'/static/{hashed}', HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(headers['Cache-Control'], assets.IMMUTABLE)
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertIsInstance(body, FileWrapper)
+        self.assertEqual(
+            gzip.decompress(body.content()),
+            (STATIC_ROOT / hashed).read_bytes(),
+        )
+
+    def test_plain_file_and_not_modified(self):
+        """Метод проверки файла без хеша и ответа 304."""
+        status, headers, body = self.get(f'/static/{NAME}')
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual(headers['Cache-Control'], 'public, max-age=300')
+        self.assertEqual(body.content(), (STATIC_ROOT / NAME).read_bytes())
+        status, _, body = self.get(
+            f'/static/{NAME}',
+            HTTP_IF_MODIFIED_SINCE=http_date(
+                (STATIC_ROOT / NAME).stat().st_mtime
+            ),
+        )
+        self.assertEqual(status, '304 Not Modified')
+        self.assertEqual(body, [])
+
+    def test_other_paths_go_to_django(self):
+        """Метод проверки путей, которых нет в индексе статики."""
+        for path in ('/static/missing.css', '/static/../', '/notes/'):
+            with self.subTest(path=path):
+                self.get(path)
+                self.assertEqual(self.django_calls, 1)
+
+
+class TestVendorStatic(TestCase):
+    """Класс тестов подключения Bootstrap."""
+
+    def test_pages_use_local_bootstrap(self):
+        """Метод проверки, что Bootstrap отдаёт свой сервер, без CDN."""
+        name, url, _ = ASSETS[0]
+        response = self.client.get(reverse('notes:home'))
+        self.assertNotContains(response, url)
+        self.assertContains(response, f'/static/{name}')
@@ -0,0 +1,32 @@
+"""Модуль тестов management-команд."""
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from notes.models import Note
+
+User = get_user_model()
+
+
+class TestGenerateNotes(TestCase):
+    """Класс тестов генератора синтетических данных."""
+
+    OPTIONS = dict(users=4, notes=30, seed=7, batch_size=8)
+
+    def generated_rows(self):
+        return (
+            list(User.objects.values_list('username', 'first_name')),
+            list(Note.objects.values_list(
+                'title', 'text', 'slug', 'author_id', 'views'
+            )),
+        )
+
+    def test_generate_notes_is_deterministic(self):
+        """Метод проверки количества и воспроизводимости данных."""
+        call_command('generate_notes', '--since=2024-01-01', **self.OPTIONS)
+        first_run = self.generated_rows()
+        self.assertEqual([len(rows) for rows in first_run], [4, 30])
+        Note.objects.all().delete()
+        User.objects.all().delete()
+        call_command('generate_notes', '--since=2024-01-01', **self.OPTIONS)
+        self.assertEqual(self.generated_rows(), first_run)
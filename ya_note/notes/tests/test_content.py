@@ -1,12 +1,11 @@
 """Модуль тестов проверки контента страниц."""
-from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.test import TestCase
 from django.urls import reverse
 
 from notes.models import Note
+from notes.tests.factories import logged_in_client, make_notes, make_users
 from notes.forms import NoteForm
 
-User = get_user_model()
 LIST_URL = reverse('notes:list')
 NOTE_ADD_URL = reverse('notes:add')
 SLUG = 'title'
@@ -21,16 +20,9 @@ class TestNotesListPage(TestCase):
     @classmethod
     def setUpTestData(cls):
         """Метод подготовки данных к тестам."""
-        cls.author = User.objects.create(username='Автор')
-        cls.author_client = Client()
-        cls.author_client.force_login(cls.author)
-        all_notes = [
-            Note(
-                author=cls.author, title=f'Заголовок {index}',
-                text=f'Tекст {index}', slug=f'probe{index}')
-            for index in range(cls.NOTES_COUNT)
-        ]
-        Note.objects.bulk_create(all_notes)
+        cls.author, = make_users('Автор')
+        cls.author_client = logged_in_client(cls.author)
+        make_notes(cls.author, cls.NOTES_COUNT)
 
     def test_notes_order(self):
         """Метод проверки порядка выведения списка заметок."""
@@ -55,12 +47,9 @@ class TestListAddEditNotePages(TestCase):
     @ classmethod
     def setUpTestData(cls):
         """Метод подготовки данных к тестам."""
-        cls.author = User.objects.create(username='Автор')
-        cls.author_client = Client()
-        cls.author_client.force_login(cls.author)
-        cls.reader = User.objects.create(username='Читатель простой')
-        cls.reader_client = Client()
-        cls.reader_client.force_login(cls.reader)
+        cls.author, cls.reader = make_users('Автор', 'Читатель простой')
+        cls.author_client = logged_in_client(cls.author)
+        cls.reader_client = logged_in_client(cls.reader)
         cls.note = Note.objects.create(
             author=cls.author, title='Заголовок',
             text='Текст заметки',
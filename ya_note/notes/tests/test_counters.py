@@ -0,0 +1,78 @@
+"""Модуль тестов счётчиков просмотров заметок."""
+from threading import Thread
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.counters import note_views
+from notes.models import Note
+from notes.tests.factories import logged_in_client, make_notes, make_users
+from yacommon.counters import ShardedCounter
+
+LIST_URL = reverse('notes:list')
+
+
+class TestNoteViews(TestCase):
+    """Класс тестов счётчиков просмотров."""
+
+    NOTES_COUNT = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        """Метод подготовки данных к тестам."""
+        cls.author, = make_users('Автор')
+        cls.author_client = logged_in_client(cls.author)
+        cls.notes = make_notes(cls.author, cls.NOTES_COUNT)
+
+    def tearDown(self):
+        note_views.pending.drain()
+
+    def test_detail_counts_without_writes(self):
+        """Метод проверки, что просмотр виден сразу и не пишет в базу."""
+        url = reverse('notes:detail', args=(self.notes[0].slug,))
+        self.author_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.author_client.get(url)
+        self.assertFalse(
+            [query for query in queries if query['sql'].startswith('UPDATE')]
+        )
+        self.assertEqual(response.context['note'].views, 2)
+
+    def test_flush_uses_single_update(self):
+        """Метод проверки записи всех счётчиков одним запросом."""
+        for index, note in enumerate(self.notes):
+            for _ in range(index):
+                note_views.hit(note.pk)
+        with self.assertNumQueries(1):
+            note_views.flush()
+        self.assertEqual(
+            list(Note.objects.order_by('pk').values_list('views', flat=True)),
+            list(range(self.NOTES_COUNT)),
+        )
+
+    def test_popular_ordering(self):
+        """Метод проверки сортировки по убыванию просмотров."""
+        for views, note in enumerate(self.notes):
+            Note.objects.filter(pk=note.pk).update(views=views)
+        response = self.author_client.get(LIST_URL, {'sort': 'popular'})
+        self.assertEqual(
+            list(response.context['object_list']), self.notes[::-1]
+        )
+
+
+class TestShardedCounter(SimpleTestCase):
+    """Класс тестов раскладки приращений по шардам."""
+
+    def test_threads_spread_over_shards(self):
+        """Метод проверки, что потоки пишут в разные шарды."""
+        counter = ShardedCounter()
+        threads = [Thread(target=counter.add, args=(0,)) for _ in range(32)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        used = [counts for _, counts in counter._shards if counts]
+        self.assertGreater(len(used), 1)
+        self.assertEqual(counter.get(0), 32)
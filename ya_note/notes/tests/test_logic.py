@@ -1,15 +1,14 @@
 """Модуль тестирования логики работы приложения."""
 from http import HTTPStatus
 
-from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.test import TestCase
 from django.urls import reverse
 from pytils.translit import slugify
 
 from notes.forms import WARNING
 from notes.models import Note
+from notes.tests.factories import logged_in_client, make_users
 
-User = get_user_model()
 LIST_URL = reverse('notes:list')
 NOTE_ADD_URL = reverse('notes:add')
 NOTE_REDIRECT_URL = reverse('notes:success')
@@ -28,12 +27,9 @@ class TestNoteCreateEditDelete(TestCase):
     @classmethod
     def setUpTestData(cls):
         """Метод подготовки данных для тестов."""
-        cls.author = User.objects.create(username='Автор')
-        cls.author_client = Client()
-        cls.author_client.force_login(cls.author)
-        cls.reader = User.objects.create(username='Читатель простой')
-        cls.reader_client = Client()
-        cls.reader_client.force_login(cls.reader)
+        cls.author, cls.reader = make_users('Автор', 'Читатель простой')
+        cls.author_client = logged_in_client(cls.author)
+        cls.reader_client = logged_in_client(cls.reader)
         cls.note = Note.objects.create(
             author=cls.author,
             title='Заголовок',
@@ -0,0 +1,65 @@
+"""Модуль тестов обслуживания базы."""
+import shutil
+import sqlite3
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+
+from notes.models import Note
+from notes.tests.factories import make_users
+from yacommon import maintenance
+
+
+class TestMaintenance(TransactionTestCase):
+    """Класс тестов резервной копии и vacuum без остановки сервиса."""
+
+    def setUp(self):
+        """Метод подготовки каталога копий."""
+        self.backups = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.backups)
+        settings = override_settings(
+            DB_BACKUP_DIR=self.backups, DB_MAINTENANCE_PAUSE=0,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.author, = make_users('Автор')
+
+    def test_backup_copies_in_page_steps(self):
+        """Метод проверки копии, снятой многими короткими шагами."""
+        Note.objects.create(
+            title='Заголовок', text='Текст', slug='note', author=self.author,
+        )
+        step, = maintenance.backup(pages=1)
+        self.assertGreater(step.locks, 1)
+        copy, = self.backups.iterdir()
+        with sqlite3.connect(copy) as target:
+            self.assertEqual(target.execute(
+                f'SELECT slug FROM {Note._meta.db_table}'
+            ).fetchall(), [('note',)])
+
+    def test_incremental_vacuum_frees_pages(self):
+        """Метод проверки vacuum порциями после удаления заметок."""
+        maintenance.enable_vacuum('main')
+        Note.objects.bulk_create(
+            Note(title='Заголовок', text='Текст' * 200, slug=f'note-{index}',
+                 author=self.author)
+            for index in range(500)
+        )
+        Note.objects.all().delete()
+        step = maintenance.vacuum('main', pages=10)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA freelist_count')
+            self.assertEqual(cursor.fetchone()[0], 0)
+        self.assertGreater(step.locks, 1)
+
+    def test_command_outside_window(self):
+        """Метод проверки: вне окна команда только снимает копию."""
+        out = StringIO()
+        with override_settings(DB_MAINTENANCE_WINDOW=(0, 0)):
+            call_command('maintain_db', stdout=out)
+        self.assertIn('backup main', out.getvalue())
+        self.assertIn('Вне окна обслуживания', out.getvalue())
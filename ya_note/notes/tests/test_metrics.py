@@ -0,0 +1,129 @@
+"""Модуль тестов замеров времени и журнала медленных запросов."""
+import json
+from http import HTTPStatus
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from yacommon import slow_queries
+from yacommon.metrics import registry
+from notes.models import Note
+
+User = get_user_model()
+LIST_URL = reverse('notes:list')
+NOTE_ADD_URL = reverse('notes:add')
+METRICS_URL = reverse('metrics')
+
+
+class TestTiming(TestCase):
+    """Класс тестов заголовка Server-Timing и страницы метрик."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Метод подготовки данных для тестов."""
+        cls.author = User.objects.create(username='Автор')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        Note.objects.create(
+            author=cls.author, title='Заголовок', text='Текст', slug='title'
+        )
+
+    def setUp(self):
+        """Метод очистки накопленных метрик."""
+        registry.clear()
+
+    def test_server_timing_header(self):
+        """Метод проверки этапов в заголовке Server-Timing."""
+        response = self.author_client.get(LIST_URL)
+        stages = [
+            part.split(';')[0]
+            for part in response['Server-Timing'].split(', ')
+        ]
+        self.assertEqual(stages, ['db', 'view', 'tpl', 'total'])
+
+    @override_settings(METRICS_ALLOWED_IPS=('127.0.0.1',))
+    def test_metrics_endpoint(self):
+        """Метод проверки гистограмм по имени маршрута."""
+        self.author_client.get(LIST_URL)
+        response = self.client.get(METRICS_URL)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        content = response.content.decode()
+        self.assertIn(
+            'http_request_duration_seconds_count'
+            '{view="notes:list",stage="template"} 1',
+            content
+        )
+        self.assertIn('db_queries_total{view="notes:list"}', content)
+
+    def test_metrics_only_for_staff(self):
+        """Метод проверки: без адреса из списка метрики только сотрудникам."""
+        staff_client = Client()
+        staff_client.force_login(
+            User.objects.create(username='Сотрудник', is_staff=True)
+        )
+        for client, status in (
+            (self.client, HTTPStatus.FORBIDDEN),
+            (self.author_client, HTTPStatus.FORBIDDEN),
+            (staff_client, HTTPStatus.OK),
+        ):
+            with self.subTest(status=status):
+                self.assertEqual(
+                    client.get(METRICS_URL).status_code, status
+                )
+
+
+class TestSlowQueries(TestCase):
+    """Класс тестов журнала медленных запросов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Метод подготовки данных для тестов."""
+        cls.author = User.objects.create(username='Автор')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+
+    def setUp(self):
+        """Метод подготовки журнала, в который попадает каждый запрос."""
+        slow_queries.reset()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log_file = Path(directory.name) / 'slow.log'
+        settings = override_settings(
+            SLOW_QUERY_THRESHOLD_MS=0,
+            SLOW_QUERY_SAMPLE_RATE=0,
+            SLOW_QUERY_LOG_FILE=self.log_file,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_slug_check_is_logged(self):
+        """Метод проверки записи запроса проверки slug с планом."""
+        self.author_client.post(
+            NOTE_ADD_URL, data={'title': 'Заголовок', 'text': 'Текст'}
+        )
+        entries = [
+            json.loads(line)
+            for line in self.log_file.read_text('utf-8').splitlines()
+        ]
+        slug_entries = [
+            entry for entry in entries
+            if '"notes_note"."slug" = %s' in entry['sql']
+        ]
+        self.assertTrue(slug_entries)
+        for entry in slug_entries:
+            with self.subTest(sql=entry['sql']):
+                self.assertEqual(entry['view'], 'notes:add')
+                self.assertEqual(entry['params'][0], 'zagolovok')
+                self.assertTrue(entry['plan'])
+
+    def test_slow_queries_command(self):
+        """Метод проверки сводки по медленным запросам."""
+        self.author_client.get(LIST_URL)
+        stdout = StringIO()
+        call_command('slow_queries', file=self.log_file, stdout=stdout)
+        self.assertIn('notes:list', stdout.getvalue())
@@ -0,0 +1,60 @@
+"""Модуль тестов профилирования запросов."""
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from notes.models import Note, RequestProfile
+
+User = get_user_model()
+LIST_URL = reverse('notes:list')
+
+
+class TestProfiler(TestCase):
+    """Класс тестов профилирования по требованию."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Метод подготовки данных для тестов."""
+        cls.staff = User.objects.create(
+            username='Сотрудник', is_staff=True, is_superuser=True
+        )
+        cls.staff_client = Client()
+        cls.staff_client.force_login(cls.staff)
+        cls.author = User.objects.create(username='Автор')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        Note.objects.create(
+            author=cls.staff, title='Заголовок', text='Текст', slug='title'
+        )
+
+    def test_staff_can_profile_request(self):
+        """Метод проверки сохранения профиля запроса сотрудника."""
+        response = self.staff_client.get(f'{LIST_URL}?profile=cprofile')
+        profile = RequestProfile.objects.get()
+        self.assertEqual(response['X-Profile-Id'], str(profile.pk))
+        self.assertEqual(profile.view_name, 'notes:list')
+        self.assertEqual(profile.user, self.staff)
+        self.assertIn('cumulative', profile.report)
+        change_url = reverse(
+            'admin:notes_requestprofile_change', args=(profile.pk,)
+        )
+        response = self.staff_client.get(change_url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        response = self.staff_client.get(reverse(
+            'admin:notes_requestprofile_collapsed', args=(profile.pk,)
+        ))
+        self.assertEqual(response.content.decode(), profile.collapsed)
+
+    def test_regular_requests_are_not_profiled(self):
+        """Метод проверки, что обычные запросы не профилируются."""
+        requests = (
+            (self.staff_client, LIST_URL),
+            (self.author_client, f'{LIST_URL}?profile=cprofile'),
+        )
+        for client, url in requests:
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertNotIn('X-Profile-Id', response)
+        self.assertFalse(RequestProfile.objects.exists())
@@ -1,13 +1,12 @@
 """Модуль тестов для маршрутов."""
 from http import HTTPStatus
 
-from django.test import Client, TestCase
+from django.test import TestCase
 from django.urls import reverse
-from django.contrib.auth import get_user_model
 
 from notes.models import Note
+from notes.tests.factories import logged_in_client, make_users
 
-User = get_user_model()
 HOME_URL = reverse('notes:home')
 LIST_URL = reverse('notes:list')
 NOTE_ADD_URL = reverse('notes:add')
@@ -27,12 +26,9 @@ class TestRoutes(TestCase):
     @classmethod
     def setUpTestData(cls):
         """Метод подготовки данных для тестов."""
-        cls.author = User.objects.create(username='Petrov')
-        cls.author_client = Client()
-        cls.author_client.force_login(cls.author)
-        cls.reader = User.objects.create(username='Читатель простой')
-        cls.reader_client = Client()
-        cls.reader_client.force_login(cls.reader)
+        cls.author, cls.reader = make_users('Petrov', 'Читатель простой')
+        cls.author_client = logged_in_client(cls.author)
+        cls.reader_client = logged_in_client(cls.reader)
         cls.note = Note.objects.create(
             author=cls.author,
             title='Заголовок',
@@ -2,6 +2,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.views import generic
 
+from .counters import note_views
 from .forms import NoteForm
 from .models import Note
 
@@ -50,10 +51,27 @@ class NoteDelete(NoteBase, generic.DeleteView):
 
 
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """
+    Список всех заметок пользователя.
+
+    С параметром sort=popular — по убыванию просмотров.
+    """
     template_name = 'notes/list.html'
+    orderings = {'popular': ('-views', 'pk')}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        ordering = self.orderings.get(self.request.GET.get('sort'))
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
 
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+    def get_object(self, queryset=None):
+        note = super().get_object(queryset)
+        note_views.hit(note.pk)
+        return note_views.merge(note)
@@ -2,6 +2,8 @@
 ASGI config for yanote project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Static files from STATIC_ROOT are served by yacommon.assets, everything
+else by Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -13,4 +15,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from yacommon import assets  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http':
+        static_file = assets.find(scope['path'])
+        if static_file is not None and scope['method'] in ('GET', 'HEAD'):
+            await assets.serve_asgi(scope, receive, send, static_file)
+            return
+    await django_application(scope, receive, send)
@@ -1,8 +1,11 @@
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Общий с другим проектом код, см. yacommon/.
+sys.path.append(str(BASE_DIR.parent))
 
 SECRET_KEY = 'django-insecure-yipnj$#j!ajarq%k55z4kuf3x79)91h0h42o9!1ho(z=!%mt=#'
 
@@ -18,15 +21,19 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'yacommon.apps.CommonConfig',
     'notes.apps.NotesConfig'
 ]
 
 MIDDLEWARE = [
+    'yacommon.middleware.TimingMiddleware',
+    'yacommon.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'notes.middleware.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -82,8 +89,37 @@ USE_TZ = True
 
 
 STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'collected_static'
+STATICFILES_STORAGE = 'yacommon.assets.CompressedManifestStorage'
+# Отдавать STATIC_ROOT из wsgi.py и asgi.py, если перед приложением
+# нет nginx. Файлы без хеша в имени кэшируются на STATIC_MAX_AGE секунд.
+SERVE_STATIC = True
+STATIC_MAX_AGE = 300
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_SAMPLE_RATE = 0.1
+SLOW_QUERY_LOG_FILE = BASE_DIR / 'slow_queries.log'
+
+# Адреса, с которых /metrics/ доступна без входа, например сервера
+# Prometheus. Не 127.0.0.1, если перед приложением стоит прокси.
+METRICS_ALLOWED_IPS = ()
+
+# Период записи счётчиков просмотров в базу, секунды; 0 — только при выходе.
+VIEW_COUNTER_FLUSH_INTERVAL = 5
+
+# Обслуживание базы: каталог и число резервных копий, страниц
+# за шаг копирования и vacuum, пауза между шагами в секундах,
+# строк на индекс для ANALYZE и окно (час начала, час конца)
+# по местному времени для ANALYZE и vacuum.
+DB_BACKUP_DIR = BASE_DIR / 'backups'
+DB_BACKUP_KEEP = 7
+DB_BACKUP_PAGES = 100
+DB_VACUUM_PAGES = 200
+DB_MAINTENANCE_PAUSE = 0.01
+DB_ANALYSIS_LIMIT = 1000
+DB_MAINTENANCE_WINDOW = (3, 5)
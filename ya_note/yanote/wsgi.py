@@ -2,6 +2,8 @@
 WSGI config for yanote project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
+Static files from STATIC_ROOT are served by yacommon.assets, everything
+else by Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
@@ -13,4 +15,8 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
 
-application = get_wsgi_application()
+django_application = get_wsgi_application()
+
+from yacommon.assets import StaticFilesApplication  # noqa: E402
+
+application = StaticFilesApplication(django_application)
@@ -0,0 +1 @@
+"""Код, общий для YaNews и YaNote: метрики, статика, обслуживание базы."""
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CommonConfig(AppConfig):
+    name = 'yacommon'
+    verbose_name = 'Общее'
+
+    def ready(self):
+        from . import checks  # noqa: F401
@@ -0,0 +1,252 @@
+"""
+Статика без внешних CDN и без nginx.
+
+Сторонние файлы скачиваются командой vendor_static в
+yacommon/static/vendor и коммитятся. collectstatic через
+CompressedManifestStorage добавляет хеш к именам и кладёт рядом сжатые
+.gz и, если установлен brotli, .br. Приложения из wsgi.py и asgi.py
+отдают STATIC_ROOT сами: индекс файлов строится один раз на процесс,
+поэтому запрос статики — это поиск в словаре и отправка файла через
+wsgi.file_wrapper, то есть sendfile у серверов, которые его
+поддерживают.
+"""
+import gzip
+import json
+import mimetypes
+import os
+from pathlib import Path
+from threading import Lock
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.utils.http import http_date, parse_http_date_safe
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = frozenset((
+    '.css', '.js', '.map', '.svg', '.txt', '.json', '.html', '.xml',
+))
+# Сначала лучший из поддерживаемых клиентом вариантов.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE = 'public, max-age=31536000, immutable'
+BLOCK_SIZE = 64 * 1024
+
+_lock = Lock()
+_index = None
+
+
+def compress(storage, name):
+    """Сжатые копии файла рядом с ним, если они заметно меньше."""
+    path = storage.path(name)
+    with open(path, 'rb') as file:
+        content = file.read()
+    variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(content)))
+    for suffix, compressed in variants:
+        if len(compressed) < len(content) * 0.95:
+            with open(path + suffix, 'wb') as file:
+                file.write(compressed)
+
+
+class CompressedManifestStorage(ManifestStaticFilesStorage):
+    """
+    Хешированные имена и сжатые копии текстовых файлов.
+
+    Файл без записи в манифесте — ошибка, как и в
+    ManifestStaticFilesStorage. runserver с DEBUG берёт исходные имена,
+    тесты подменяют хранилище на StaticFilesStorage.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(self.hashed_files) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if os.path.splitext(name)[1] in COMPRESSIBLE and self.exists(name):
+                compress(self, name)
+
+
+def accepted_encodings(accept_encoding):
+    """Кодировки из Accept-Encoding, кроме запрещённых через q=0."""
+    accepted = set()
+    for part in accept_encoding.split(','):
+        encoding, _, params = part.partition(';')
+        quality = params.replace(' ', '')
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(encoding.strip())
+    return accepted
+
+
+class StaticFile:
+    """Файл из STATIC_ROOT и его сжатые варианты."""
+
+    __slots__ = ('path', 'size', 'modified', 'headers', 'variants')
+
+    def __init__(self, path, size, modified, cache_control):
+        self.path = path
+        self.size = size
+        self.modified = int(modified)
+        content_type, _ = mimetypes.guess_type(path)
+        content_type = content_type or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type.endswith(
+                ('javascript', 'json', 'xml')):
+            content_type += '; charset=utf-8'
+        self.headers = [
+            ('Content-Type', content_type),
+            ('Cache-Control', cache_control),
+            ('Last-Modified', http_date(self.modified)),
+        ]
+        self.variants = {}
+
+    def choose(self, accept_encoding):
+        """Путь, размер и кодировка для заголовка Accept-Encoding."""
+        if self.variants:
+            accepted = accepted_encodings(accept_encoding)
+            for encoding, _ in ENCODINGS:
+                if encoding in accepted and encoding in self.variants:
+                    return (*self.variants[encoding], encoding)
+        return self.path, self.size, None
+
+    def response(self, accept_encoding, if_modified_since):
+        """Статус, заголовки и путь к телу; путь None для 304."""
+        headers = list(self.headers)
+        if self.variants:
+            headers.append(('Vary', 'Accept-Encoding'))
+        since = parse_http_date_safe(if_modified_since or '')
+        if since is not None and self.modified <= since:
+            return '304 Not Modified', headers, None
+        path, size, encoding = self.choose(accept_encoding)
+        if encoding is not None:
+            headers.append(('Content-Encoding', encoding))
+        headers.append(('Content-Length', str(size)))
+        return '200 OK', headers, path
+
+
+def manifest_names(root):
+    try:
+        with open(root / 'staticfiles.json', encoding='utf-8') as file:
+            return set(json.load(file)['paths'].values())
+    except (OSError, ValueError, KeyError):
+        return set()
+
+
+def build_index(root):
+    """Файлы STATIC_ROOT по пути относительно него."""
+    root = Path(root)
+    hashed = manifest_names(root)
+    suffixes = {suffix: encoding for encoding, suffix in ENCODINGS}
+    index = {}
+    compressed = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            relative = Path(path).relative_to(root).as_posix()
+            stat = os.stat(path)
+            base, suffix = os.path.splitext(relative)
+            if suffix in suffixes:
+                compressed.append((base, suffixes[suffix], path, stat))
+                continue
+            index[relative] = StaticFile(
+                path, stat.st_size, stat.st_mtime,
+                IMMUTABLE if relative in hashed
+                else f'public, max-age={settings.STATIC_MAX_AGE}',
+            )
+    for base, encoding, path, stat in compressed:
+        if base in index:
+            index[base].variants[encoding] = (path, stat.st_size)
+    return index
+
+
+def get_index():
+    """Индекс STATIC_ROOT, один на процесс; после collectstatic — рестарт."""
+    global _index
+    with _lock:
+        if _index is None:
+            root = settings.STATIC_ROOT
+            _index = build_index(root) if root and os.path.isdir(root) else {}
+        return _index
+
+
+def reset_index():
+    global _index
+    with _lock:
+        _index = None
+
+
+def find(path):
+    """Файл статики по пути запроса или None."""
+    if not settings.SERVE_STATIC or not path.startswith(settings.STATIC_URL):
+        return None
+    return get_index().get(path[len(settings.STATIC_URL):])
+
+
+class StaticFilesApplication:
+    """WSGI-приложение: статика из индекса, остальное — application."""
+
+    def __init__(self, application):
+        self.application = application
+
+    def __call__(self, environ, start_response):
+        static_file = find(environ.get('PATH_INFO', ''))
+        if static_file is None or environ['REQUEST_METHOD'] not in (
+                'GET', 'HEAD'):
+            return self.application(environ, start_response)
+        status, headers, path = static_file.response(
+            environ.get('HTTP_ACCEPT_ENCODING', ''),
+            environ.get('HTTP_IF_MODIFIED_SINCE'),
+        )
+        start_response(status, headers)
+        if path is None or environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+        return file_wrapper(open(path, 'rb'), BLOCK_SIZE)
+
+
+def header(scope, name):
+    for key, value in scope.get('headers', ()):
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+async def serve_asgi(scope, receive, send, static_file):
+    """Отдаёт файл в ASGI, через zerocopysend, если сервер его умеет."""
+    status, headers, path = static_file.response(
+        header(scope, b'accept-encoding') or '',
+        header(scope, b'if-modified-since'),
+    )
+    await send({
+        'type': 'http.response.start',
+        'status': int(status.split()[0]),
+        'headers': [
+            (name.lower().encode(), value.encode())
+            for name, value in headers
+        ],
+    })
+    if path is None or scope['method'] == 'HEAD':
+        await send({'type': 'http.response.body'})
+        return
+    with open(path, 'rb') as file:
+        if 'http.response.zerocopysend' in scope.get('extensions', {}):
+            await send({'type': 'http.response.zerocopysend', 'file': file})
+            return
+        while True:
+            chunk = file.read(BLOCK_SIZE)
+            more_body = len(chunk) == BLOCK_SIZE
+            await send({
+                'type': 'http.response.body', 'body': chunk,
+                'more_body': more_body,
+            })
+            if not more_body:
+                break
@@ -0,0 +1,176 @@
+"""
+Фикстуры бенчмарков, их подключает benchmarks/conftest.py проекта.
+
+Запуск из директории проекта:
+    pytest benchmarks
+Первый запуск (или запуск с --bench-update) записывает базовую линию
+в benchmarks/baseline.json, последующие сравнивают с ней и падают
+при регрессии.
+"""
+import http.client
+import json
+import statistics
+from pathlib import Path
+from time import perf_counter
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+import pytest
+
+BASELINE = Path('benchmarks') / 'baseline.json'
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption(
+        '--bench-baseline',
+        help='JSON-файл базовой линии, по умолчанию benchmarks/baseline.json.',
+    )
+    group.addoption(
+        '--bench-update', action='store_true',
+        help='Перезаписать базовую линию текущими результатами.',
+    )
+    group.addoption(
+        '--bench-tolerance', type=float, default=0.5,
+        help='Допустимый рост задержки относительно базовой линии.',
+    )
+    group.addoption(
+        '--bench-rounds', type=int, default=50,
+        help='Количество замеров на один сценарий.',
+    )
+    group.addoption(
+        '--bench-sizes', default='10x10,10x500',
+        help='Размеры наборов данных через запятую в виде ROWSxCHILDREN.',
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if 'dataset_size' in metafunc.fixturenames:
+        sizes = [
+            tuple(int(part) for part in size.split('x'))
+            for size in metafunc.config.getoption('bench_sizes').split(',')
+        ]
+        metafunc.parametrize(
+            'dataset_size', sizes, ids=[f'{n}x{m}' for n, m in sizes]
+        )
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+class Bench:
+    """Замеры сценариев и сравнение с базовой линией."""
+
+    def __init__(self, config):
+        self.path = Path(
+            config.getoption('bench_baseline')
+            or config.rootpath / BASELINE
+        )
+        self.update = config.getoption('bench_update')
+        self.tolerance = config.getoption('bench_tolerance')
+        self.rounds = config.getoption('bench_rounds')
+        self.baseline = (
+            json.loads(self.path.read_text()) if self.path.exists() else {}
+        )
+        self.results = {}
+
+    def measure(self, name, func, rounds=None, count_queries=True):
+        """
+        Выполняет сценарий и сравнивает результат с базовой линией.
+
+        Число запросов к базе берётся из первого прогона,
+        задержки из всех прогонов. Для живого сервера запросы
+        не считаются: он работает в другом потоке.
+        """
+        rounds = rounds or self.rounds
+        with CaptureQueriesContext(connection) as context:
+            func(0)
+        queries = len(context.captured_queries) if count_queries else None
+        latencies = []
+        for index in range(1, rounds + 1):
+            start = perf_counter()
+            func(index)
+            latencies.append((perf_counter() - start) * 1000)
+        result = {
+            'queries': queries,
+            'rounds': rounds,
+            'min_ms': round(min(latencies), 3),
+            'mean_ms': round(statistics.mean(latencies), 3),
+            'p50_ms': round(percentile(latencies, 0.5), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'p99_ms': round(percentile(latencies, 0.99), 3),
+        }
+        self.results[name] = result
+        self.check(name, result)
+        return result
+
+    def check(self, name, result):
+        previous = self.baseline.get(name)
+        if previous is None or self.update:
+            return
+        assert (
+            result['queries'] is None
+            or result['queries'] <= previous['queries']
+        ), (
+            f'{name}: запросов к базе стало {result["queries"]}, '
+            f'было {previous["queries"]}'
+        )
+        limit = previous['p50_ms'] * (1 + self.tolerance)
+        assert result['p50_ms'] <= limit, (
+            f'{name}: медиана {result["p50_ms"]} мс, '
+            f'допустимо не более {limit:.3f} мс'
+        )
+
+    def save(self):
+        if not self.results:
+            return
+        merged = dict(self.baseline)
+        for name, result in self.results.items():
+            if self.update or name not in merged:
+                merged[name] = result
+        self.path.write_text(
+            json.dumps(merged, indent=2, ensure_ascii=False, sort_keys=True)
+            + '\n'
+        )
+
+
+@pytest.fixture(scope='session', autouse=True)
+def static_without_manifest():
+    """Фикстура, отдающая статику без collectstatic и манифеста."""
+    with override_settings(STATICFILES_STORAGE=(
+        'django.contrib.staticfiles.storage.StaticFilesStorage'
+    )):
+        yield
+
+
+@pytest.fixture(scope='session')
+def bench(request):
+    """Фикстура замеров, сохраняющая результаты в конце сессии."""
+    bench = Bench(request.config)
+    yield bench
+    bench.save()
+    for name, result in sorted(bench.results.items()):
+        queries = result['queries'] if result['queries'] is not None else '-'
+        print(
+            f'\n{name}: p50={result["p50_ms"]} p95={result["p95_ms"]} '
+            f'p99={result["p99_ms"]} мс, запросов {queries}'
+        )
+
+
+@pytest.fixture
+def live_get(live_server):
+    """Фикстура GET-запросов к настоящему локальному серверу."""
+    host, port = live_server.url.split('//')[1].split(':')
+
+    def get(path, headers=None):
+        http_connection = http.client.HTTPConnection(host, int(port))
+        http_connection.request('GET', path, headers=headers or {})
+        response = http_connection.getresponse()
+        response.read()
+        http_connection.close()
+        assert response.status == 200, (path, response.status)
+        return response
+
+    return get
@@ -0,0 +1,18 @@
+"""Проверки manage.py check для общего кода."""
+from django.core.checks import Warning, register
+
+from .management.commands.vendor_static import ASSETS, STATIC_DIR
+
+
+@register()
+def vendored_assets(app_configs, **kwargs):
+    """Сторонние файлы, на которые ссылаются шаблоны, лежат в репозитории."""
+    return [
+        Warning(
+            f'{name} нет в {STATIC_DIR}.',
+            hint='Запустите manage.py vendor_static и закоммитьте файл.',
+            id='yacommon.W001',
+        )
+        for name, _, _ in ASSETS
+        if not (STATIC_DIR / name).exists()
+    ]
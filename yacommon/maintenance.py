@@ -0,0 +1,208 @@
+"""
+Обслуживание базы SQLite без остановки сервиса.
+
+Резервная копия снимается через backup API порциями по несколько
+страниц: читающая блокировка держится только на время порции,
+а между порциями пишущие запросы проходят. ANALYZE с analysis_limit
+и PRAGMA optimize обновляют статистику планировщика, incremental_vacuum
+возвращает свободные страницы файла тоже порциями. Тяжёлые шаги
+выполняются только в окне DB_MAINTENANCE_WINDOW; для каждого шага
+записывается, сколько раз и как долго он держал блокировку.
+"""
+import sqlite3
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from time import perf_counter, sleep
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class Step:
+    """Шаг обслуживания и время, на которое он брал блокировку."""
+
+    __slots__ = ('name', 'locks', 'total', 'longest', 'detail')
+
+    def __init__(self, name):
+        self.name = name
+        self.locks = 0
+        self.total = 0.0
+        self.longest = 0.0
+        self.detail = ''
+
+    def observe(self, seconds):
+        self.locks += 1
+        self.total += seconds
+        self.longest = max(self.longest, seconds)
+
+    def __str__(self):
+        return (
+            f'{self.name}: блокировок {self.locks}, дольше всего '
+            f'{self.longest * 1000:.1f} мс, всего {self.total * 1000:.1f} мс'
+            + (f'. {self.detail}' if self.detail else '')
+        )
+
+
+def schemas():
+    """Базы соединения: main и подключённые через ATTACH, с их файлами."""
+    connection.ensure_connection()
+    return [
+        (name, path)
+        for _, name, path in connection.connection.execute(
+            'PRAGMA database_list'
+        ).fetchall()
+        if name != 'temp'
+    ]
+
+
+def in_window(now=None, window=None):
+    """Попадает ли локальное время now в окно (час начала, час конца)."""
+    start, end = window or settings.DB_MAINTENANCE_WINDOW
+    hour = timezone.localtime(now).hour
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+def next_window(now=None, window=None):
+    """Начало ближайшего окна обслуживания после now."""
+    now = timezone.localtime(now)
+    start = timezone.make_aware(datetime.combine(
+        now.date(), time(hour=(window or settings.DB_MAINTENANCE_WINDOW)[0])
+    ))
+    return start if start > now else start + timedelta(days=1)
+
+
+def backup_name(schema, path, stamp):
+    return f'{Path(path).stem if path else schema}-{stamp}.sqlite3'
+
+
+def prune(directory, schema, path, keep):
+    """Оставляет keep последних копий базы в directory."""
+    copies = sorted(directory.glob(backup_name(schema, path, '*')))
+    for old in copies[:-keep] if keep else ():
+        old.unlink()
+
+
+def backup(directory=None, pages=None, pause=None, keep=None):
+    """
+    Копирует каждую базу соединения в directory, возвращает шаги.
+
+    Копия пишется во временный файл и переименовывается, только
+    когда готова, поэтому в directory не бывает недописанных копий.
+    """
+    directory = Path(directory or settings.DB_BACKUP_DIR)
+    pages = pages or settings.DB_BACKUP_PAGES
+    pause = settings.DB_MAINTENANCE_PAUSE if pause is None else pause
+    keep = settings.DB_BACKUP_KEEP if keep is None else keep
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = timezone.localtime().strftime('%Y%m%d-%H%M%S')
+    steps = []
+    for schema, path in schemas():
+        step = Step(f'backup {schema}')
+        target_path = directory / backup_name(schema, path, stamp)
+        partial = target_path.with_suffix('.partial')
+        started = perf_counter()
+
+        def progress(status, remaining, total):
+            nonlocal started
+            # Шаг, не получивший блокировку (занято писателем),
+            # не копировал страниц и в отчёт не входит.
+            if status in (sqlite3.SQLITE_OK, sqlite3.SQLITE_DONE):
+                step.observe(perf_counter() - started)
+            sleep(pause)
+            started = perf_counter()
+
+        target = sqlite3.connect(partial)
+        try:
+            connection.connection.backup(
+                target, pages=pages, progress=progress, name=schema,
+            )
+        finally:
+            target.close()
+        partial.replace(target_path)
+        prune(directory, schema, path, keep)
+        step.detail = f'Копия: {target_path}'
+        steps.append(step)
+    return steps
+
+
+def analyze(limit=None):
+    """ANALYZE с ограничением числа строк на индекс и PRAGMA optimize."""
+    step = Step('analyze')
+    limit = limit or settings.DB_ANALYSIS_LIMIT
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA analysis_limit = {int(limit)}')
+        for statement in ('ANALYZE', 'PRAGMA optimize'):
+            started = perf_counter()
+            cursor.execute(statement)
+            step.observe(perf_counter() - started)
+    return step
+
+
+def vacuum(schema, pages=None, pause=None):
+    """
+    Возвращает свободные страницы базы schema порциями по pages.
+
+    Работает только при auto_vacuum = INCREMENTAL; включить его
+    на существующей базе можно лишь полным VACUUM, см. enable_vacuum.
+    """
+    step = Step(f'vacuum {schema}')
+    pages = pages or settings.DB_VACUUM_PAGES
+    pause = settings.DB_MAINTENANCE_PAUSE if pause is None else pause
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA "{schema}".auto_vacuum')
+        if cursor.fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+            step.detail = 'auto_vacuum не INCREMENTAL, пропущено'
+            return step
+        cursor.execute(f'PRAGMA "{schema}".freelist_count')
+        free = before = cursor.fetchone()[0]
+        while free:
+            started = perf_counter()
+            cursor.execute(f'PRAGMA "{schema}".incremental_vacuum({pages})')
+            step.observe(perf_counter() - started)
+            cursor.execute(f'PRAGMA "{schema}".freelist_count')
+            free, previous = cursor.fetchone()[0], free
+            if free >= previous:
+                break
+            sleep(pause)
+    step.detail = f'Освобождено страниц: {before - free}'
+    return step
+
+
+def enable_vacuum(schema):
+    """Один раз переводит базу на auto_vacuum = INCREMENTAL полным VACUUM."""
+    step = Step(f'enable vacuum {schema}')
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA "{schema}".auto_vacuum')
+        if cursor.fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            step.detail = 'уже включён'
+            return step
+        started = perf_counter()
+        cursor.execute(
+            f'PRAGMA "{schema}".auto_vacuum = {AUTO_VACUUM_INCREMENTAL}'
+        )
+        cursor.execute(f'VACUUM "{schema}"')
+        step.observe(perf_counter() - started)
+    return step
+
+
+def maintain(report, force=False, enable_auto_vacuum=False):
+    """
+    Резервная копия всегда, статистика и vacuum — только в окне.
+
+    report получает каждый завершённый шаг.
+    """
+    for step in backup():
+        report(step)
+    if not (force or in_window()):
+        report('Вне окна обслуживания: ANALYZE и vacuum пропущены.')
+        return
+    report(analyze())
+    for schema, _ in schemas():
+        if enable_auto_vacuum:
+            report(enable_vacuum(schema))
+        report(vacuum(schema))
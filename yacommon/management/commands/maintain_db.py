@@ -0,0 +1,46 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from yacommon import maintenance
+
+
+class Command(BaseCommand):
+    help = (
+        'Снимает резервную копию базы без остановки сервиса, а в окне '
+        'обслуживания обновляет статистику и освобождает страницы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Выполнить ANALYZE и vacuum вне окна обслуживания.',
+        )
+        parser.add_argument(
+            '--enable-auto-vacuum', action='store_true',
+            help='Включить auto_vacuum = INCREMENTAL (полный VACUUM).',
+        )
+        parser.add_argument(
+            '--schedule', action='store_true',
+            help='Работать постоянно и обслуживать базу в каждое окно.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['schedule']:
+            self.run(options['force'], options['enable_auto_vacuum'])
+            return
+        while True:
+            start = maintenance.next_window()
+            self.stdout.write(
+                f'Следующее обслуживание: {start:%Y-%m-%d %H:%M}.'
+            )
+            sleep((start - timezone.now()).total_seconds())
+            self.run(True, options['enable_auto_vacuum'])
+
+    def run(self, force, enable_auto_vacuum):
+        maintenance.maintain(self.report, force, enable_auto_vacuum)
+        self.stdout.write(self.style.SUCCESS('Обслуживание завершено.'))
+
+    def report(self, step):
+        self.stdout.write(str(step))
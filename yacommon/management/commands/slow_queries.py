@@ -0,0 +1,74 @@
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Сводка по самым тяжёлым запросам из журнала медленных запросов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file', default=settings.SLOW_QUERY_LOG_FILE,
+            help='Путь к журналу (по умолчанию SLOW_QUERY_LOG_FILE).',
+        )
+        parser.add_argument(
+            '--top', type=int, default=10,
+            help='Сколько запросов вывести.',
+        )
+        parser.add_argument(
+            '--order', choices=('total', 'max', 'count'), default='total',
+            help='Сортировка: суммарное время, максимум или количество.',
+        )
+
+    def read(self, log_file):
+        """Записи журнала; пустые и повреждённые строки пропускаются."""
+        for number, line in enumerate(log_file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                self.stderr.write(self.style.WARNING(
+                    f'Строка {number} не разобрана, пропущена.'
+                ))
+
+    def handle(self, *args, **options):
+        try:
+            with open(
+                options['file'], encoding='utf-8', errors='replace',
+            ) as log_file:
+                entries = list(self.read(log_file))
+        except FileNotFoundError:
+            raise CommandError(f'Журнал {options["file"]} не найден.')
+        summary = defaultdict(lambda: {
+            'count': 0.0, 'total': 0.0, 'max': 0.0,
+            'views': set(), 'plan': None, 'normalized': '',
+        })
+        for entry in entries:
+            weight = 1 / (entry.get('sample_rate') or 1)
+            item = summary[entry['fingerprint']]
+            item['count'] += weight
+            item['total'] += entry['duration_ms'] * weight
+            item['max'] = max(item['max'], entry['duration_ms'])
+            item['views'].add(entry['view'] or '-')
+            item['normalized'] = entry['normalized']
+            item['plan'] = item['plan'] or entry.get('plan')
+        top = sorted(
+            summary.items(),
+            key=lambda pair: pair[1][options['order']],
+            reverse=True,
+        )[:options['top']]
+        for key, item in top:
+            self.stdout.write(self.style.SQL_KEYWORD(
+                f'{key}  ~{item["count"]:.0f} раз, '
+                f'всего {item["total"]:.1f} мс, '
+                f'среднее {item["total"] / item["count"]:.1f} мс, '
+                f'максимум {item["max"]:.1f} мс'
+            ))
+            views = ', '.join(sorted(item['views']))
+            self.stdout.write(f'  маршруты: {views}')
+            self.stdout.write(f'  {item["normalized"]}')
+            for step in item['plan'] or ():
+                self.stdout.write(f'    {step}')
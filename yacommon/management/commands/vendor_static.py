@@ -0,0 +1,54 @@
+import base64
+import hashlib
+from pathlib import Path
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+STATIC_DIR = Path(__file__).resolve().parents[2] / 'static'
+# Путь в static/, адрес и хеш subresource integrity.
+ASSETS = (
+    (
+        'vendor/bootstrap/5.0.1/bootstrap.min.css',
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.0.1/dist/css/'
+        'bootstrap.min.css',
+        'sha384-'
+        '+0n0xVW2eSR5OomGNYDnhzAbDsOXxcvSN1TPprVMTNDbiYZCxYbOOl7+AMvyTG2x',
+    ),
+)
+
+
+def integrity(content):
+    digest = hashlib.sha384(content).digest()
+    return 'sha384-' + base64.b64encode(digest).decode()
+
+
+class Command(BaseCommand):
+    help = (
+        'Скачивает сторонние файлы в yacommon/static/vendor и сверяет '
+        'их хеши. '
+        'Запускается на машине с доступом в сеть, файлы коммитятся.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Скачать заново уже лежащие файлы.',
+        )
+
+    def handle(self, *args, **options):
+        static_dir = STATIC_DIR
+        for name, url, expected in ASSETS:
+            path = static_dir / name
+            if path.exists() and not options['force']:
+                if integrity(path.read_bytes()) != expected:
+                    raise CommandError(f'{name}: хеш не совпадает.')
+                self.stdout.write(f'{name}: уже на месте.')
+                continue
+            with urlopen(url, timeout=30) as response:
+                content = response.read()
+            if integrity(content) != expected:
+                raise CommandError(f'{url}: хеш не совпадает.')
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+            self.stdout.write(self.style.SUCCESS(f'{name}: скачан.'))
@@ -0,0 +1,108 @@
+"""Гистограммы задержек запросов в памяти процесса."""
+from bisect import bisect_left
+from collections import defaultdict
+from threading import Lock
+
+from django.conf import settings
+from django.http import HttpResponse
+
+BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+STAGES = ('total', 'view', 'template', 'db')
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """Накопительная гистограмма в формате Prometheus."""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Хранилище метрик по именам маршрутов."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.histograms = defaultdict(Histogram)
+        self.queries = defaultdict(int)
+
+    def record(self, view_name, timing):
+        """Сохраняет замеры одного запроса."""
+        durations = timing.durations()
+        with self._lock:
+            for stage in STAGES:
+                self.histograms[view_name, stage].observe(durations[stage])
+            self.queries[view_name] += timing.queries
+
+    def clear(self):
+        with self._lock:
+            self.histograms.clear()
+            self.queries.clear()
+
+    def render(self):
+        """Возвращает метрики в текстовом формате Prometheus."""
+        lines = [
+            '# HELP http_request_duration_seconds '
+            'Время обработки запроса по этапам.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        with self._lock:
+            histograms = sorted(
+                (key, list(item.counts), item.sum, item.count)
+                for key, item in self.histograms.items()
+            )
+            queries = sorted(self.queries.items())
+        for (view_name, stage), counts, total, count in histograms:
+            labels = f'view="{view_name}",stage="{stage}"'
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, counts):
+                cumulative += bucket_count
+                lines.append(
+                    'http_request_duration_seconds_bucket'
+                    f'{{{labels},le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                'http_request_duration_seconds_bucket'
+                f'{{{labels},le="+Inf"}} {count}'
+            )
+            lines.append(
+                f'http_request_duration_seconds_sum{{{labels}}} {total}'
+            )
+            lines.append(
+                f'http_request_duration_seconds_count{{{labels}}} {count}'
+            )
+        lines.append(
+            '# HELP db_queries_total Количество запросов к базе данных.'
+        )
+        lines.append('# TYPE db_queries_total counter')
+        for view_name, count in queries:
+            lines.append(f'db_queries_total{{view="{view_name}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def metrics_view(request):
+    """
+    Отдаёт накопленные метрики для Prometheus.
+
+    Как и профилировщик, только сотрудникам; сборщик метрик входа
+    не проходит и пускается по адресу из METRICS_ALLOWED_IPS.
+    """
+    if not (request.user.is_staff or request.META.get('REMOTE_ADDR')
+            in settings.METRICS_ALLOWED_IPS):
+        return HttpResponse(status=403)
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
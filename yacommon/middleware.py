@@ -0,0 +1,163 @@
+"""Промежуточные слои, общие для проектов."""
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+
+from .metrics import registry
+from .profiling import RUNNERS
+from .slow_queries import SlowQueryLogger
+
+UNRESOLVED = 'unresolved'
+PROFILE_PARAM = 'profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+
+class RequestTiming:
+    """Замеры одного запроса: база данных, представление и шаблон."""
+
+    __slots__ = (
+        'start', 'end', 'view_start', 'view_end', 'render_end',
+        'db_time', 'queries',
+    )
+
+    def __init__(self):
+        self.start = perf_counter()
+        self.end = self.view_start = self.view_end = self.render_end = None
+        self.db_time = 0.0
+        self.queries = 0
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper."""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - start
+            self.queries += 1
+
+    def rendered(self, response):
+        """Колбэк, вызываемый после отрисовки TemplateResponse."""
+        self.render_end = perf_counter()
+
+    def durations(self):
+        """Длительности этапов в секундах."""
+        total = self.end - self.start
+        view = template = 0.0
+        if self.view_start is not None:
+            view_end = self.view_end or self.end
+            view = view_end - self.view_start
+            if self.render_end is not None:
+                template = self.render_end - view_end
+        return {
+            'total': total, 'view': view,
+            'template': template, 'db': self.db_time,
+        }
+
+    def server_timing(self):
+        """Значение заголовка Server-Timing."""
+        durations = self.durations()
+        return ', '.join((
+            f'db;dur={durations["db"] * 1000:.2f};'
+            f'desc="{self.queries} queries"',
+            f'view;dur={durations["view"] * 1000:.2f}',
+            f'tpl;dur={durations["template"] * 1000:.2f}',
+            f'total;dur={durations["total"] * 1000:.2f}',
+        ))
+
+
+class TimingMiddleware:
+    """
+    Замеряет время обработки запроса по этапам.
+
+    Добавляет заголовок Server-Timing и копит гистограммы
+    по имени маршрута, доступные на странице метрик.
+    Должен стоять первым в MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = request.timing = RequestTiming()
+        with connection.execute_wrapper(timing.db_wrapper):
+            response = self.get_response(request)
+        timing.end = perf_counter()
+        match = request.resolver_match
+        registry.record(match.view_name if match else UNRESOLVED, timing)
+        response['Server-Timing'] = timing.server_timing()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timing.view_start = perf_counter()
+
+    def process_template_response(self, request, response):
+        request.timing.view_end = perf_counter()
+        response.add_post_render_callback(request.timing.rendered)
+        return response
+
+
+class SlowQueryMiddleware:
+    """
+    Записывает запросы дольше SLOW_QUERY_THRESHOLD_MS.
+
+    Вместе с запросом сохраняются параметры, имя маршрута
+    и план выполнения SQLite.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        wrapper = SlowQueryLogger(
+            request,
+            settings.SLOW_QUERY_THRESHOLD_MS / 1000,
+            settings.SLOW_QUERY_SAMPLE_RATE,
+        )
+        with connection.execute_wrapper(wrapper):
+            return self.get_response(request)
+
+
+class ProfilerMiddleware:
+    """
+    Профилирует запрос сотрудника по требованию.
+
+    Включается параметром ?profile=cprofile|sample или заголовком
+    X-Profile. Без них запрос проходит без каких-либо обёрток.
+    Должен стоять после AuthenticationMiddleware. Подкласс в приложении
+    задаёт model — модель профилей с полями RequestProfile.
+    """
+    model = None
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (
+            PROFILE_HEADER not in request.META
+            and PROFILE_PARAM not in request.META.get('QUERY_STRING', '')
+        ):
+            return self.get_response(request)
+        mode = request.META.get(PROFILE_HEADER) or request.GET.get(
+            PROFILE_PARAM
+        )
+        if mode is None or not request.user.is_staff:
+            return self.get_response(request)
+        runner = RUNNERS.get(mode, RUNNERS['cprofile'])()
+        start = perf_counter()
+        response = runner.run(self.get_response, request)
+        duration = (perf_counter() - start) * 1000
+        match = request.resolver_match
+        profile = self.model.objects.create(
+            user=request.user,
+            method=request.method,
+            path=request.get_full_path(),
+            view_name=match.view_name if match else '',
+            status_code=response.status_code,
+            duration=duration,
+            mode=runner.mode,
+            report=runner.report(),
+            collapsed=runner.collapsed(),
+        )
+        response['X-Profile-Id'] = str(profile.pk)
+        return response
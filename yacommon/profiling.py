@@ -0,0 +1,111 @@
+"""Профилирование отдельных запросов через cProfile или сэмплирование."""
+import cProfile
+import io
+import pstats
+import sys
+import threading
+from collections import Counter
+
+SAMPLE_INTERVAL = 0.001
+REPORT_LINES = 60
+
+
+def frame_label(code):
+    return f'{code.co_filename}:{code.co_name}:{code.co_firstlineno}'
+
+
+def pstats_label(func):
+    filename, line, name = func
+    return f'{filename}:{name}:{line}'
+
+
+class CProfileRunner:
+    """Детерминированный профиль через cProfile."""
+
+    mode = 'cprofile'
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def run(self, func, *args):
+        return self.profile.runcall(func, *args)
+
+    def report(self):
+        """Текстовый отчёт, отсортированный по накопленному времени."""
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_LINES)
+        return stream.getvalue()
+
+    def collapsed(self):
+        """
+        Пары «вызывающий;вызываемый» в формате collapsed stacks.
+
+        cProfile не хранит полные стеки, поэтому граф собирается
+        из рёбер вызовов с собственным временем вызываемой функции
+        в микросекундах.
+        """
+        lines = []
+        for func, (_, _, _, _, callers) in pstats.Stats(
+                self.profile).stats.items():
+            for caller, (_, _, own_time, _) in callers.items():
+                weight = round(own_time * 1_000_000)
+                if weight:
+                    lines.append(
+                        f'{pstats_label(caller)};{pstats_label(func)} '
+                        f'{weight}'
+                    )
+        return '\n'.join(sorted(lines))
+
+
+class SamplingRunner:
+    """Сэмплирующий профиль полных стеков потока запроса."""
+
+    mode = 'sample'
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+
+    def run(self, func, *args):
+        target = threading.get_ident()
+        done = threading.Event()
+        sampler = threading.Thread(
+            target=self.sample, args=(target, done), daemon=True
+        )
+        sampler.start()
+        try:
+            return func(*args)
+        finally:
+            done.set()
+            sampler.join()
+
+    def sample(self, target, done):
+        while not done.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def report(self):
+        """Самые частые стеки по убыванию числа сэмплов."""
+        total = sum(self.samples.values()) or 1
+        return '\n'.join(
+            f'{count:6d} {count / total:6.1%}  {stack.rsplit(";", 1)[-1]}'
+            for stack, count in self.samples.most_common(REPORT_LINES)
+        )
+
+    def collapsed(self):
+        return '\n'.join(
+            f'{stack} {count}'
+            for stack, count in sorted(self.samples.items())
+        )
+
+
+RUNNERS = {
+    CProfileRunner.mode: CProfileRunner,
+    SamplingRunner.mode: SamplingRunner,
+}
@@ -0,0 +1,138 @@
+"""Журнал медленных запросов к базе данных с планом выполнения."""
+import hashlib
+import json
+import logging
+import random
+import re
+from threading import Lock
+from time import perf_counter, time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDERS_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+_lock = Lock()
+_explained = set()
+
+
+def normalize(sql):
+    """Приводит SQL к виду без литералов и параметров."""
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = PLACEHOLDERS_LIST.sub('(...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    """Короткий отпечаток нормализованного SQL."""
+    return hashlib.md5(normalized_sql.encode()).hexdigest()[:12]
+
+
+def explain(connection, sql, params):
+    """
+    Возвращает EXPLAIN QUERY PLAN для запроса SQLite.
+
+    Выполняется на «сыром» курсоре, чтобы не пройти повторно
+    через обёртки execute_wrapper.
+    """
+    if connection.vendor != 'sqlite':
+        return None
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(
+            'EXPLAIN QUERY PLAN ' + sql.replace('%s', '?'), params or ()
+        )
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception:
+        logger.debug('Не удалось получить план запроса', exc_info=True)
+        return None
+    finally:
+        cursor.close()
+
+
+def reset():
+    """Забывает отпечатки, для которых уже снят план."""
+    with _lock:
+        _explained.clear()
+
+
+def write_entry(entry):
+    """Пишет запись в журнал и в файл SLOW_QUERY_LOG_FILE."""
+    logger.warning(
+        'Медленный запрос %s (%.1f мс) в %s',
+        entry['fingerprint'], entry['duration_ms'], entry['view'],
+    )
+    path = settings.SLOW_QUERY_LOG_FILE
+    if path:
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with _lock, open(path, 'a', encoding='utf-8') as log_file:
+            log_file.write(line + '\n')
+
+
+class SlowQueryLogger:
+    """
+    Обёртка execute_wrapper, записывающая медленные запросы.
+
+    План выполнения снимается один раз для каждого отпечатка,
+    повторы пишутся с вероятностью SLOW_QUERY_SAMPLE_RATE.
+    """
+
+    def __init__(self, request, threshold, sample_rate):
+        self.request = request
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        succeeded = False
+        try:
+            result = execute(sql, params, many, context)
+            succeeded = True
+            return result
+        finally:
+            duration = perf_counter() - start
+            if duration >= self.threshold:
+                self.log(
+                    sql, params, many, duration, context['connection'],
+                    succeeded,
+                )
+
+    def log(self, sql, params, many, duration, connection, succeeded=True):
+        """
+        План снимается только после успешного запроса.
+
+        После ошибки соединение может быть в прерванной транзакции,
+        и EXPLAIN заменил бы исходное исключение своим.
+        """
+        normalized = normalize(sql)
+        key = fingerprint(normalized)
+        with _lock:
+            first = key not in _explained
+            if succeeded:
+                _explained.add(key)
+        if not first and random.random() >= self.sample_rate:
+            return
+        if many:
+            params = next(iter(params), None)
+        match = self.request.resolver_match
+        write_entry({
+            'time': time(),
+            'fingerprint': key,
+            'normalized': normalized,
+            'sql': sql,
+            'params': list(params) if params else [],
+            'duration_ms': round(duration * 1000, 3),
+            'view': match.view_name if match else None,
+            'path': self.request.path,
+            'sample_rate': 1.0 if first else self.sample_rate,
+            'plan': (
+                explain(connection, sql, params)
+                if first and succeeded else None
+            ),
+        })
@@ -0,0 +1,82 @@
+"""
+Снимок мигрированной тестовой базы SQLite.
+
+Первый процесс прогоняет миграции как обычно и сохраняет базу в файл,
+остальные процессы (шарды параллельного запуска, повторные запуски)
+копируют снимок в свою базу в памяти через SQLite backup API.
+Снимок пересоздаётся, если изменились миграции или версия Django.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+
+SNAPSHOT_DIR = Path(tempfile.gettempdir()) / 'django-test-snapshots'
+
+
+def snapshot_path(alias):
+    """Путь к снимку, зависящий от содержимого всех миграций."""
+    digest = hashlib.sha1(django.get_version().encode())
+    for app_config in apps.get_app_configs():
+        migrations = Path(app_config.path) / 'migrations'
+        for path in sorted(migrations.glob('*.py')):
+            digest.update(str(path).encode())
+            digest.update(path.read_bytes())
+    return SNAPSHOT_DIR / f'{alias}-{digest.hexdigest()[:16]}.sqlite3'
+
+
+def is_in_memory(connection):
+    return (
+        connection.vendor == 'sqlite'
+        and connection.creation.is_in_memory_db(
+            connection.creation._get_test_db_name()
+        )
+    )
+
+
+def restore(alias):
+    """
+    Заливает снимок в тестовую базу в памяти.
+
+    Возвращает запись в формате setup_databases для teardown_databases
+    или None, если снимка нет.
+    """
+    connection = connections[alias]
+    path = snapshot_path(alias)
+    if not is_in_memory(connection) or not path.exists():
+        return None
+    old_name = connection.settings_dict['NAME']
+    test_name = connection.creation._get_test_db_name()
+    connection.close()
+    settings.DATABASES[alias]['NAME'] = test_name
+    connection.settings_dict['NAME'] = test_name
+    connection.ensure_connection()
+    source = sqlite3.connect(path)
+    try:
+        source.backup(connection.connection)
+    finally:
+        source.close()
+    return connection, old_name, True
+
+
+def save(alias):
+    """Сохраняет текущую тестовую базу в файл снимка атомарно."""
+    connection = connections[alias]
+    if not is_in_memory(connection):
+        return
+    path = snapshot_path(alias)
+    SNAPSHOT_DIR.mkdir(exist_ok=True)
+    temporary = path.with_suffix(f'.{os.getpid()}.tmp')
+    target = sqlite3.connect(temporary)
+    try:
+        connection.ensure_connection()
+        connection.connection.backup(target)
+    finally:
+        target.close()
+    os.replace(temporary, path)
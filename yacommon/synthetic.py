@@ -0,0 +1,169 @@
+"""Генерация больших детерминированных наборов данных для SQLite."""
+import random
+from contextlib import contextmanager
+from itertools import islice
+
+from django.db import connection, transaction
+
+WORDS = (
+    'новость власти город жители вчера сегодня завтра снова первый новый '
+    'большой главный важный проект работа дорога школа больница парк '
+    'министерство губернатор мэр компания рынок цена рубль доллар погода '
+    'снег дождь лето зима весна осень футбол матч команда победа поражение '
+    'концерт театр выставка музей книга фильм автор читатель эксперт '
+    'учёные исследование данные сеть интернет блог заметка сообщение '
+    'решение вопрос ответ время год месяц неделя день утро вечер ночь '
+    'область район улица дом квартира строительство ремонт транспорт '
+    'метро автобус поезд самолёт аэропорт вокзал праздник фестиваль '
+    'выборы закон суд полиция пожар авария спасатели врачи пациенты '
+    'очень быстро медленно неожиданно официально впервые окончательно '
+    'рассказал сообщил объявил заявил открыл закрыл построил выиграл '
+    'проиграл обсудили решили начали закончили предложили поддержали'
+).split()
+USER_COLUMNS = (
+    'id', 'password', 'last_login', 'is_superuser', 'username',
+    'first_name', 'last_name', 'email', 'is_staff', 'is_active',
+    'date_joined',
+)
+FIRST_NAMES = (
+    'Александр', 'Мария', 'Дмитрий', 'Анна', 'Сергей', 'Елена', 'Иван',
+    'Ольга', 'Андрей', 'Наталья', 'Алексей', 'Татьяна', 'Михаил', 'Ирина',
+)
+LAST_NAMES = (
+    'Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров',
+    'Соколов', 'Михайлов', 'Новиков', 'Фёдоров', 'Морозов', 'Волков',
+)
+
+
+class TextGenerator:
+    """
+    Детерминированный генератор русского текста по зерну.
+
+    Предложения для текстов берутся из заранее собранного набора,
+    чтобы генерация не отставала от вставки в базу.
+    """
+
+    def __init__(self, seed, pool_size=10000):
+        self.random = random.Random(seed)
+        self.pool = [self.new_sentence() for _ in range(pool_size)]
+
+    def new_sentence(self, low=5, high=12):
+        text = ' '.join(
+            self.random.choices(WORDS, k=self.random.randint(low, high))
+        )
+        return text[0].upper() + text[1:] + '.'
+
+    def sentence(self):
+        return self.pool[int(len(self.pool) * self.random.random())]
+
+    def paragraph(self, low=2, high=6):
+        count = low + int((high - low + 1) * self.random.random())
+        return ' '.join([self.sentence() for _ in range(count)])
+
+    def title(self, max_length):
+        return self.new_sentence(3, 6)[:max_length]
+
+
+def next_id(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COALESCE(MAX(id), 0) + 1 FROM "{table}"')
+        return cursor.fetchone()[0]
+
+
+def format_datetime(value):
+    """Формат, в котором бэкенд SQLite хранит DateTimeField в UTC."""
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def user_rows(generator, first_id, count, date_joined):
+    """Строки auth_user с неиспользуемым паролем."""
+    for user_id in range(first_id, first_id + count):
+        yield (
+            user_id, '!', None, False, f'user{user_id}',
+            generator.random.choice(FIRST_NAMES),
+            generator.random.choice(LAST_NAMES),
+            f'user{user_id}@example.com', False, True,
+            format_datetime(date_joined),
+        )
+
+
+@contextmanager
+def deferred_indexes(tables):
+    """
+    Удаляет индексы таблиц на время загрузки и строит их заново.
+
+    Автоматические индексы уникальных ограничений SQLite
+    удалить нельзя, они остаются на месте.
+    """
+    if not tables:
+        yield
+        return
+    placeholders = ', '.join(['%s'] * len(tables))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT name, sql FROM sqlite_master WHERE type = %s '
+            f'AND tbl_name IN ({placeholders}) AND sql IS NOT NULL',
+            ['index', *tables],
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX "{name}"')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for _, sql in indexes:
+                cursor.execute(sql)
+            cursor.execute('PRAGMA analysis_limit = 1000')
+            for table in tables:
+                cursor.execute(f'ANALYZE "{table}"')
+
+
+@contextmanager
+def fast_load():
+    """
+    Отключает fsync и проверку внешних ключей на время загрузки.
+
+    Сгенерированные строки ссылаются только на существующие id.
+    Внутри открытой транзакции прагмы менять нельзя, тогда
+    загрузка идёт с настройками по умолчанию.
+    """
+    if connection.in_atomic_block:
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        synchronous = cursor.fetchone()[0]
+        cursor.execute('PRAGMA cache_size')
+        cache_size = cursor.fetchone()[0]
+        cursor.execute('PRAGMA synchronous = OFF')
+        cursor.execute('PRAGMA foreign_keys = OFF')
+        cursor.execute('PRAGMA cache_size = -200000')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA synchronous = {synchronous}')
+            cursor.execute(f'PRAGMA cache_size = {cache_size}')
+            cursor.execute('PRAGMA foreign_keys = ON')
+
+
+def insert_rows(table, columns, rows, batch_size):
+    """
+    Вставляет строки через executemany пачками по batch_size.
+
+    Каждая пачка пишется в своей транзакции, возвращает число строк.
+    """
+    sql = (
+        f'INSERT INTO "{table}" ({", ".join(columns)}) '
+        f'VALUES ({", ".join(["%s"] * len(columns))})'
+    )
+    total = 0
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return total
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, batch)
+        total += len(batch)
@@ -0,0 +1,18 @@
+from functools import lru_cache
+
+from django import template
+from django.templatetags.static import static
+
+register = template.Library()
+
+
+@register.simple_tag
+@lru_cache(maxsize=None)
+def vendor_static(name):
+    """
+    Адрес стороннего файла из yacommon/static/vendor.
+
+    Вычисляется один раз на процесс: после collectstatic — рестарт,
+    как и для индекса статики.
+    """
+    return static(name)